@@ -1,35 +1,509 @@
 """
-CLI entrypoint: python -m sqlbase [scan|predict|remediate] ...
+CLI entrypoint: python -m sqlbase [scan|analyze|predict|export-model|test|standin|inject|fix|bench|serve|client|merge|remediate] ...
 Cross-platform: Linux, Windows, macOS.
 """
 import argparse
 import json
+import os
 import sys
+import time
 from pathlib import Path
 
+_STARTED = time.perf_counter()
+
 
 def cmd_scan(args) -> int:
+    from sqlbase.cache import ScanCache
+    from sqlbase.gitdiff import GitError
+    from sqlbase.reporting import get_writer
     from sqlbase.scanner import SQLInjectionScanner
-    scanner = SQLInjectionScanner()
+    from sqlbase.walker import DEFAULT_PRUNE_DIRS, TreeWalker
+    profile = args.profile or bool(args.profile_json)
+    try:
+        scanner = SQLInjectionScanner(
+            multiline=args.multiline,
+            prefilter=args.prefilter,
+            max_line_length=args.max_line_length or None,
+            time_budget=args.time_budget or None,
+            profile=profile,
+        )
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if profile and args.cache_dir:
+        print("note: --cache-dir ignored while profiling, so every file is matched", file=sys.stderr)
+        args.cache_dir = None
+    walker = TreeWalker(
+        extensions=args.extensions,
+        prune_dirs=DEFAULT_PRUNE_DIRS if args.default_excludes else (),
+        ignore_patterns=args.exclude,
+        use_gitignore=args.gitignore,
+        max_file_size=args.max_file_size or None,
+    )
+    source = None
+    if args.since or args.between:
+        from sqlbase.gitdiff import RevisionSource, revision_range
+        try:
+            source = RevisionSource(
+                args.path,
+                revision_range(args.since, args.between),
+                extensions=args.extensions,
+                max_size=args.max_file_size or None,
+                changed_only=args.changed_lines,
+                walker=walker,
+            )
+        except (GitError, ValueError) as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        if args.cache_dir:
+            print("note: --cache-dir ignored with --since/--between, files are read from git", file=sys.stderr)
+            args.cache_dir = None
+    elif args.changed_lines:
+        print("error: --changed-lines needs --since or --between", file=sys.stderr)
+        return 2
     path = Path(args.path).resolve()
-    results = scanner.scan_path(path, extensions=args.extensions)
-    out = json.dumps(results, indent=2)
+    sharder = None
+    if args.shard:
+        from sqlbase.sharding import Sharder, parse_shard
+        try:
+            if source is not None or not path.is_dir():
+                raise ValueError("--shard needs a directory and no --since/--between")
+            if args.format == "sarif":
+                raise ValueError("--shard writes json or ndjson, which 'merge' reads; not sarif")
+            sharder = Sharder(path, *parse_shard(args.shard))
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+    cache = ScanCache(args.cache_dir, scanner.fingerprint()) if args.cache_dir else None
+    out = open(args.output, "w", encoding="utf-8", newline="\n") if args.output else sys.stdout
+    writer = get_writer(args.format, out, scanner.patterns, wrap=sharder is not None)
+    try:
+        if source is not None:
+            findings = filter(source.keep, scanner.iter_scan_buffers(source))
+        else:
+            findings = scanner.iter_scan(
+                path, extensions=args.extensions, jobs=args.jobs, walker=walker, cache=cache, select=sharder
+            )
+        for finding in findings:
+            writer.write(finding)
+        writer.close(sharder.summary(scanner.fingerprint(), scanner.errors) if sharder is not None else None)
+    except GitError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    stats = scanner.prefilter_stats
+    if stats.get("files"):
+        print(
+            f"prefilter: eliminated {stats.get('files_rejected', 0)}/{stats['files']} files, "
+            f"{stats.get('lines_rejected', 0)}/{stats.get('lines', 0)} lines",
+            file=sys.stderr,
+        )
+    if cache is not None:
+        print(cache.summary(), file=sys.stderr)
+        cache.close()
+    if scanner.rule_profile is not None:
+        if args.profile:
+            print(scanner.rule_profile.format_table(), file=sys.stderr)
+        if args.profile_json:
+            Path(args.profile_json).write_text(json.dumps(scanner.rule_profile.to_dict(), indent=2) + "\n", encoding="utf-8")
+            print(f"Wrote profile to {args.profile_json}", file=sys.stderr)
+    if source is not None:
+        scanner.errors = sorted(scanner.errors + source.errors, key=lambda e: e["file"])
+        print(f"diff: {len(source.files)} changed file(s) in {source.rev_range}", file=sys.stderr)
+    if sharder is not None:
+        info = sharder.info
+        print(
+            f"shard {info['index']}/{info['count']}: {info['files']} of {info['total_files']} files, "
+            f"{info['bytes']} bytes",
+            file=sys.stderr,
+        )
+    for err in scanner.errors:
+        print(f"warning: {err['file']}: {err['kind']}: {err['error']}", file=sys.stderr)
+    if scanner.errors:
+        print(f"{len(scanner.errors)} file(s) skipped or with read/encoding problems", file=sys.stderr)
     if args.output:
-        Path(args.output).write_text(out, encoding="utf-8")
-        print(f"Wrote {len(results)} findings to {args.output}", file=sys.stderr)
-    else:
-        print(out)
-    return 0 if not args.fail_on_findings or len(results) == 0 else 1
+        print(f"Wrote {writer.count} findings to {args.output}", file=sys.stderr)
+    return 0 if not args.fail_on_findings or writer.count == 0 else 1
+
+
+def cmd_merge(args) -> int:
+    from sqlbase.reporting import get_writer, read_report
+    from sqlbase.scanner import SQLInjectionScanner
+    from sqlbase.sharding import merge_reports
+    reports = []
+    for name in args.reports:
+        try:
+            reports.append((name, *read_report(name)))
+        except (OSError, ValueError) as e:
+            print(f"error: {name}: {e}", file=sys.stderr)
+            return 2
+    try:
+        findings, summary = merge_reports(reports)
+    except (ValueError, KeyError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    out = open(args.output, "w", encoding="utf-8", newline="\n") if args.output else sys.stdout
+    writer = get_writer(args.format, out, SQLInjectionScanner().patterns)
+    try:
+        for finding in findings:
+            writer.write(finding)
+        writer.close()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    for err in summary["errors"]:
+        print(f"warning: {err['file']}: {err['kind']}: {err['error']}", file=sys.stderr)
+    print(
+        f"Merged {summary['shards']} shard(s): {summary['files']}/{summary['total_files']} files, "
+        f"{writer.count} findings",
+        file=sys.stderr,
+    )
+    return 0 if not args.fail_on_findings or writer.count == 0 else 1
+
+
+def cmd_analyze(args) -> int:
+    from sqlbase.analyzer import Analyzer
+    from sqlbase.forest import ModelArtifactError
+    from sqlbase.predictor import VulnerabilityPredictor
+    from sqlbase.reporting import get_writer
+    from sqlbase.scanner import SQLInjectionScanner
+    from sqlbase.walker import DEFAULT_PRUNE_DIRS, TreeWalker
+    try:
+        scanner = SQLInjectionScanner(
+            multiline=args.multiline, max_line_length=args.max_line_length or None, time_budget=args.time_budget or None
+        )
+        analyzer = Analyzer(scanner=scanner, predictor=VulnerabilityPredictor(model_path=args.model))
+        analyzer.predictor.model
+    except (ModelArtifactError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    walker = TreeWalker(
+        extensions=args.extensions,
+        prune_dirs=DEFAULT_PRUNE_DIRS if args.default_excludes else (),
+        ignore_patterns=args.exclude,
+        use_gitignore=args.gitignore,
+        max_file_size=args.max_file_size or None,
+    )
+    out = open(args.output, "w", encoding="utf-8", newline="\n") if args.output else sys.stdout
+    writer = get_writer(args.format, out, analyzer.scanner.patterns, wrap=True)
+    try:
+        for finding in analyzer.iter_analyze(args.path, extensions=args.extensions, jobs=args.jobs, walker=walker):
+            writer.write(finding)
+        writer.close({
+            "findings": writer.count,
+            "files": len(analyzer.file_counts),
+            "prediction": analyzer.prediction(per_file=args.per_file, top=args.top),
+            "errors": analyzer.errors,
+        })
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if analyzer.errors:
+        print(f"{len(analyzer.errors)} file(s) skipped or with read/encoding problems", file=sys.stderr)
+    if args.output:
+        print(f"Wrote {writer.count} findings to {args.output}", file=sys.stderr)
+    return 0 if not args.fail_on_findings or writer.count == 0 else 1
 
 
 def cmd_predict(args) -> int:
+    from sqlbase.forest import ModelArtifactError
     from sqlbase.predictor import VulnerabilityPredictor
-    predictor = VulnerabilityPredictor()
-    result = predictor.predict_vulnerability_likelihood(Path(args.path))
+    predictor = VulnerabilityPredictor(model_path=args.model)
+    start = time.perf_counter()
+    try:
+        predictor.model
+    except ModelArtifactError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    loaded = time.perf_counter()
+    result = predictor.predict_vulnerability_likelihood(Path(args.path), per_file=args.per_file, top=args.top)
+    done = time.perf_counter()
     print(json.dumps(result, indent=2))
+    if args.timing:
+        print(
+            f"timing: startup {(start - _STARTED) * 1000:.1f} ms, model load {(loaded - start) * 1000:.1f} ms, "
+            f"predict {(done - loaded) * 1000:.1f} ms, total {(done - _STARTED) * 1000:.1f} ms "
+            f"({type(predictor.model).__name__})",
+            file=sys.stderr,
+        )
+    return 0
+
+
+def cmd_export_model(args) -> int:
+    from sqlbase.forest import export_forest
+    from sqlbase.predictor import VulnerabilityPredictor
+    predictor = VulnerabilityPredictor()
+    if predictor.model is None:
+        print("error: scikit-learn is required to export a model", file=sys.stderr)
+        return 2
+    export_forest(predictor.model, args.output, predictor.features)
+    print(f"Wrote model artifact to {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_test(args) -> int:
+    from sqlbase.campaign import load_spec, read_checkpoint, run_campaign
+    from sqlbase.standin import StandInServer, standin_spec
+    from sqlbase.tester import DynamicSQLiTester
+    if args.resume and not args.output:
+        print("error: --resume needs -o/--output", file=sys.stderr)
+        return 2
+    server = None
+    if args.standin:
+        server = StandInServer(latency=args.latency, jitter=args.jitter).start()
+        specs = standin_spec(server.url, args.standin)
+    elif args.spec:
+        try:
+            specs = load_spec(args.spec)
+        except (OSError, ValueError) as e:
+            print(f"error: {args.spec}: {e}", file=sys.stderr)
+            return 2
+    else:
+        print("error: give an endpoint spec file or --standin N", file=sys.stderr)
+        return 2
+    try:
+        tester = DynamicSQLiTester(
+            args.target,
+            timeout=args.timeout,
+            verify_ssl=args.verify_ssl,
+            concurrency=args.concurrency,
+            per_host=args.per_host,
+            rate=args.rate,
+            burst=args.burst,
+            stop_on_confirm=args.stop_on_confirm,
+            max_inspect_bytes=args.max_inspect_bytes or None,
+        )
+        done = read_checkpoint(args.output) if args.resume else set()
+        mode = "a" if args.resume else "w"
+        out = open(args.output, mode, encoding="utf-8", newline="\n") if args.output else sys.stdout
+        try:
+            stats = run_campaign(tester, specs, out, done)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    print(
+        f"test: {stats['tested']} endpoints tested ({stats['resumed']} already done), "
+        f"{stats['vulnerable']} vulnerable, {stats['requests']} requests in {stats['seconds']} s, "
+        f"{stats['requests_per_sec']} req/s, {stats['endpoints_per_min']} endpoints/min",
+        file=sys.stderr,
+    )
+    print(tester.summary(), file=sys.stderr)
+    if stats["errored"]:
+        print(
+            f"error: {stats['errored']} endpoint(s) not fully tested, {stats['request_errors']} requests failed; "
+            f"they are not checkpointed",
+            file=sys.stderr,
+        )
+    if args.stats:
+        with open(args.stats, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(dict(stats, time=time.strftime("%Y-%m-%dT%H:%M:%S"), concurrency=args.concurrency)) + "\n")
+    if stats["errored"]:
+        return 2
+    return 0 if not args.fail_on_findings or stats["vulnerable"] == 0 else 1
+
+
+def cmd_standin(args) -> int:
+    from sqlbase.standin import StandInServer, standin_spec
+    server = StandInServer(args.host, args.port, latency=args.latency, jitter=args.jitter)
+    if args.spec_out:
+        Path(args.spec_out).write_text(json.dumps(standin_spec(server.url, args.endpoints), indent=2), encoding="utf-8")
+        print(f"Wrote {args.endpoints} endpoint specs to {args.spec_out}", file=sys.stderr)
+    print(f"Stand-in target listening on {server.url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def cmd_inject(args) -> int:
+    from sqlbase.injector import SecurityPatternInjector
+    injector = SecurityPatternInjector()
+    path = Path(args.path).resolve()
+    if not path.is_dir():
+        print(f"error: {path} is not a directory", file=sys.stderr)
+        return 2
+    try:
+        written = injector.apply_intercepting_filter(path)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(f"{path / '.security_filters'}: {'updated' if written else 'up to date'}", file=sys.stderr)
+    if args.bench:
+        from sqlbase.bootstrap import benchmark
+        payload = {
+            "user": "alice", "comment": "Nice <b>post</b> & 'thanks'", "tags": ["a", "b", "c"],
+            "items": [{"id": str(i), "qty": "1", "note": "none"} for i in range(10)],
+        }
+        results = benchmark(injector.filter_manager.stages, payload)
+        for label, r in results.items():
+            print(f"{label:>9}: import {r['import_ms']} ms, {r['call_us']} us/call", file=sys.stderr)
+    return 0
+
+
+def cmd_fix(args) -> int:
+    from sqlbase.fixer import diff_root, fix_findings, unified_diff, write_fixed
+    from sqlbase.reporting import read_report
+    start = time.perf_counter()
+    if args.findings:
+        try:
+            findings, _summary = read_report(args.findings)
+        except (OSError, ValueError) as e:
+            print(f"error: {args.findings}: {e}", file=sys.stderr)
+            return 2
+    else:
+        from sqlbase.scanner import SQLInjectionScanner
+        findings = list(SQLInjectionScanner().iter_scan(Path(args.path).resolve(), jobs=args.jobs))
+    root = diff_root(f["file"] for f in findings)
+    out = open(args.output, "w", encoding="utf-8", newline="\n") if args.output else sys.stdout
+    changed = files = 0
+    rejected = []
+    try:
+        for result in fix_findings(findings, jobs=args.jobs):
+            files += 1
+            if result.error:
+                print(f"warning: {result.file}: {result.error}", file=sys.stderr)
+            if result.rejected:
+                print(f"warning: {result.file}: left unchanged, {result.rejected}", file=sys.stderr)
+                rejected.append(result.file)
+            if not result.changed:
+                continue
+            changed += 1
+            if args.in_place:
+                write_fixed(result)
+            else:
+                out.write(unified_diff(result, root))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(
+        f"fix: {len(findings)} findings in {files} files, {changed} files "
+        f"{'rewritten' if args.in_place else 'changed'} in {time.perf_counter() - start:.2f} s",
+        file=sys.stderr,
+    )
+    if changed and not args.in_place:
+        print(f"fix: diff paths are relative to {root} (apply there with patch -p1)", file=sys.stderr)
+    if rejected:
+        print(f"fix: {len(rejected)} files skipped, their rewrite did not parse: {', '.join(rejected)}", file=sys.stderr)
+    return 0
+
+
+def cmd_bench(args) -> int:
+    import tempfile
+    from sqlbase.bench import (
+        compare, format_table, generate_corpus, load_baseline, make_baseline, parse_mix, run_benchmarks,
+    )
+    try:
+        mix = parse_mix(args.languages)
+        baseline = load_baseline(args.baseline) if args.baseline else None
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = generate_corpus(
+            args.corpus or tmp, files=args.files, size=args.size, mix=mix, density=args.density, seed=args.seed
+        )
+        print(
+            f"corpus: {corpus.files} files, {corpus.bytes / (1024 * 1024):.1f} MB, "
+            f"{len(corpus.expected)} vulnerable lines",
+            file=sys.stderr,
+        )
+        results = run_benchmarks(corpus, args.only, repeat=args.repeat, jobs=args.jobs)
+    try:
+        regressions = compare(results, baseline, corpus, args.threshold) if baseline else []
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps({"corpus": corpus.params, "results": results, "regressions": regressions}, indent=2))
+    else:
+        print(format_table(results, baseline))
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(make_baseline(corpus, results), indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote baseline to {args.save_baseline}", file=sys.stderr)
+    for line in regressions:
+        print(f"regression: {line}", file=sys.stderr)
+    failed = [name for name, r in results.items() if not r["oracle"]["ok"]]
+    for name in failed:
+        print(f"error: {name}: results differ from the corpus oracle", file=sys.stderr)
+    return 1 if regressions or failed else 0
+
+
+def cmd_serve(args) -> int:
+    from sqlbase.cache import ScanCache
+    from sqlbase.daemon import ScanDaemon, ScanService
+    from sqlbase.forest import ModelArtifactError
+    from sqlbase.predictor import VulnerabilityPredictor
+    from sqlbase.scanner import SQLInjectionScanner
+    scanner = SQLInjectionScanner()
+    cache = ScanCache(args.cache_dir, scanner.fingerprint()) if args.cache_dir else None
+    service = ScanService(scanner, VulnerabilityPredictor(model_path=args.model), cache=cache, jobs=args.jobs)
+    try:
+        service.warm()
+    except ModelArtifactError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    server = ScanDaemon(service, args.host, args.port)
+    state = server.write_state(args.state)
+    print(f"Scan daemon listening on {server.url} (state: {state})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        ScanDaemon.remove_state(state, server.token)
+        if cache is not None:
+            cache.close()
     return 0
 
 
+def cmd_client(args) -> int:
+    from sqlbase.client import DaemonError, DaemonUnavailable, call, request
+    start = time.perf_counter()
+    try:
+        if args.op in ("status", "stop"):
+            result = request("status", None, args.state) if args.op == "status" else request("shutdown", {}, args.state)
+            source = "daemon"
+        else:
+            if args.op == "scan":
+                if args.stdin:
+                    payload = {"text": sys.stdin.read(), "name": args.name}
+                else:
+                    payload = {"paths": [os.path.abspath(p) for p in args.paths or ["."]]}
+            elif args.op == "predict":
+                payload = {"path": os.path.abspath(args.path), "per_file": args.per_file, "top": args.top}
+                if args.stdin:
+                    payload = {"text": sys.stdin.read(), "name": args.name, "per_file": args.per_file, "top": args.top}
+            else:
+                payload = {"type": args.type, "language": args.language}
+            result, source = call(args.op, payload, args.state, fallback=args.fallback)
+    except DaemonUnavailable as e:
+        print(f"error: no scan daemon running ({e})", file=sys.stderr)
+        return 2
+    except (DaemonError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.verbose:
+        print(f"served by {source} in {(time.perf_counter() - _STARTED) * 1000:.1f} ms "
+              f"(request {(time.perf_counter() - start) * 1000:.1f} ms)", file=sys.stderr)
+    if args.op != "scan":
+        print(json.dumps(result, indent=2))
+        return 0
+    print(json.dumps(result["findings"], indent=2))
+    for err in result["errors"]:
+        print(f"warning: {err['file']}: {err['kind']}: {err['error']}", file=sys.stderr)
+    return 0 if not args.fail_on_findings or not result["findings"] else 1
+
+
 def cmd_remediate(args) -> int:
     from sqlbase.remediation import RemediationKnowledgeBase
     kb = RemediationKnowledgeBase()
@@ -38,20 +512,175 @@ def cmd_remediate(args) -> int:
     return 0
 
 
+def _float_at_least(minimum: float, inclusive: bool):
+    """argparse type for a float above minimum (or equal to it, if inclusive)."""
+    def parse(text: str) -> float:
+        try:
+            value = float(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"not a number: {text!r}") from None
+        if value < minimum or (value == minimum and not inclusive):
+            raise argparse.ArgumentTypeError(f"must be {'at least' if inclusive else 'more than'} {minimum:g}, got {text}")
+        return value
+    return parse
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="SQLbase security toolkit")
     sub = parser.add_subparsers(dest="command", required=True)
     # scan
     p_scan = sub.add_parser("scan", help="Scan path for SQL injection patterns")
     p_scan.add_argument("path", nargs="?", default=".", help="File or directory to scan")
-    p_scan.add_argument("-o", "--output", metavar="FILE", help="Write JSON report to FILE (cross-platform path)")
+    p_scan.add_argument("-o", "--output", metavar="FILE", help="Write report to FILE (cross-platform path)")
+    p_scan.add_argument("--format", choices=["json", "ndjson", "sarif"], default="json", help="Report format, written as findings are produced")
     p_scan.add_argument("--fail-on-findings", action="store_true", help="Exit 1 if any finding")
     p_scan.add_argument("--extensions", nargs="+", default=[".py", ".java", ".js", ".ts", ".php", ".rb", ".go", ".cs"], help="File extensions")
+    p_scan.add_argument("--exclude", action="append", default=[], metavar="PATTERN", help=".gitignore-style pattern to skip (repeatable)")
+    p_scan.add_argument("--no-gitignore", dest="gitignore", action="store_false", help="Do not apply .gitignore files")
+    p_scan.add_argument("--no-default-excludes", dest="default_excludes", action="store_false", help="Also walk .git, node_modules, venv, build output, ...")
+    p_scan.add_argument("--max-file-size", type=int, default=32 * 1024 * 1024, metavar="BYTES", help="Skip larger files (0: no limit)")
+    p_scan.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, metavar="N", help="Worker processes (default: CPU count)")
+    p_scan.add_argument("--cache-dir", metavar="DIR", help="Reuse findings for unchanged files from a cache in DIR")
+    p_scan.add_argument("--no-prefilter", dest="prefilter", action="store_false", help="Run the regexes on every line (findings are identical)")
+    p_scan.add_argument("--multiline", action="store_true", help="Also report queries that span several lines")
+    p_scan.add_argument("--max-line-length", type=int, metavar="CHARS", help="Do not match longer lines; they are reported as skipped")
+    p_scan.add_argument("--time-budget", type=float, metavar="SECONDS", help="Matching time per file; the rest is reported as skipped")
+    p_scan.add_argument("--since", metavar="REV", help="Scan only files changed between REV and HEAD (path: the repository)")
+    p_scan.add_argument("--between", metavar="A..B", help="Scan only files changed in a revision range (A...B: since the merge base)")
+    p_scan.add_argument("--changed-lines", action="store_true", help="With --since/--between, report only findings on added or modified lines")
+    p_scan.add_argument("--shard", metavar="I/N", help="Scan only shard I of N (stable by path hash, balanced by size); merge the reports with 'merge'")
+    p_scan.add_argument("--profile", action="store_true", help="Print time and hits per rule and the slowest files and lines to stderr")
+    p_scan.add_argument("--profile-json", metavar="FILE", help="Write the profile as JSON to FILE")
     p_scan.set_defaults(func=cmd_scan)
+    # merge
+    p_merge = sub.add_parser("merge", help="Merge the json/ndjson reports of 'scan --shard I/N' runs")
+    p_merge.add_argument("reports", nargs="+", help="Shard reports; every shard of the split must be present")
+    p_merge.add_argument("-o", "--output", metavar="FILE", help="Write the merged report to FILE")
+    p_merge.add_argument("--format", choices=["json", "ndjson", "sarif"], default="json", help="Merged report format")
+    p_merge.add_argument("--fail-on-findings", action="store_true", help="Exit 1 if any finding")
+    p_merge.set_defaults(func=cmd_merge)
+    # analyze
+    p_analyze = sub.add_parser("analyze", help="Scan, predict and attach remediation in one pass over the files")
+    p_analyze.add_argument("path", nargs="?", default=".", help="File or directory to analyze")
+    p_analyze.add_argument("-o", "--output", metavar="FILE", help="Write report to FILE")
+    p_analyze.add_argument("--format", choices=["json", "ndjson", "sarif"], default="json", help="Report format; the summary comes last")
+    p_analyze.add_argument("--fail-on-findings", action="store_true", help="Exit 1 if any finding")
+    p_analyze.add_argument("--extensions", nargs="+", default=[".py", ".java", ".js", ".ts", ".php", ".rb", ".go", ".cs"], help="File extensions to scan")
+    p_analyze.add_argument("--exclude", action="append", default=[], metavar="PATTERN", help=".gitignore-style pattern to skip (repeatable)")
+    p_analyze.add_argument("--no-gitignore", dest="gitignore", action="store_false", help="Do not apply .gitignore files")
+    p_analyze.add_argument("--no-default-excludes", dest="default_excludes", action="store_false", help="Also walk .git, node_modules, venv, build output, ...")
+    p_analyze.add_argument("--max-file-size", type=int, default=32 * 1024 * 1024, metavar="BYTES", help="Skip larger files (0: no limit)")
+    p_analyze.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, metavar="N", help="Worker processes (default: CPU count)")
+    p_analyze.add_argument("--multiline", action="store_true", help="Also report queries that span several lines")
+    p_analyze.add_argument("--max-line-length", type=int, metavar="CHARS", help="Do not match longer lines; they are reported as skipped")
+    p_analyze.add_argument("--time-budget", type=float, metavar="SECONDS", help="Matching time per file; the rest is reported as skipped")
+    p_analyze.add_argument("--model", metavar="FILE", help="Exported model artifact (default: $SQLBASE_MODEL, else fit the built-in model)")
+    p_analyze.add_argument("--per-file", action="store_true", help="Also rank individual files by risk")
+    p_analyze.add_argument("--top", type=int, metavar="N", help="With --per-file, keep the N riskiest files")
+    p_analyze.set_defaults(func=cmd_analyze)
     # predict
     p_predict = sub.add_parser("predict", help="Predict vulnerability likelihood")
     p_predict.add_argument("path", nargs="?", default=".", help="File or directory")
+    p_predict.add_argument("--per-file", action="store_true", help="Also rank individual files by risk")
+    p_predict.add_argument("--top", type=int, metavar="N", help="With --per-file, keep the N riskiest files")
+    p_predict.add_argument("--model", metavar="FILE", help="Exported model artifact (default: $SQLBASE_MODEL, else fit the built-in model)")
+    p_predict.add_argument("--timing", action="store_true", help="Print startup, model load and prediction times to stderr")
     p_predict.set_defaults(func=cmd_predict)
+    # export-model
+    p_export = sub.add_parser("export-model", help="Export the built-in model to an artifact for fast startup (needs scikit-learn)")
+    p_export.add_argument("output", help="Artifact file to write, e.g. model.npz")
+    p_export.set_defaults(func=cmd_export_model)
+    # test
+    p_test = sub.add_parser("test", help="Run the dynamic SQLi tester over endpoints from a spec file")
+    p_test.add_argument("spec", nargs="?", help="JSON array or NDJSON of {url, method, params, headers}")
+    p_test.add_argument("-o", "--output", metavar="FILE", help="Write NDJSON results to FILE (also the checkpoint)")
+    p_test.add_argument("--resume", action="store_true", help="Skip endpoints already in --output and append")
+    p_test.add_argument("--target", default="", metavar="URL", help="Base URL for relative endpoints")
+    p_test.add_argument("--concurrency", type=int, default=8, metavar="N", help="Requests in flight overall")
+    p_test.add_argument("--per-host", type=int, metavar="N", help="Requests in flight per host")
+    p_test.add_argument("--rate", type=_float_at_least(0, inclusive=False), metavar="R", help="Requests per second per host")
+    p_test.add_argument("--burst", type=_float_at_least(1, inclusive=True), metavar="B", help="Token-bucket burst size for --rate (at least 1)")
+    p_test.add_argument("--timeout", type=float, default=10.0, metavar="SECONDS", help="Request timeout")
+    p_test.add_argument("--insecure", dest="verify_ssl", action="store_false", help="Do not verify TLS certificates")
+    p_test.add_argument("--all-payloads", dest="stop_on_confirm", action="store_false", help="Keep testing a parameter after it is confirmed")
+    p_test.add_argument("--max-inspect-bytes", type=int, default=1024 * 1024, metavar="BYTES", help="Response bytes inspected (0: all)")
+    p_test.add_argument("--fail-on-findings", action="store_true", help="Exit 1 if any endpoint is vulnerable")
+    p_test.add_argument("--stats", metavar="FILE", help="Append a JSON throughput record to FILE")
+    p_test.add_argument("--standin", type=int, metavar="N", help="Benchmark against N endpoints on a local stand-in target")
+    p_test.add_argument("--latency", type=float, default=0.02, metavar="SECONDS", help="Stand-in response latency")
+    p_test.add_argument("--jitter", type=float, default=0.0, metavar="SECONDS", help="Stand-in extra random latency")
+    p_test.set_defaults(func=cmd_test)
+    # standin
+    p_standin = sub.add_parser("standin", help="Serve simulated vulnerable and safe endpoints for benchmarks")
+    p_standin.add_argument("--host", default="127.0.0.1")
+    p_standin.add_argument("--port", type=int, default=8808)
+    p_standin.add_argument("--latency", type=float, default=0.02, metavar="SECONDS", help="Response latency")
+    p_standin.add_argument("--jitter", type=float, default=0.0, metavar="SECONDS", help="Extra random latency")
+    p_standin.add_argument("--endpoints", type=int, default=30, metavar="N", help="Endpoints in --spec-out")
+    p_standin.add_argument("--spec-out", metavar="FILE", help="Write a matching endpoint spec file")
+    p_standin.set_defaults(func=cmd_standin)
+    # inject
+    p_inject = sub.add_parser("inject", help="Generate the standalone security filter bootstrap in a project")
+    p_inject.add_argument("path", nargs="?", default=".", help="Project directory")
+    p_inject.add_argument("--bench", action="store_true", help="Compare import time and per-call cost with the legacy bootstrap")
+    p_inject.set_defaults(func=cmd_inject)
+    # fix
+    p_fix = sub.add_parser("fix", help="Rewrite flagged Java/Python lines to parameterized queries")
+    p_fix.add_argument("path", nargs="?", default=".", help="File or directory to scan when --findings is not given")
+    p_fix.add_argument("--findings", metavar="FILE", help="Scan report to fix (json or ndjson from 'scan')")
+    p_fix.add_argument("--in-place", action="store_true", help="Write fixed files instead of printing a unified diff")
+    p_fix.add_argument("-o", "--output", metavar="FILE", help="Write the diff to FILE")
+    p_fix.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, metavar="N", help="Worker processes (default: CPU count)")
+    p_fix.set_defaults(func=cmd_fix)
+    # bench
+    p_bench = sub.add_parser("bench", help="Benchmark scan, predict and filters on a synthetic corpus")
+    p_bench.add_argument("--files", type=int, default=200, metavar="N", help="Files in the corpus")
+    p_bench.add_argument("--size", type=int, default=16 * 1024, metavar="BYTES", help="Approximate size of each file")
+    p_bench.add_argument("--languages", default="py=4,java=2,js=2,php=1", metavar="MIX", help="Language weights, e.g. py=4,java=1")
+    p_bench.add_argument("--density", type=float, default=0.02, help="Fraction of lines that are vulnerable snippets")
+    p_bench.add_argument("--seed", type=int, default=0)
+    p_bench.add_argument("--corpus", metavar="DIR", help="Write the corpus to DIR and keep it (default: a temporary directory)")
+    p_bench.add_argument("--only", nargs="+", choices=["scan", "predict", "filters"], default=["scan", "predict", "filters"])
+    p_bench.add_argument("--repeat", type=int, default=5, metavar="N", help="Best of N timed runs")
+    p_bench.add_argument("--jobs", "-j", type=int, default=1, metavar="N", help="Scanner worker processes")
+    p_bench.add_argument("--baseline", metavar="FILE", help="Compare with a baseline saved by --save-baseline")
+    p_bench.add_argument("--threshold", type=float, default=0.1, help="Allowed regression as a fraction (default: 0.1)")
+    p_bench.add_argument("--save-baseline", metavar="FILE", help="Write this run's results as a baseline")
+    p_bench.add_argument("--json", action="store_true", help="Print results as JSON")
+    p_bench.set_defaults(func=cmd_bench)
+    # serve
+    p_serve = sub.add_parser("serve", help="Run a scan daemon with warm rules, model and cache on localhost")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=0, help="Port (default: any free port; clients find it in the state file)")
+    p_serve.add_argument("--state", metavar="FILE", help="State file with url and token (default: $SQLBASE_SERVE_STATE or ~/.cache/sqlbase/serve.json)")
+    p_serve.add_argument("--cache-dir", metavar="DIR", help="Reuse findings for unchanged files from a cache in DIR")
+    p_serve.add_argument("--model", metavar="FILE", help="Exported model artifact (default: $SQLBASE_MODEL, else fit the built-in model)")
+    p_serve.add_argument("--jobs", "-j", type=int, default=1, metavar="N", help="Worker processes for directory scans")
+    p_serve.set_defaults(func=cmd_serve)
+    # client
+    p_client = sub.add_parser("client", help="Send scan/predict/remediate to the daemon, or run them in-process if none is running")
+    client_common = argparse.ArgumentParser(add_help=False)
+    client_common.add_argument("--state", metavar="FILE", help="Daemon state file (default: as for serve)")
+    client_common.add_argument("--no-fallback", dest="fallback", action="store_false", help="Fail instead of running in-process without a daemon")
+    client_common.add_argument("--verbose", "-v", action="store_true", help="Print who served the request and how long it took")
+    client_sub = p_client.add_subparsers(dest="op", required=True)
+    c_scan = client_sub.add_parser("scan", parents=[client_common], help="Scan files or directories, or stdin")
+    c_scan.add_argument("paths", nargs="*", help="Files or directories (default: .)")
+    c_scan.add_argument("--stdin", action="store_true", help="Scan an unsaved buffer read from stdin")
+    c_scan.add_argument("--name", default="<stdin>", help="File name reported for --stdin")
+    c_scan.add_argument("--fail-on-findings", action="store_true", help="Exit 1 if any finding")
+    c_predict = client_sub.add_parser("predict", parents=[client_common], help="Predict vulnerability likelihood")
+    c_predict.add_argument("path", nargs="?", default=".")
+    c_predict.add_argument("--stdin", action="store_true", help="Predict for a buffer read from stdin")
+    c_predict.add_argument("--name", default="<stdin>", help="File name reported for --stdin")
+    c_predict.add_argument("--per-file", action="store_true")
+    c_predict.add_argument("--top", type=int, metavar="N")
+    c_rem = client_sub.add_parser("remediate", parents=[client_common], help="Remediation for vulnerability type + language")
+    c_rem.add_argument("type")
+    c_rem.add_argument("language")
+    client_sub.add_parser("status", parents=[client_common], help="Show the daemon's status")
+    client_sub.add_parser("stop", parents=[client_common], help="Stop the daemon")
+    p_client.set_defaults(func=cmd_client)
     # remediate
     p_rem = sub.add_parser("remediate", help="Get remediation for vulnerability type + language")
     p_rem.add_argument("type", help="e.g. SQL_INJECTION")
@@ -0,0 +1,177 @@
+"""
+One-read analysis pipeline: every file is read once and the same buffer feeds
+the scanner rules and the predictor's feature counters. Findings carry their
+remediation, looked up once per (type, language). Cross-platform.
+"""
+import copy
+import mmap
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlbase.predictor import (
+    FEATURE_EXTENSIONS,
+    VulnerabilityPredictor,
+    count_features,
+    decode_text,
+    universal_newlines,
+)
+from sqlbase.remediation import RemediationKnowledgeBase, language_for_path
+from sqlbase.scanner import (
+    DEFAULT_EXTENSIONS,
+    MINIFIED_SNIFF_BYTES,
+    SQLInjectionScanner,
+    decode_source,
+    looks_minified,
+    ordered_batches,
+    run_batches,
+)
+from sqlbase.walker import TreeWalker, WalkEntry, looks_binary
+
+
+class FileAnalysis(NamedTuple):
+    file: str
+    findings: List[Dict[str, Any]]
+    errors: List[Dict[str, str]]
+    counts: Optional[List[int]]
+    stats: Dict[str, int]
+
+
+def analyze_file(
+    scanner: SQLInjectionScanner, name: str, scan: bool, count: bool, as_tree: bool
+) -> FileAnalysis:
+    """
+    Scan and/or count one file from a single read. as_tree: count it the way
+    the predictor counts files of a directory (binary files skipped, one
+    trailing newline added).
+    """
+    errors: List[Dict[str, str]] = []
+    stats: Dict[str, int] = {}
+    findings: Optional[List[Dict[str, Any]]] = None
+    counts: Optional[List[int]] = None
+    try:
+        with open(name, "rb") as fh:
+            large = scanner._use_mmap(os.fstat(fh.fileno()).st_size)
+            data: Any = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) if large else fh.read()
+    except (OSError, ValueError) as e:
+        error = f"{type(e).__name__}: {getattr(e, 'strerror', None) or e}"
+        errors = [{"file": name, "kind": "read", "error": error}] if scan else []
+        return FileAnalysis(name, [], errors, count_features("") if count and not as_tree else None, stats)
+    try:
+        binary = looks_binary(data)
+        if scan and binary:
+            errors.append({"file": name, "kind": "binary", "error": "NUL byte in header"})
+            findings = []
+        elif scan and large and looks_minified(data):
+            errors.append({"file": name, "kind": "minified", "error": f"no line break in first {MINIFIED_SNIFF_BYTES} bytes"})
+            findings = []
+        elif scan and large:
+            findings = scanner.scan_buffer(data, stats)
+        text: Optional[str] = None
+        if scan and findings is None:
+            text = decode_source(name, data, errors)
+            findings = scanner.scan_text(text, stats, name, errors)
+        if count and not (as_tree and binary):
+            counts = count_features(decode_text(data) if text is None else universal_newlines(text))
+            if as_tree:
+                counts[0] += 1
+                counts[1] += 1
+    finally:
+        if large:
+            data.close()
+    findings = findings or []
+    for v in findings:
+        v["file"] = name
+    return FileAnalysis(name, findings, errors, counts, stats)
+
+
+class Analyzer:
+    def __init__(
+        self,
+        scanner: Optional[SQLInjectionScanner] = None,
+        predictor: Optional[VulnerabilityPredictor] = None,
+        kb: Optional[RemediationKnowledgeBase] = None,
+    ) -> None:
+        self.scanner = scanner or SQLInjectionScanner()
+        self.predictor = predictor or VulnerabilityPredictor()
+        self.kb = kb or RemediationKnowledgeBase()
+        self.remediation = lru_cache(maxsize=None)(self._lookup_remediation)
+        self.errors: List[Dict[str, str]] = []
+        self.file_counts: List[Tuple[str, List[int]]] = []
+
+    def _lookup_remediation(self, vulnerability_type: str, language: Optional[str]) -> Dict[str, Any]:
+        return self.kb.get_remediation(vulnerability_type, language) if language else {}
+
+    def iter_analyze(
+        self,
+        path: str | Path,
+        extensions: Optional[List[str]] = None,
+        jobs: Optional[int] = 1,
+        walker: Optional[TreeWalker] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield findings with "language" and "remediation" in path order, like
+        SQLInjectionScanner.iter_scan. Feature counts of the files the predictor
+        looks at are collected in self.file_counts for prediction().
+        """
+        path = Path(path).resolve()
+        extensions = extensions or list(DEFAULT_EXTENSIONS)
+        self.errors = []
+        self.file_counts = []
+        self.scanner.prefilter_stats = {}
+        as_tree = not path.is_file()
+        entries: List[WalkEntry] = []
+        if path.is_file():
+            st = path.stat()
+            entries.append(WalkEntry(str(path), st.st_size, st.st_mtime_ns))
+        else:
+            # One walk for both consumers: scan extensions plus the predictor's,
+            # on a copy so the caller's walker keeps its own.
+            walker = copy.copy(walker) if walker is not None else TreeWalker()
+            walker.extensions = frozenset(extensions) | frozenset(FEATURE_EXTENSIONS)
+            entries.extend(walker.walk(path))
+            self.errors.extend(walker.skipped)
+        entries.sort(key=lambda e: e.path)
+        scan_ext, count_ext = frozenset(extensions), frozenset(FEATURE_EXTENSIONS)
+        jobs = jobs or os.cpu_count() or 1
+        batches = ordered_batches(entries, jobs)
+
+        def plan(batch: List[WalkEntry]) -> List[Tuple[str, bool, bool]]:
+            # (file, scan it, count it)
+            return [
+                (e.path, not as_tree or os.path.splitext(e.path)[1] in scan_ext,
+                 not as_tree or os.path.splitext(e.path)[1] in count_ext)
+                for e in batch
+            ]
+
+        work = ((None, (plan(batch), as_tree)) for batch in batches)
+        for _tag, results in run_batches(self.scanner, _analyze_batch, work, jobs, len(batches)):
+            yield from self._drain(results)
+        self.errors.sort(key=lambda e: e["file"])
+
+    def _drain(self, results: List[FileAnalysis]) -> Iterator[Dict[str, Any]]:
+        for result in results:
+            for key, value in result.stats.items():
+                self.scanner.prefilter_stats[key] = self.scanner.prefilter_stats.get(key, 0) + value
+            self.errors.extend(result.errors)
+            if result.counts is not None:
+                self.file_counts.append((result.file, result.counts))
+            language = language_for_path(result.file)
+            for finding in result.findings:
+                finding["language"] = language
+                remediation = self.remediation(finding["type"], language)
+                if remediation:
+                    # The lookup is cached and shared: each finding gets its own copy.
+                    finding["remediation"] = copy.deepcopy(remediation)
+                yield finding
+
+    def prediction(self, per_file: bool = False, top: Optional[int] = None) -> Dict[str, Any]:
+        """Predictor result for the counts gathered by the last iter_analyze()."""
+        return self.predictor.predict_from_counts(self.file_counts, per_file=per_file, top=top)
+
+
+def _analyze_batch(
+    scanner: SQLInjectionScanner, batch: List[Tuple[str, bool, bool]], as_tree: bool
+) -> List[FileAnalysis]:
+    return [analyze_file(scanner, name, scan, count, as_tree) for name, scan, count in batch]
@@ -0,0 +1,303 @@
+"""
+Benchmark suite: a deterministic synthetic corpus and throughput runs for the
+scanner, the predictor and the filters, compared against a stored baseline.
+Vulnerable snippets sit at known lines, so each run also checks that no
+finding was lost. Cross-platform (peak RSS needs the resource module).
+"""
+import json
+import os
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+BASELINE_VERSION = 1
+BENCHMARKS = ("scan", "predict", "filters")
+DEFAULT_MIX = {"py": 4, "java": 2, "js": 2, "php": 1}
+# Higher is better for throughput; peak RSS is better lower.
+THROUGHPUT_METRICS = ("files_per_sec", "items_per_sec", "mb_per_sec")
+
+# (line, description the scanner must report for it); {n} is a running number.
+VULNERABLE: Dict[str, List[Tuple[str, str]]] = {
+    "py": [
+        ('    cursor.execute("SELECT * FROM users WHERE id = " + user_id_{n})', "String concatenation in execute"),
+        ("    cursor.execute(\"SELECT name FROM t WHERE a = '%s'\" % name_{n})", "%-format in query"),
+        ('    cursor.execute("DELETE FROM t WHERE id = {{}}".format(item_{n}))', "str.format in query"),
+        ('    sql = f"SELECT * FROM orders WHERE owner = {{owner_{n}}}"', "F-string in SQL"),
+    ],
+    "java": [
+        ('        stmt.execute("SELECT * FROM users WHERE id = " + id{n});', "String concatenation in execute"),
+        ('        conn.createStatement().execute("DELETE FROM t WHERE id = " + id{n});', "String concatenation in execute"),
+    ],
+    "js": [
+        ('  db.raw("SELECT * FROM items WHERE id = " + req.params.id{n});', "Raw query concatenation"),
+        ('  conn.execute("DELETE FROM items WHERE id = " + id{n});', "String concatenation in execute"),
+    ],
+    "php": [
+        ('    $rows = $pdo->query("SELECT * FROM users WHERE id = {{$id{n}}}");', "F-string in SQL"),
+    ],
+}
+
+# Lines no rule matches, several of them holding the rules' literals.
+FILLER: Dict[str, List[str]] = {
+    "py": [
+        "def handler_{n}(request):",
+        "    value_{n} = compute(a, b) + {n}",
+        "    # process record {n} before the query",
+        '    cursor.execute("SELECT id FROM t WHERE id = ?", (row_{n},))',
+        "    query = build(items_{n})",
+        '    return {{"status": "ok", "count": {n}}}',
+        "",
+    ],
+    "java": [
+        "    public int method{n}(int a) {{",
+        "        int total = a + {n};",
+        '        PreparedStatement ps = conn.prepareStatement("SELECT id FROM t WHERE id = ?");',
+        "        ps.setInt(1, a);",
+        "        return total;",
+        "    }}",
+    ],
+    "js": [
+        "function handler{n}(a, b) {{",
+        "  const total = a + b + {n};",
+        '  db.query("SELECT id FROM t WHERE id = ?", [a]);',
+        "  return total;",
+        "}}",
+    ],
+    "php": [
+        "function handler{n}($a) {{",
+        "    $total = $a + {n};",
+        '    $stmt = $pdo->prepare("SELECT id FROM t WHERE id = ?");',
+        "    return $total;",
+        "}}",
+    ],
+}
+
+
+class Corpus(NamedTuple):
+    root: str
+    files: int
+    bytes: int
+    lines: int
+    # (path relative to root, line, description)
+    expected: List[Tuple[str, int, str]]
+    params: Dict[str, Any]
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """'py=4,java=1' -> {"py": 4, "java": 1}."""
+    mix: Dict[str, int] = {}
+    for part in text.split(","):
+        lang, _, weight = part.strip().partition("=")
+        if lang not in VULNERABLE:
+            raise ValueError(f"Unknown corpus language {lang!r} (choose from {', '.join(VULNERABLE)})")
+        mix[lang] = int(weight or 1)
+    return mix
+
+
+def generate_corpus(
+    root: str | Path,
+    files: int = 200,
+    size: int = 16 * 1024,
+    mix: Optional[Dict[str, int]] = None,
+    density: float = 0.02,
+    seed: int = 0,
+) -> Corpus:
+    """
+    Write `files` source files of about `size` bytes each under root, in
+    languages drawn by weight from mix. Each line is a vulnerable snippet with
+    probability density. The same arguments always give the same tree.
+    """
+    mix = mix or dict(DEFAULT_MIX)
+    rng = random.Random(seed)
+    root = Path(root)
+    langs = sorted(mix)
+    weights = [mix[lang] for lang in langs]
+    expected: List[Tuple[str, int, str]] = []
+    total_bytes = total_lines = 0
+    for i in range(files):
+        lang = rng.choices(langs, weights)[0]
+        rel = f"d{i % 16:02d}/f{i:05d}.{lang}"
+        lines: List[str] = []
+        written = 0
+        while written < size:
+            n = len(lines) + 1
+            if rng.random() < density:
+                template, desc = rng.choice(VULNERABLE[lang])
+                expected.append((rel, n, desc))
+            else:
+                template = rng.choice(FILLER[lang])
+            line = template.format(n=n)
+            lines.append(line)
+            written += len(line) + 1
+        target = root / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "w", encoding="utf-8", newline="\n") as fh:
+            fh.write("\n".join(lines) + "\n")
+        total_bytes += written
+        total_lines += len(lines)
+    params = {"files": files, "size": size, "mix": mix, "density": density, "seed": seed}
+    expected.sort()
+    return Corpus(str(root), files, total_bytes, total_lines, expected, params)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _best(run, repeat: int) -> Tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _bench_scan(corpus: Corpus, repeat: int, jobs: int) -> Dict[str, Any]:
+    from sqlbase.scanner import SQLInjectionScanner
+    scanner = SQLInjectionScanner()
+    seconds, findings = _best(lambda: scanner.scan_path(corpus.root, jobs=jobs), repeat)
+    root = Path(corpus.root).resolve()
+    found = {(Path(f["file"]).relative_to(root).as_posix(), f["line"], f["description"]) for f in findings}
+    expected = set(corpus.expected)
+    oracle = {
+        "ok": found == expected,
+        "expected": len(expected),
+        "missed": len(expected - found),
+        "unexpected": len(found - expected),
+    }
+    return {"seconds": seconds, "files": corpus.files, "bytes": corpus.bytes, "oracle": oracle}
+
+
+def _bench_predict(corpus: Corpus, repeat: int, jobs: int) -> Dict[str, Any]:
+    from sqlbase.predictor import VulnerabilityPredictor
+    predictor = VulnerabilityPredictor()
+    predictor.model
+    seconds, _result = _best(lambda: predictor.predict_vulnerability_likelihood(corpus.root), repeat)
+    # Directory counts add one newline per file; the corpus is ASCII.
+    totals = [0, 0]
+    for _file, counts in predictor.iter_file_counts(corpus.root):
+        totals[0] += counts[0]
+        totals[1] += counts[1]
+    expected = [corpus.bytes + corpus.files, corpus.lines + corpus.files]
+    oracle = {"ok": totals == expected, "chars": totals[0], "newlines": totals[1], "expected": expected}
+    return {"seconds": seconds, "files": corpus.files, "bytes": corpus.bytes, "oracle": oracle}
+
+
+def _bench_filters(corpus: Corpus, repeat: int, jobs: int) -> Dict[str, Any]:
+    from sqlbase.injector import FilterManager, default_filters
+    values: List[str] = []
+    for path in sorted(Path(corpus.root).rglob("*.*")):
+        values.extend(path.read_text(encoding="utf-8").splitlines())
+    filters = default_filters()
+    manager = FilterManager(filters)
+    seconds, out = _best(lambda: manager.apply_many(values), repeat)
+    # The filters as originally written: one str.replace per rule, in order.
+    bad = 0
+    for value, got in zip(values[:5000], out):
+        for f in filters.values():
+            for old, new in f.replacements:
+                value = value.replace(old, new)
+        bad += value != got
+    oracle = {"ok": bad == 0 and len(out) == len(values), "checked": min(len(values), 5000), "mismatches": bad}
+    size = sum(len(v) for v in values)
+    return {"seconds": seconds, "items": len(values), "bytes": size, "oracle": oracle}
+
+
+_RUNNERS = {"scan": _bench_scan, "predict": _bench_predict, "filters": _bench_filters}
+
+
+def _run_one(name: str, corpus: Corpus, repeat: int, jobs: int) -> Dict[str, Any]:
+    raw = _RUNNERS[name](corpus, repeat, jobs)
+    seconds = raw.pop("seconds")
+    result: Dict[str, Any] = {"seconds": round(seconds, 4)}
+    if "files" in raw:
+        result["files_per_sec"] = round(raw["files"] / seconds, 1)
+    if "items" in raw:
+        result["items_per_sec"] = round(raw["items"] / seconds, 1)
+    result["mb_per_sec"] = round(raw["bytes"] / seconds / (1024 * 1024), 2)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    result["oracle"] = raw["oracle"]
+    return result
+
+
+def run_benchmarks(
+    corpus: Corpus, names: Sequence[str] = BENCHMARKS, repeat: int = 5, jobs: int = 1
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run each benchmark in a fresh interpreter, so its peak RSS is its own and
+    no warm state leaks from one to the next. Timings are the best of repeat.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results[name] = pool.submit(_run_one, name, corpus, repeat, jobs).result()
+    return results
+
+
+def make_baseline(corpus: Corpus, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "version": BASELINE_VERSION,
+        "corpus": corpus.params,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": {name: {k: v for k, v in r.items() if k != "oracle"} for name, r in results.items()},
+    }
+
+
+def load_baseline(path: str | Path) -> Dict[str, Any]:
+    baseline = json.loads(Path(path).read_text(encoding="utf-8"))
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"{path}: baseline version {baseline.get('version')!r}, expected {BASELINE_VERSION}")
+    return baseline
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], corpus: Corpus, threshold: float = 0.1
+) -> List[str]:
+    """
+    Regressions beyond threshold (a fraction) against baseline: throughput
+    lower or peak RSS higher. Raises ValueError if the corpora differ.
+    """
+    if baseline["corpus"] != corpus.params:
+        raise ValueError(f"baseline corpus {baseline['corpus']} differs from this run's {corpus.params}")
+    regressions: List[str] = []
+    for name, result in results.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        for metric in THROUGHPUT_METRICS:
+            if metric in result and old.get(metric) and result[metric] < old[metric] * (1 - threshold):
+                regressions.append(f"{name}: {metric} {result[metric]} < baseline {old[metric]} (-{1 - result[metric] / old[metric]:.0%})")
+        rss, old_rss = result.get("peak_rss_mb"), old.get("peak_rss_mb")
+        if rss is not None and old_rss and rss > old_rss * (1 + threshold):
+            regressions.append(f"{name}: peak_rss_mb {rss} > baseline {old_rss} (+{rss / old_rss - 1:.0%})")
+    return regressions
+
+
+def format_table(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None) -> str:
+    header = f"{'benchmark':<10} {'seconds':>9} {'files/s':>10} {'items/s':>11} {'MB/s':>8} {'RSS MB':>8} {'vs base':>8}  oracle"
+    rows = [header]
+    for name, r in results.items():
+        delta = ""
+        old = (baseline or {}).get("results", {}).get(name, {})
+        if old.get("mb_per_sec"):
+            delta = f"{r['mb_per_sec'] / old['mb_per_sec'] - 1:+.0%}"
+        rows.append(
+            f"{name:<10} {r['seconds']:>9.4f} {r.get('files_per_sec', ''):>10} {r.get('items_per_sec', ''):>11} "
+            f"{r['mb_per_sec']:>8} {r['peak_rss_mb'] if r['peak_rss_mb'] is not None else '-':>8} {delta:>8}  "
+            f"{'ok' if r['oracle']['ok'] else 'FAILED ' + json.dumps(r['oracle'])}"
+        )
+    return "\n".join(rows)
@@ -0,0 +1,250 @@
+"""
+Code generator for the injected filter bootstrap. Cross-platform.
+Fused translate stages are inlined as literal tables and straight-line code, so
+the generated module imports only the standard library, never sqlbase.
+"""
+import hashlib
+import importlib.util
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from sqlbase.filters import BaseFilter, TranslateFilter
+
+GENERATOR_VERSION = 1
+DIGEST_PREFIX = "# sqlbase-bootstrap: "
+
+_WALK = '''
+
+def _walk(data, transform):
+    if isinstance(data, str):
+        return transform(data)
+    if isinstance(data, dict):
+        values = [transform(v) if type(v) is str else _walk(v, transform) for v in data.values()]
+        if not any(map(is_not, values, data.values())):
+            return data
+        return dict(zip(data.keys(), values))
+    if isinstance(data, (list, tuple)):
+        items = [transform(x) if type(x) is str else _walk(x, transform) for x in data]
+        if not any(map(is_not, items, data)):
+            return data
+        return type(data)(items)
+    return data
+'''
+
+_FOOTER = '''
+
+class _FilterManager:
+    def apply_all(self, data):
+        return apply_security_filters(data)
+
+    def apply_many(self, values):
+        return apply_many(values)
+
+
+_manager = _FilterManager()
+
+
+def get_filter_manager():
+    return _manager
+'''
+
+# The original bootstrap, for comparison. It imported the toolkit's filters and
+# ran them as a chain, each one walking the payload and replacing characters one
+# str.replace at a time; that implementation is copied here, so the benchmark
+# measures it rather than today's fused FilterManager (only the cost of
+# importing sqlbase itself is left out).
+LEGACY_BOOTSTRAP = '''"""
+Auto-generated security filter bootstrap. Cross-platform.
+Import: from .security_filters.filter_manager import get_filter_manager
+"""
+from pathlib import Path
+
+
+class SQLInjectionFilter:
+    def apply(self, data):
+        if isinstance(data, str):
+            return data.replace("'", "''").replace("\\\\", "\\\\\\\\")
+        if isinstance(data, dict):
+            return {k: self.apply(v) for k, v in data.items()}
+        if isinstance(data, (list, tuple)):
+            return type(data)(self.apply(x) for x in data)
+        return data
+
+
+class XSSFilter:
+    def apply(self, data):
+        if isinstance(data, str):
+            return (
+                data.replace("&", "&amp;")
+                .replace("<", "&lt;")
+                .replace(">", "&gt;")
+                .replace('"', "&quot;")
+                .replace("'", "&#x27;")
+            )
+        if isinstance(data, dict):
+            return {k: self.apply(v) for k, v in data.items()}
+        if isinstance(data, (list, tuple)):
+            return type(data)(self.apply(x) for x in data)
+        return data
+
+
+class CommandInjectionFilter:
+    def apply(self, data):
+        if isinstance(data, str):
+            for char in [";", "|", "&", "$", "`", "\\n", "\\r"]:
+                data = data.replace(char, "")
+            return data
+        if isinstance(data, dict):
+            return {k: self.apply(v) for k, v in data.items()}
+        if isinstance(data, (list, tuple)):
+            return type(data)(self.apply(x) for x in data)
+        return data
+
+
+class FilterManager:
+    def __init__(self, filters):
+        self.filters = filters
+
+    def apply_all(self, data):
+        for _name, f in self.filters.items():
+            data = f.apply(data)
+        return data
+
+
+_filters = None
+
+def get_filter_manager():
+    global _filters
+    if _filters is None:
+        _filters = FilterManager({
+            "SQLi": SQLInjectionFilter(),
+            "XSS": XSSFilter(),
+            "CommandInjection": CommandInjectionFilter(),
+        })
+    return _filters
+
+def apply_security_filters(data):
+    return get_filter_manager().apply_all(data)
+'''
+
+
+def _check_stages(stages: Sequence[BaseFilter]) -> None:
+    for stage in stages:
+        if not isinstance(stage, TranslateFilter):
+            raise ValueError(
+                f"filter {stage.name()!r} is not a translate filter; a standalone bootstrap can only inline those"
+            )
+
+
+def _describe(stages: Sequence[TranslateFilter]) -> List[Any]:
+    return [["table", sorted(stage.table.items())] for stage in stages]
+
+
+def config_digest(stages: Sequence[BaseFilter]) -> str:
+    """Identifies the generated code: changes only when the filter configuration does."""
+    _check_stages(stages)
+    raw = repr([GENERATOR_VERSION, _describe(stages)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def render_bootstrap(stages: Sequence[BaseFilter]) -> str:
+    """
+    Source of a standalone filter_manager.py for stages as produced by fuse().
+    Raises ValueError unless every stage is a TranslateFilter.
+    """
+    _check_stages(stages)
+    names = ", ".join(stage.name() for stage in stages) or "none"
+    parts = [
+        '"""\n'
+        "Auto-generated security filter bootstrap. Cross-platform.\n"
+        "Import: from .security_filters.filter_manager import get_filter_manager\n"
+        f"Filters: {names}. Regenerated when the filter configuration changes; do not edit.\n"
+        '"""\n'
+        f"{DIGEST_PREFIX}{config_digest(stages)}\n"
+        "import re\n"
+        "from operator import is_not\n"
+    ]
+    calls: List[str] = []
+    for n, stage in enumerate(stages):
+        assert isinstance(stage, TranslateFilter)
+        table = dict(sorted(stage.table.items()))
+        pattern = "[" + "".join(re.escape(chr(c)) for c in table) + "]"
+        parts.append(
+            f"\n_TABLE_{n} = {table!r}\n"
+            f"_NEEDS_{n} = re.compile({pattern!r}).search\n"
+            f"\n\ndef _escape_{n}(text):\n"
+            f"    return text.translate(_TABLE_{n}) if _NEEDS_{n}(text) else text\n"
+        )
+        calls.append(f"_escape_{n}")
+    parts.append(_WALK)
+    single = ["\n\ndef apply_security_filters(data):\n"]
+    many = ["\n\ndef apply_many(values):\n"]
+    for call in calls:
+        single.append(f"    data = {call}(data) if type(data) is str else _walk(data, {call})\n")
+        many.append(f"    values = [{call}(v) if type(v) is str else _walk(v, {call}) for v in values]\n")
+    single.append("    return data\n")
+    many.append("    return list(values)\n")
+    parts.extend(single)
+    parts.extend(many)
+    parts.append(_FOOTER)
+    return "".join(parts)
+
+
+def existing_digest(path: Path) -> str:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            for _ in range(10):
+                line = fh.readline()
+                if line.startswith(DIGEST_PREFIX):
+                    return line[len(DIGEST_PREFIX):].strip()
+    except OSError:
+        pass
+    return ""
+
+
+def _import_seconds(package_dir: Path, repeat: int) -> float:
+    """Best cold import time of package_dir's filter_manager, each in a fresh interpreter."""
+    code = (
+        "import sys, time; sys.path.insert(0, sys.argv[1]); t = time.perf_counter(); "
+        "import security_filters.filter_manager as m; m.get_filter_manager(); "
+        "print(time.perf_counter() - t)"
+    )
+    env = dict(os.environ, PYTHONPATH=str(Path(os.path.abspath(__file__)).parent.parent), PYTHONDONTWRITEBYTECODE="1")
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", code, str(package_dir)],
+            capture_output=True, text=True, check=True,
+            env=env,
+        )
+        times.append(float(out.stdout.strip()))
+    return min(times)
+
+
+def benchmark(stages: Sequence[BaseFilter], payload: Any, number: int = 20000, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """Cold import time and per-call cost of the generated bootstrap vs the legacy one."""
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, source in (("legacy", LEGACY_BOOTSTRAP), ("generated", render_bootstrap(stages))):
+            root = Path(tmp) / label
+            pkg = root / "security_filters"
+            pkg.mkdir(parents=True)
+            (pkg / "__init__.py").write_text("", encoding="utf-8")
+            (pkg / "filter_manager.py").write_text(source, encoding="utf-8")
+            spec = importlib.util.spec_from_file_location(f"_sqlbase_bench_{label}", pkg / "filter_manager.py")
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            call = module.apply_security_filters
+            call(payload)
+            per_call = min(timeit.repeat(lambda: call(payload), number=number, repeat=repeat)) / number
+            results[label] = {
+                "import_ms": round(_import_seconds(root, repeat) * 1000, 2),
+                "call_us": round(per_call * 1e6, 2),
+            }
+    return results
@@ -0,0 +1,80 @@
+"""
+Persistent incremental scan cache (SQLite). Cross-platform.
+Entries are keyed by path + size + mtime, with a content hash as fallback, and
+are dropped automatically when the scanner's rule-set fingerprint changes.
+"""
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CACHE_FILE_NAME = "scan-cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    findings TEXT NOT NULL,
+    errors TEXT NOT NULL
+);
+"""
+
+# (findings, errors) as stored for one file
+CachedResult = Tuple[List[Dict[str, Any]], List[Dict[str, str]]]
+
+
+class ScanCache:
+    def __init__(self, cache_dir: str | Path, fingerprint: str) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.fingerprint = fingerprint
+        self.conn = sqlite3.connect(str(self.cache_dir / CACHE_FILE_NAME), timeout=30)
+        self.conn.executescript(_SCHEMA)
+        self.stats = {"hits": 0, "hash_hits": 0, "misses": 0}
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if row is None or row[0] != fingerprint:
+            with self.conn:
+                self.conn.execute("DELETE FROM files")
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,)
+                )
+
+    def lookup(self, path: str, size: int, mtime_ns: int) -> Tuple[Optional[CachedResult], Optional[str]]:
+        """
+        Return (cached result, None) when size and mtime are unchanged. Otherwise
+        return (None, digest of the last scanned content) so the caller can
+        revalidate by hashing; the digest is None for files never seen.
+        """
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, digest, findings, errors FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return None, None
+        if row[0] == size and row[1] == mtime_ns:
+            self.stats["hits"] += 1
+            return (json.loads(row[3]), json.loads(row[4])), None
+        return None, row[2] if row[0] == size else None
+
+    def cached(self, path: str) -> CachedResult:
+        row = self.conn.execute("SELECT findings, errors FROM files WHERE path = ?", (path,)).fetchone()
+        return json.loads(row[0]), json.loads(row[1])
+
+    def store_many(self, rows: Iterable[Tuple[str, int, int, str, List[Dict[str, Any]], List[Dict[str, str]]]]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest, findings, errors) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (path, size, mtime_ns, digest, json.dumps(findings), json.dumps(errors))
+                    for path, size, mtime_ns, digest, findings, errors in rows
+                ),
+            )
+
+    def summary(self) -> str:
+        s = self.stats
+        return f"cache: {s['hits']} hits, {s['hash_hits']} revalidated by hash, {s['misses']} misses"
+
+    def close(self) -> None:
+        self.conn.close()
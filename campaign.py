@@ -0,0 +1,111 @@
+"""
+Campaign runner for the dynamic tester: endpoints from a spec file, results
+streamed to NDJSON as they complete. The results file doubles as the
+checkpoint, so a resumed run skips endpoints already recorded; endpoints
+whose requests failed are recorded with their error count and tested again.
+Cross-platform.
+"""
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, TextIO
+
+from sqlbase.tester import DynamicSQLiTester
+
+
+def _normalize(item: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(item, dict):
+        raise ValueError(f"Endpoint spec is not an object: {item!r}")
+    endpoint = item.get("url") or item.get("endpoint")
+    if not endpoint:
+        raise ValueError(f"Endpoint spec without url: {item!r}")
+    return {
+        "endpoint": str(endpoint),
+        "method": str(item.get("method", "POST")).upper(),
+        "params": {str(k): str(v) for k, v in (item.get("params") or {}).items()},
+        "headers": item.get("headers"),
+    }
+
+
+def load_spec(path: str | Path) -> List[Dict[str, Any]]:
+    """Read endpoint specs from a JSON array or NDJSON file of {"url", "method", "params", "headers"}."""
+    text = Path(path).read_text(encoding="utf-8")
+    if text.lstrip().startswith("["):
+        items = json.loads(text)
+    else:
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [_normalize(item) for item in items]
+
+
+def endpoint_key(spec: Dict[str, Any]) -> str:
+    raw = json.dumps([spec["method"], spec["endpoint"], sorted(spec["params"].items())])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def read_checkpoint(path: str | Path) -> Set[str]:
+    """Keys already in a results file. A torn last line from an interrupted run is cut off."""
+    path = Path(path)
+    if not path.is_file():
+        return set()
+    done: Set[str] = set()
+    with open(path, "rb+") as fh:
+        data = fh.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            fh.truncate(end)
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+            # Endpoints whose requests failed were not fully tested: run them again.
+            if not record.get("errors"):
+                done.add(record["key"])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+    return done
+
+
+def run_campaign(
+    tester: DynamicSQLiTester, specs: List[Dict[str, Any]], out: TextIO, done: Optional[Set[str]] = None
+) -> Dict[str, Any]:
+    """Test every spec not in `done`, writing one NDJSON record per endpoint as it finishes."""
+    done = done or set()
+    specs = [_normalize(spec) for spec in specs]
+    keyed = [(endpoint_key(spec), spec) for spec in specs]
+    pending = [(key, spec) for key, spec in keyed if key not in done]
+    stats: Dict[str, Any] = {
+        "endpoints": len(specs),
+        "resumed": len(specs) - len(pending),
+        "tested": 0,
+        "vulnerable": 0,
+        "findings": 0,
+        "errored": 0,
+    }
+    start = time.perf_counter()
+    for index, findings, errors in tester.iter_test_endpoints(spec for _key, spec in pending):
+        key, spec = pending[index]
+        record = {
+            "key": key,
+            "endpoint": tester.resolve_url(spec["endpoint"]),
+            "method": spec["method"],
+            "vulnerable": bool(findings),
+            "findings": findings,
+            "errors": errors,
+        }
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+        stats["tested"] += 1
+        stats["vulnerable"] += bool(findings)
+        stats["findings"] += len(findings)
+        stats["errored"] += bool(errors)
+    elapsed = time.perf_counter() - start
+    requests_sent = tester.stats["requests"] + tester.stats["baseline_requests"]
+    answered = requests_sent - tester.stats["errors"]
+    stats.update({
+        "requests": requests_sent,
+        "request_errors": tester.stats["errors"],
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(answered / elapsed, 1) if elapsed else 0.0,
+        "endpoints_per_min": round(stats["tested"] * 60 / elapsed, 1) if elapsed else 0.0,
+    })
+    return stats
@@ -0,0 +1,86 @@
+"""
+Thin client for the scan daemon ('serve'). Imports only the standard library,
+so a call costs an interpreter start plus one localhost round trip; when no
+daemon is running (no state file, or nothing listening at its address) the
+request is served in-process instead. Cross-platform.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+STATE_ENV = "SQLBASE_SERVE_STATE"
+
+
+class DaemonUnavailable(Exception):
+    pass
+
+
+class DaemonError(Exception):
+    pass
+
+
+def default_state_path() -> Path:
+    """Where 'serve' records its address and token: $SQLBASE_SERVE_STATE or ~/.cache/sqlbase/serve.json."""
+    env = os.environ.get(STATE_ENV)
+    if env:
+        return Path(env)
+    return Path.home() / ".cache" / "sqlbase" / "serve.json"
+
+
+def read_state(path: Optional[str | Path] = None) -> Optional[Dict[str, Any]]:
+    try:
+        state = json.loads(Path(path or default_state_path()).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) and "url" in state and "token" in state else None
+
+
+def request(
+    op: str, payload: Optional[Dict[str, Any]] = None, state_path: Optional[str | Path] = None, timeout: float = 300.0
+) -> Dict[str, Any]:
+    """
+    Send one request to the daemon (a GET when payload is None). Raises
+    DaemonUnavailable when there is no daemon to talk to and DaemonError when
+    it rejects or fails the request, drops the connection or times out.
+    """
+    state = read_state(state_path)
+    if state is None:
+        raise DaemonUnavailable("no daemon state file")
+    req = Request(
+        f"{state['url']}/{op}",
+        data=None if payload is None else json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json", "Authorization": f"Bearer {state['token']}"},
+        method="GET" if payload is None else "POST",
+    )
+    try:
+        with urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read())
+    except HTTPError as e:
+        try:
+            message = json.loads(e.read()).get("error", e.reason)
+        except ValueError:
+            message = e.reason
+        raise DaemonError(f"{e.code}: {message}") from None
+    except (URLError, OSError) as e:
+        reason = e.reason if isinstance(e, URLError) else e
+        if isinstance(reason, ConnectionRefusedError):
+            # Stale state file: the daemon is gone.
+            raise DaemonUnavailable(str(reason)) from None
+        # A daemon that took the request may still be running it: running it again here could double the work.
+        raise DaemonError(f"daemon did not answer: {reason or type(e).__name__}") from None
+
+
+def call(
+    op: str, payload: Dict[str, Any], state_path: Optional[str | Path] = None, fallback: bool = True
+) -> Tuple[Dict[str, Any], str]:
+    """Result of op from the daemon, else (with fallback) computed in-process; also says which served it."""
+    try:
+        return request(op, payload, state_path), "daemon"
+    except DaemonUnavailable:
+        if not fallback:
+            raise
+    from sqlbase.daemon import ScanService
+    return ScanService().handle(op, payload), "local"
@@ -0,0 +1,198 @@
+"""
+Long-lived scan daemon: compiled rules, the loaded model, the remediation
+knowledge base and the scan cache stay warm across requests. Listens on
+localhost HTTP; clients authenticate with a token from the state file, which
+is readable by the owner only. Cross-platform.
+Routes: POST /scan, /predict, /remediate (JSON in and out), POST /shutdown, GET /status.
+"""
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlbase.cache import ScanCache
+from sqlbase.client import default_state_path
+from sqlbase.predictor import VulnerabilityPredictor, count_features, universal_newlines
+from sqlbase.remediation import RemediationKnowledgeBase
+from sqlbase.scanner import SQLInjectionScanner
+
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+class ScanService:
+    """The operations behind the daemon, also run in-process by the client's fallback."""
+
+    OPS = ("scan", "predict", "remediate")
+
+    def __init__(
+        self,
+        scanner: Optional[SQLInjectionScanner] = None,
+        predictor: Optional[VulnerabilityPredictor] = None,
+        kb: Optional[RemediationKnowledgeBase] = None,
+        cache: Optional[ScanCache] = None,
+        jobs: int = 1,
+    ) -> None:
+        self.scanner = scanner or SQLInjectionScanner()
+        self.predictor = predictor or VulnerabilityPredictor()
+        self.kb = kb or RemediationKnowledgeBase()
+        self.cache = cache
+        self.jobs = jobs
+
+    def warm(self) -> None:
+        self.scanner.rules
+        self.predictor.model
+
+    def handle(self, op: str, req: Dict[str, Any]) -> Dict[str, Any]:
+        if op not in self.OPS:
+            raise ValueError(f"Unknown operation: {op}")
+        return getattr(self, op)(req)
+
+    def scan(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        """{"paths": [...]} (files or directories) or {"text": ..., "name": ...} for an unsaved buffer."""
+        findings: List[Dict[str, Any]] = []
+        errors: List[Dict[str, str]] = []
+        if "text" in req:
+            name = str(req.get("name") or "<buffer>")
+            findings = self.scanner.scan_text(str(req["text"]), name=name, errors=errors)
+            for v in findings:
+                v["file"] = name
+            return {"findings": findings, "errors": errors}
+        paths = req.get("paths")
+        if not isinstance(paths, list) or not paths:
+            raise ValueError('scan needs "paths" or "text"')
+        for path in paths:
+            if not Path(path).exists():
+                errors.append({"file": str(path), "kind": "read", "error": "No such file or directory"})
+                continue
+            findings.extend(self.scanner.iter_scan(path, jobs=self.jobs, cache=self.cache))
+            errors.extend(self.scanner.errors)
+        return {"findings": findings, "errors": errors}
+
+    def predict(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        """{"path": ...} or {"text": ..., "name": ...}; optional "per_file" and "top"."""
+        per_file, top = bool(req.get("per_file")), req.get("top")
+        if "text" in req:
+            # As predict_vulnerability_likelihood reads files: CRLF buffers count like saved ones.
+            counts = count_features(universal_newlines(str(req["text"])))
+            return self.predictor.predict_from_counts([(str(req.get("name") or "<buffer>"), counts)], per_file, top)
+        if "path" not in req:
+            raise ValueError('predict needs "path" or "text"')
+        return self.predictor.predict_vulnerability_likelihood(Path(req["path"]), per_file=per_file, top=top)
+
+    def remediate(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        return self.kb.get_remediation(str(req.get("type", "")), str(req.get("language", "")))
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "ScanDaemon"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        given = self.headers.get("Authorization", "")
+        return hmac.compare_digest(given.encode("utf-8"), f"Bearer {self.server.token}".encode("utf-8"))
+
+    def do_GET(self) -> None:
+        if not self._authorized():
+            self._send(401, {"error": "bad token"})
+        elif self.path == "/status":
+            self._send(200, self.server.status())
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        # Unread bodies would be parsed as the next request: close after rejecting one.
+        if not self._authorized():
+            self.close_connection = True
+            self._send(401, {"error": "bad token"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self._send(413, {"error": f"request larger than {MAX_REQUEST_BYTES} bytes"})
+            return
+        body = self.rfile.read(length)
+        op = self.path.strip("/")
+        if op == "shutdown":
+            self._send(200, {"stopping": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        try:
+            req = json.loads(body or b"{}")
+            if not isinstance(req, dict):
+                raise ValueError("request body must be a JSON object")
+            result = self.server.service.handle(op, req)
+        except ValueError as e:
+            self._send(404 if op not in ScanService.OPS else 400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self.server.requests += 1
+        self._send(200, result)
+
+
+class ScanDaemon(HTTPServer):
+    """
+    Serves one request at a time, so the scanner, predictor and cache are
+    never shared between threads; a directory scan still uses service.jobs
+    worker processes.
+    """
+
+    def __init__(self, service: ScanService, host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__((host, port), DaemonHandler)
+        self.service = service
+        self.token = secrets.token_hex(16)
+        self.started = time.time()
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "url": self.url,
+            "uptime": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "fingerprint": self.service.scanner.fingerprint(),
+            "model": type(self.service.predictor.model).__name__,
+            "cache": self.service.cache.summary() if self.service.cache is not None else None,
+        }
+
+    def write_state(self, path: Optional[str | Path] = None) -> Path:
+        """Record url and token for clients, readable by the owner only."""
+        path = Path(path or default_state_path())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"url": self.url, "token": self.token, "pid": os.getpid()}, fh)
+        os.replace(tmp, path)
+        return path
+
+    @staticmethod
+    def remove_state(path: Path, token: str) -> None:
+        """Remove the state file unless another daemon has taken it over since."""
+        try:
+            if json.loads(path.read_text(encoding="utf-8")).get("token") == token:
+                path.unlink()
+        except (OSError, ValueError):
+            pass
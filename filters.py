@@ -1,8 +1,16 @@
 """
 Security filter stubs for intercepting filter pattern. Cross-platform.
+Character-replacement filters are compiled to str.translate tables; consecutive
+ones fuse into a single table, so a payload is walked once for the whole chain.
+Values a filter does not change are returned as-is, not copied.
 """
+import re
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from operator import is_not
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Transform = Callable[[str], str]
 
 
 class BaseFilter(ABC):
@@ -14,52 +22,153 @@ class BaseFilter(ABC):
     def name(self) -> str:
         pass
 
+    def apply_many(self, values: Iterable[Any]) -> List[Any]:
+        """apply() to each value of a batch (a list or a column of values)."""
+        return [self.apply(v) for v in values]
+
+
+def map_strings(data: Any, transform: Transform) -> Any:
+    """
+    Apply transform to every str in nested dicts (values), lists and tuples.
+    Containers are rebuilt only when something inside them changed.
+    """
+    if isinstance(data, str):
+        return transform(data)
+    if isinstance(data, dict):
+        values = [transform(v) if type(v) is str else map_strings(v, transform) for v in data.values()]
+        if not any(map(is_not, values, data.values())):
+            return data
+        return dict(zip(data.keys(), values))
+    if isinstance(data, (list, tuple)):
+        items = [transform(x) if type(x) is str else map_strings(x, transform) for x in data]
+        if not any(map(is_not, items, data)):
+            return data
+        return type(data)(items)
+    return data
+
+
+def _compile_table(table: Dict[int, str], memo_size: int = 0) -> Tuple[Transform, Optional[Any]]:
+    """
+    str.translate behind a character-class search, so untouched strings are
+    returned as-is. With memo_size, translated strings go through a bounded
+    LRU memo, which is returned alongside for its cache_info().
+    """
+    if not table:
+        return (lambda text: text), None
+    needs = re.compile("[" + "".join(re.escape(chr(c)) for c in sorted(table)) + "]").search
+
+    def convert(text: str) -> str:
+        return text.translate(table)
+
+    memo = lru_cache(maxsize=memo_size)(convert) if memo_size else None
+    convert = memo or convert
+
+    def transform(text: str) -> str:
+        return convert(text) if needs(text) else text
+
+    return transform, memo
+
+
+class TranslateFilter(BaseFilter):
+    """
+    A filter made of single-character replacements applied in order. Such a
+    chain maps each character independently, so it equals one translate table.
+    """
+
+    replacements: Sequence[Tuple[str, str]] = ()
+
+    def __init__(self, memo_size: int = 0) -> None:
+        self.table = self.build_table()
+        self.transform, self.memo = _compile_table(self.table, memo_size)
+
+    def build_table(self) -> Dict[int, str]:
+        table: Dict[int, str] = {}
+        for char, _new in self.replacements:
+            out = char
+            for old, new in self.replacements:
+                out = out.replace(old, new)
+            if out != char:
+                table[ord(char)] = out
+        return table
+
+    def apply(self, data: Any) -> Any:
+        return map_strings(data, self.transform)
+
+    def apply_many(self, values: Iterable[Any]) -> List[Any]:
+        transform = self.transform
+        return [transform(v) if type(v) is str else map_strings(v, transform) for v in values]
+
+    def memo_stats(self) -> Optional[Dict[str, Any]]:
+        if self.memo is None:
+            return None
+        info = self.memo.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SQLInjectionFilter(TranslateFilter):
+    replacements = (("'", "''"), ("\\", "\\\\"))
 
-class SQLInjectionFilter(BaseFilter):
     def name(self) -> str:
         return "SQLi"
 
-    def apply(self, data: Any) -> Any:
-        if isinstance(data, str):
-            return data.replace("'", "''").replace("\\", "\\\\")
-        if isinstance(data, dict):
-            return {k: self.apply(v) for k, v in data.items()}
-        if isinstance(data, (list, tuple)):
-            return type(data)(self.apply(x) for x in data)
-        return data
 
+class XSSFilter(TranslateFilter):
+    replacements = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;"))
 
-class XSSFilter(BaseFilter):
     def name(self) -> str:
         return "XSS"
 
-    def apply(self, data: Any) -> Any:
-        if isinstance(data, str):
-            return (
-                data.replace("&", "&amp;")
-                .replace("<", "&lt;")
-                .replace(">", "&gt;")
-                .replace('"', "&quot;")
-                .replace("'", "&#x27;")
-            )
-        if isinstance(data, dict):
-            return {k: self.apply(v) for k, v in data.items()}
-        if isinstance(data, (list, tuple)):
-            return type(data)(self.apply(x) for x in data)
-        return data
-
-
-class CommandInjectionFilter(BaseFilter):
+
+class CommandInjectionFilter(TranslateFilter):
+    replacements = tuple((char, "") for char in [";", "|", "&", "$", "`", "\n", "\r"])
+
     def name(self) -> str:
         return "CommandInjection"
 
-    def apply(self, data: Any) -> Any:
-        if isinstance(data, str):
-            for char in [";", "|", "&", "$", "`", "\n", "\r"]:
-                data = data.replace(char, "")
-            return data
-        if isinstance(data, dict):
-            return {k: self.apply(v) for k, v in data.items()}
-        if isinstance(data, (list, tuple)):
-            return type(data)(self.apply(x) for x in data)
-        return data
+
+class FusedFilter(TranslateFilter):
+    """Several TranslateFilters run back to back, as a single composed table."""
+
+    def __init__(self, filters: Sequence[TranslateFilter], memo_size: int = 0) -> None:
+        self.filters = list(filters)
+        super().__init__(memo_size)
+
+    def build_table(self) -> Dict[int, str]:
+        chars = {c for f in self.filters for c in f.table}
+        table: Dict[int, str] = {}
+        for c in chars:
+            out = chr(c)
+            for f in self.filters:
+                out = out.translate(f.table)
+            if out != chr(c):
+                table[c] = out
+        return table
+
+    def name(self) -> str:
+        return "+".join(f.name() for f in self.filters)
+
+
+def fuse(filters: Iterable[BaseFilter], memo_size: int = 0) -> List[BaseFilter]:
+    """
+    One stage per run of consecutive TranslateFilters (a FusedFilter: one
+    table, one traversal) and one per other filter, to be applied in order.
+    """
+    stages: List[BaseFilter] = []
+    run: List[TranslateFilter] = []
+    for f in list(filters) + [None]:
+        if isinstance(f, TranslateFilter):
+            run.append(f)
+            continue
+        if run:
+            stages.append(FusedFilter(run, memo_size))
+            run = []
+        if f is not None:
+            stages.append(f)
+    return stages
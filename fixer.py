@@ -1,11 +1,87 @@
 """
 SQL injection code fixer. Supports Java and Python. Cross-platform.
+Batch mode fixes scanner findings file by file: each file is read once and
+only its flagged lines are rewritten; files are processed in parallel.
 """
+import difflib
+import os
 import re
-from typing import Optional
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlbase.remediation import language_for_path
+
+SUPPORTED_LANGUAGES = ("java", "python")
+
+# Pattern: String sql = "SELECT ..." + userInput;
+_JAVA_ASSIGN_RE = re.compile(
+    r'^([ \t]*)(String\s+)?(\w+)\s*=\s*"(SELECT\s+[^"]*?)\s*"\s*\+\s*(\w+)\s*;', re.IGNORECASE | re.MULTILINE
+)
+_JAVA_ASSIGN_SUB = (
+    r'\1\2\3 = "\4 ?";\n'
+    r'\1PreparedStatement stmt = conn.prepareStatement(\3);\n'
+    r'\1stmt.setString(1, \5);'
+)
+# Also: String sql = "SELECT ... '" + var + "' ...";
+_JAVA_INFIX_RE = re.compile(
+    r'^([ \t]*)(String\s+)?(\w+)\s*=\s*"(SELECT\s+[^"]*?)\'?"\s*\+\s*(\w+)\s*\+\s*"\'?([^"]*)"\s*;',
+    re.IGNORECASE | re.MULTILINE,
+)
+_JAVA_INFIX_SUB = (
+    r'\1\2\3 = "\4?\6";\n'
+    r'\1PreparedStatement stmt = conn.prepareStatement(\3);\n'
+    r'\1stmt.setString(1, \5);'
+)
+# What the scanner flags: stmt.execute("SELECT ... '" + id + "'"); and
+# conn.createStatement().executeQuery(...), optionally assigned.
+_JAVA_CALL_RE = re.compile(
+    r'^(?P<indent>[ \t]*)(?P<assign>(?:[\w<>\[\]]+\s+)?\w+\s*=\s*)?'
+    r'(?P<recv>\w+(?:\.\w+)*?)(?P<create>\.createStatement\(\s*\))?'
+    r'\.(?P<method>execute|executeQuery|executeUpdate)\s*\(\s*'
+    r'"(?P<head>[^"]*?)\'?"\s*\+\s*(?P<arg>\w+(?:\.\w+)*(?:\(\))?)\s*(?:\+\s*"\'?(?P<tail>[^"]*)"\s*)?\)\s*;',
+    re.MULTILINE,
+)
+# cursor.execute("SELECT ... " + user_id)
+_PY_CONCAT_RE = re.compile(r'\.(execute|executemany)\s*\(\s*(["\'])([^"\']*?)\2\s*\+\s*(\w+)\s*\)')
+_PY_CONCAT_SUB = r'.\1("\3%s", (\4,))'
+# cursor.execute("SELECT ... %s" % user_id) -> parameterized
+_PY_PERCENT_RE = re.compile(r'\.(execute|executemany)\s*\(\s*(["\'])([^"\']*?)\2\s*%\s*(\w+)\s*\)')
+_PY_PERCENT_SUB = r'.\1("\3", (\4,))'
+# f"SELECT ... {var}"
+_PY_FSTRING_RE = re.compile(r'\.(execute|executemany)\s*\(\s*f(["\'])([^"\'{}]*)\{(\w+)\}([^"\'{}]*)\2\s*\)')
+_PY_FSTRING_SUB = r'.\1("\3%s\5", (\4,))'
+
+
+class FixResult(NamedTuple):
+    file: str
+    language: Optional[str]
+    original: Optional[str]
+    fixed: Optional[str]
+    error: Optional[str]
+    rejected: Optional[str] = None  # why a rewrite was discarded
+
+    @property
+    def changed(self) -> bool:
+        return self.fixed is not None and self.fixed != self.original
 
 
 class SqliCodeFixer:
+    def __init__(self) -> None:
+        self.statements = 0  # PreparedStatements introduced so far, for unique names
+
+    def _java_call(self, m: "re.Match[str]") -> str:
+        self.statements += 1
+        ps = f"ps{self.statements}"
+        conn = m["recv"] if m["create"] else f"{m['recv']}.getConnection()"
+        indent = m["indent"]
+        return (
+            f'{indent}PreparedStatement {ps} = {conn}.prepareStatement("{m["head"]}?{m["tail"] or ""}");\n'
+            f"{indent}{ps}.setObject(1, {m['arg']});\n"
+            f"{indent}{m['assign'] or ''}{ps}.{m['method']}();"
+        )
+
     def fix_concatenation(self, code_snippet: str, language: str) -> str:
         language = (language or "").strip().lower()
         if language == "java":
@@ -15,37 +91,180 @@ class SqliCodeFixer:
         return code_snippet
 
     def fix_java_sqli(self, code: str) -> str:
-        # Pattern: String sql = "SELECT ..." + userInput;
-        pattern = r'(\w+)\s*=\s*["\'](SELECT\s+.*?)["\']\s*\+\s*(\w+)'
-        replacement = (
-            r'String \1 = "\2 ?";\n'
-            r'PreparedStatement stmt = conn.prepareStatement(\1);\n'
-            r'stmt.setString(1, \3);'
-        )
-        result = re.sub(pattern, replacement, code, flags=re.IGNORECASE)
-        # Also: "SELECT ..." + var + " ..."
-        pattern2 = r'["\'](SELECT\s+.*?)\s*\+\s*(\w+)\s*\+\s*["\'](.*?)["\']'
-        if not re.search(pattern2, result, re.IGNORECASE):
-            return result
-        result = re.sub(
-            pattern2,
-            r'"\1 ? \3"; PreparedStatement stmt = conn.prepareStatement(sql); stmt.setString(1, \2);',
-            result,
-            flags=re.IGNORECASE,
-        )
-        return result
+        result = _JAVA_CALL_RE.sub(self._java_call, code)
+        # Infix first: the assignment pattern would take its leading half.
+        result = _JAVA_INFIX_RE.sub(_JAVA_INFIX_SUB, result)
+        return _JAVA_ASSIGN_RE.sub(_JAVA_ASSIGN_SUB, result)
 
     def fix_python_sqli(self, code: str) -> str:
-        # cursor.execute("SELECT ... " + user_id)
-        pattern = r'\.(execute|executemany)\s*\(\s*["\']([^"\']*?)["\']\s*\+\s*(\w+)'
-        replacement = r'.\1("\2 %s", (\3,))'
-        result = re.sub(pattern, replacement, code)
-        # cursor.execute("SELECT ... %s" % user_id) -> parameterized
-        pattern2 = r'\.(execute|executemany)\s*\(\s*["\']([^"\']*?)["\']\s*%\s*(\w+)'
-        replacement2 = r'.\1("\2", (\3,))'
-        result = re.sub(pattern2, replacement2, result)
-        # f"SELECT ... {var}"
-        pattern3 = r'\.(execute|executemany)\s*\(\s*f["\']([^"\']*)\{(\w+)\}([^"\']*)["\']\s*\)'
-        replacement3 = r'.\1("\2%s\3", (\4,))'
-        result = re.sub(pattern3, replacement3, result)
-        return result
+        result = _PY_CONCAT_RE.sub(_PY_CONCAT_SUB, code)
+        result = _PY_PERCENT_RE.sub(_PY_PERCENT_SUB, result)
+        return _PY_FSTRING_RE.sub(_PY_FSTRING_SUB, result)
+
+    def fix_lines(self, text: str, ranges: Iterable[Tuple[int, int]], language: str) -> str:
+        """Rewrite only the given 1-based, inclusive line ranges of text."""
+        lines = text.splitlines(keepends=True)
+        out: List[str] = []
+        pos = 0
+        for start, end in merge_ranges(ranges):
+            start, end = max(start, pos + 1), min(end, len(lines))
+            if start > end:
+                continue
+            out.extend(lines[pos:start - 1])
+            out.append(self.fix_concatenation("".join(lines[start - 1:end]), language))
+            pos = end
+        out.extend(lines[pos:])
+        return "".join(out)
+
+    def fix_file(self, path: str | Path, ranges: Iterable[Tuple[int, int]]) -> FixResult:
+        """Read a file once and fix its flagged lines, with the language taken from the extension."""
+        language = language_for_path(path)
+        if language not in SUPPORTED_LANGUAGES:
+            return FixResult(str(path), language, None, None, None)
+        try:
+            with open(path, encoding="utf-8", newline="") as fh:
+                original = fh.read()
+        except (OSError, UnicodeDecodeError) as e:
+            return FixResult(str(path), language, None, None, str(e))
+        fixed = self.fix_lines(original, ranges, language)
+        if fixed != original:
+            problem = check_syntax(fixed, language, str(path))
+            if problem is not None:
+                return FixResult(str(path), language, original, None, None, f"rewrite does not parse: {problem}")
+        return FixResult(str(path), language, original, fixed, None)
+
+
+_JAVA_CLOSERS = {")": "(", "]": "[", "}": "{"}
+
+
+def _java_balance(code: str) -> Optional[str]:
+    """First unclosed or mismatched bracket, string or comment in Java source; None if balanced."""
+    stack: List[Tuple[str, int]] = []
+    line, i, n = 1, 0, len(code)
+    while i < n:
+        c = code[i]
+        if c == "\n":
+            line += 1
+        elif code.startswith("//", i):
+            i = code.find("\n", i)
+            i = n if i < 0 else i
+            continue
+        elif code.startswith("/*", i) or code.startswith('"""', i):
+            close = "*/" if c == "/" else '"""'
+            j = code.find(close, i + len(close))
+            if j < 0:
+                return f"unterminated {'comment' if c == '/' else 'text block'} at line {line}"
+            line += code.count("\n", i, j)
+            i = j + len(close)
+            continue
+        elif c in "\"'":
+            j = i + 1
+            while j < n and code[j] not in (c, "\n"):
+                j += 2 if code[j] == "\\" else 1
+            if j >= n or code[j] != c:
+                return f"unterminated literal at line {line}"
+            i = j + 1
+            continue
+        elif c in "([{":
+            stack.append((c, line))
+        elif c in _JAVA_CLOSERS:
+            if not stack or stack[-1][0] != _JAVA_CLOSERS[c]:
+                return f"unmatched {c!r} at line {line}"
+            stack.pop()
+        i += 1
+    if stack:
+        return f"unclosed {stack[-1][0]!r} from line {stack[-1][1]}"
+    return None
+
+
+def check_syntax(code: str, language: str, name: str = "<fixed>") -> Optional[str]:
+    """
+    Why fixed code is not valid, or None. Python is compiled; Java, with no
+    compiler at hand, gets its brackets, strings and comments balanced.
+    """
+    if language == "python":
+        try:
+            compile(code, name, "exec", dont_inherit=True)
+        except SyntaxError as e:
+            return f"{e.msg} at line {e.lineno}"
+        except ValueError as e:
+            return str(e)
+        return None
+    if language == "java":
+        return _java_balance(code)
+    return None
+
+
+def merge_ranges(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def group_findings(findings: Iterable[Dict[str, Any]]) -> Dict[str, List[Tuple[int, int]]]:
+    """Flagged line ranges per file, files in path order."""
+    by_file: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    for f in findings:
+        line = int(f["line"])
+        by_file[f["file"]].append((line, int(f.get("end_line", line))))
+    return dict(sorted(by_file.items()))
+
+
+def _fix_one(item: Tuple[str, List[Tuple[int, int]]]) -> FixResult:
+    return SqliCodeFixer().fix_file(*item)
+
+
+def fix_findings(findings: Iterable[Dict[str, Any]], jobs: int = 1) -> Iterator[FixResult]:
+    """Fix every file named in findings, yielding results in path order."""
+    items = list(group_findings(findings).items())
+    if jobs <= 1 or len(items) < 2:
+        yield from map(_fix_one, items)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(_fix_one, items, chunksize=max(1, len(items) // (jobs * 4)))
+
+
+def _diff_lines(text: str) -> List[str]:
+    # Split on "\n" only, as patch does; the last line may lack its newline.
+    lines = [line + "\n" for line in text.split("\n")]
+    lines[-1] = lines[-1][:-1]
+    return lines if lines[-1] else lines[:-1]
+
+
+def diff_root(files: Iterable[str]) -> Path:
+    """Deepest directory holding all files: diff paths are relative to it, for patch -p1 run there."""
+    dirs = [os.path.dirname(os.path.abspath(f)) for f in files]
+    return Path(os.path.commonpath(dirs)) if dirs else Path.cwd()
+
+
+def _diff_name(file: str, root: Optional[Path] = None) -> str:
+    path = Path(os.path.abspath(file))
+    for base in (root, Path.cwd()):
+        if base is not None:
+            try:
+                return path.relative_to(os.path.abspath(base)).as_posix()
+            except ValueError:
+                pass
+    return path.as_posix().lstrip("/")
+
+
+def unified_diff(result: FixResult, root: Optional[Path] = None) -> str:
+    """Diff of one fixed file, with paths relative to root (default: the current directory)."""
+    if not result.changed:
+        return ""
+    name = _diff_name(result.file, root)
+    out: List[str] = []
+    for line in difflib.unified_diff(
+        _diff_lines(result.original), _diff_lines(result.fixed), fromfile=f"a/{name}", tofile=f"b/{name}"
+    ):
+        out.append(line if line.endswith("\n") else line + "\n\\ No newline at end of file\n")
+    return "".join(out)
+
+
+def write_fixed(result: FixResult) -> None:
+    with open(result.file, "w", encoding="utf-8", newline="") as fh:
+        fh.write(result.fixed)
@@ -0,0 +1,104 @@
+"""
+Versioned model artifacts and pure-NumPy random-forest inference. Cross-platform.
+A fitted scikit-learn forest is exported once to an .npz file of flat tree
+arrays; loading and predicting from it needs NumPy only, never sklearn.
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+ARTIFACT_VERSION = 1
+
+
+class ModelArtifactError(ValueError):
+    pass
+
+
+def export_forest(clf: Any, path: str | Path, feature_names: Sequence[str] = ()) -> Path:
+    """Write the trees of a fitted RandomForestClassifier to a versioned .npz artifact."""
+    import numpy as np
+
+    roots: List[int] = []
+    left, right, feature, threshold, value = [], [], [], [], []
+    offset = 0
+    for estimator in clf.estimators_:
+        tree = estimator.tree_
+        roots.append(offset)
+        leaf = tree.children_left < 0
+        left.append(np.where(leaf, -1, tree.children_left + offset))
+        right.append(np.where(leaf, -1, tree.children_right + offset))
+        feature.append(np.where(leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        counts = tree.value[:, 0, :].astype(np.float64)
+        value.append(counts / counts.sum(axis=1, keepdims=True))
+        offset += tree.node_count
+    path = Path(path)
+    with open(path, "wb") as fh:
+        np.savez_compressed(
+            fh,
+            format_version=np.array(ARTIFACT_VERSION),
+            roots=np.array(roots, dtype=np.int64),
+            left=np.concatenate(left).astype(np.int64),
+            right=np.concatenate(right).astype(np.int64),
+            feature=np.concatenate(feature).astype(np.int64),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            value=np.concatenate(value),
+            classes=np.asarray(clf.classes_),
+            n_features=np.array(int(clf.n_features_in_)),
+            feature_names=np.array(list(feature_names), dtype=str),
+        )
+    return path
+
+
+class ForestModel:
+    """
+    predict_proba() over exported tree arrays. All trees and samples advance
+    one level per step, so the Python loop runs max-depth times, not per node.
+    """
+
+    def __init__(self, arrays: Dict[str, Any]) -> None:
+        import numpy as np
+
+        self._np = np
+        self.roots = arrays["roots"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.value = arrays["value"]
+        self.classes_ = arrays["classes"]
+        self.n_features_in_ = int(arrays["n_features"])
+        self.feature_names = [str(n) for n in arrays.get("feature_names", [])]
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ForestModel":
+        import numpy as np
+
+        try:
+            with np.load(str(path), allow_pickle=False) as data:
+                arrays = {key: data[key] for key in data.files}
+        except (OSError, ValueError) as e:
+            raise ModelArtifactError(f"Cannot read model artifact {path}: {e}") from e
+        version = int(arrays.get("format_version", -1))
+        if version != ARTIFACT_VERSION:
+            raise ModelArtifactError(
+                f"Model artifact {path} has format version {version}, expected {ARTIFACT_VERSION}"
+            )
+        return cls(arrays)
+
+    def predict_proba(self, X: Any) -> Any:
+        np = self._np
+        # sklearn compares float32 features against float64 thresholds.
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+        rows = np.arange(X.shape[0])[None, :]
+        nodes = np.repeat(self.roots[:, None], X.shape[0], axis=1)
+        while True:
+            left = self.left[nodes]
+            leaf = left < 0
+            if leaf.all():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(leaf, nodes, np.where(go_left, left, self.right[nodes]))
+        return self.value[nodes].mean(axis=0)
+
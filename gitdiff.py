@@ -0,0 +1,243 @@
+"""
+Revision-aware scanning input: the files a commit range changed, read as blobs
+through one persistent `git cat-file --batch` process (no checkout), and the
+line ranges each diff added or modified. Line numbers are those of the new
+revision, counted as the scanner counts them. Cross-platform (needs git on PATH).
+"""
+import codecs
+import os
+import re
+import subprocess
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlbase.rules import LineIndex
+from sqlbase.walker import TreeWalker
+
+_HUNK_RE = re.compile(rb"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_NULL_SHA = "0" * 40
+# Regular files and executables; symlinks (120000) and submodules (160000) are not source.
+_FILE_MODES = ("100644", "100755")
+
+
+class GitError(RuntimeError):
+    pass
+
+
+class ChangedFile(NamedTuple):
+    path: str  # relative to the repository root, "/"-separated
+    status: str  # A, M, R, C, T
+    blob: str
+
+
+def _git(repo: str, *args: str) -> bytes:
+    try:
+        proc = subprocess.run(
+            ["git", "-C", repo, "-c", "core.quotepath=false", *args],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
+        )
+    except OSError as e:
+        raise GitError(f"cannot run git: {e}") from None
+    if proc.returncode != 0:
+        raise GitError(proc.stderr.decode("utf-8", errors="replace").strip() or f"git {args[0]} failed")
+    return proc.stdout
+
+
+def toplevel(repo: str) -> str:
+    return os.path.normpath(_git(repo, "rev-parse", "--show-toplevel").decode("utf-8").strip())
+
+
+def revision_range(since: Optional[str] = None, between: Optional[str] = None) -> str:
+    """--since REV means REV..HEAD; --between takes git's A..B (or A...B, from the merge base)."""
+    if between:
+        if ".." not in between:
+            raise ValueError(f"--between needs a range like A..B, got {between!r}")
+        return between
+    if since:
+        return f"{since}..HEAD"
+    raise ValueError("a revision range is required")
+
+
+def changed_files(repo: str, rev_range: str, extensions: Optional[Iterable[str]] = None) -> List[ChangedFile]:
+    """Files added, modified, renamed or copied in rev_range, in path order. Deletions are left out."""
+    exts = frozenset(extensions) if extensions is not None else None
+    fields = _git(repo, "diff", "--raw", "-z", "--no-abbrev", "-M", "--no-ext-diff", rev_range).split(b"\0")
+    changed: List[ChangedFile] = []
+    i = 0
+    while i < len(fields) - 1:
+        meta = fields[i].decode("ascii").lstrip(":").split()
+        i += 1
+        if len(meta) < 5:
+            continue
+        _old_mode, new_mode, _old_sha, new_sha, status = meta[:5]
+        if status[0] in "RC":
+            i += 1  # the old path comes first
+        path = fields[i].decode("utf-8", errors="surrogateescape")
+        i += 1
+        if status[0] == "D" or new_mode not in _FILE_MODES or new_sha == _NULL_SHA:
+            continue
+        if exts is not None and os.path.splitext(path)[1] not in exts:
+            continue
+        changed.append(ChangedFile(path, status[0], new_sha))
+    changed.sort()
+    return changed
+
+
+def _unquote(name: bytes) -> bytes:
+    # git C-quotes names with control characters, quotes or backslashes.
+    if name.startswith(b'"') and name.endswith(b'"'):
+        return codecs.escape_decode(name[1:-1])[0]
+    return name
+
+
+def changed_lines(repo: str, rev_range: str, paths: Iterable[str]) -> Dict[str, List[Tuple[int, int]]]:
+    """1-based inclusive line ranges of the new side that each diff added or modified."""
+    wanted = set(paths)
+    if not wanted:
+        return {}
+    # No pathspec: it would hide the old side of renames, turning them into additions.
+    # Explicit prefixes and no textconv, whatever diff.noprefix or the attributes say.
+    out = _git(
+        repo, "diff", "-U0", "--no-color", "--no-ext-diff", "--no-textconv",
+        "--src-prefix=a/", "--dst-prefix=b/", "-M", rev_range,
+    )
+    ranges: Dict[str, List[Tuple[int, int]]] = {}
+    current: Optional[List[Tuple[int, int]]] = None
+    body = 0  # hunk lines still to come; they may themselves start with "+++" or "@@"
+    for line in out.split(b"\n"):
+        if body:
+            if not line.startswith(b"\\"):
+                body -= 1
+            continue
+        if line.startswith(b"+++ "):
+            name = _unquote(line[4:].rstrip(b"\t"))
+            if name == b"/dev/null":
+                current = None
+                continue
+            path = name[2:].decode("utf-8", errors="surrogateescape")
+            current = ranges.setdefault(path, []) if path in wanted else None
+        elif line.startswith(b"@@"):
+            m = _HUNK_RE.match(line)
+            if m:
+                start, count = int(m.group(2)), int(m.group(3) or 1)
+                body = int(m.group(1) or 1) + count
+                if count and current is not None:
+                    current.append((start, start + count - 1))
+    return ranges
+
+
+def scanner_ranges(text: str, ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    git numbers lines by "\n" alone; the scanner also breaks them on lone "\r",
+    form feeds and the other str.splitlines() breaks. Map git line ranges of
+    text onto the scanner's line numbers.
+    """
+    index = LineIndex(text)
+    starts = [0] + [m.end() for m in re.finditer("\n", text)]
+    mapped: List[Tuple[int, int]] = []
+    for start, end in ranges:
+        first = starts[min(start, len(starts)) - 1]
+        last = starts[end] - 1 if end < len(starts) else len(text)
+        mapped.append((index.line_of(first) + 1, index.line_of(max(first, last)) + 1))
+    return mapped
+
+
+def in_ranges(line: int, end_line: int, ranges: List[Tuple[int, int]]) -> bool:
+    return any(start <= end_line and line <= end for start, end in ranges)
+
+
+class BlobReader:
+    """One `git cat-file --batch` process; blobs are requested and read one at a time over its pipes."""
+
+    def __init__(self, repo: str) -> None:
+        try:
+            self.proc = subprocess.Popen(
+                ["git", "-C", repo, "cat-file", "--batch"],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise GitError(f"cannot run git: {e}") from None
+
+    def read(self, sha: str, max_size: Optional[int] = None) -> Tuple[Optional[bytes], int]:
+        """(content, size) of a blob; content is None if it is larger than max_size (the bytes are skipped)."""
+        assert self.proc.stdin is not None and self.proc.stdout is not None
+        self.proc.stdin.write(sha.encode("ascii") + b"\n")
+        self.proc.stdin.flush()
+        header = self.proc.stdout.readline().split()
+        if len(header) != 3:
+            raise GitError(f"cat-file: {b' '.join(header).decode('utf-8', errors='replace') or 'no output'}")
+        size = int(header[2])
+        if max_size is not None and size > max_size:
+            left = size + 1
+            while left:
+                left -= len(self.proc.stdout.read(min(left, 1 << 20)))
+            return None, size
+        data = self.proc.stdout.read(size)
+        self.proc.stdout.read(1)  # trailing newline
+        return data, size
+
+    def close(self) -> None:
+        if self.proc.stdin is not None:
+            self.proc.stdin.close()
+        self.proc.wait()
+        if self.proc.stdout is not None:
+            self.proc.stdout.close()
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class RevisionSource:
+    """
+    (absolute path, new content) of every file changed in rev_range, in path
+    order, for SQLInjectionScanner.iter_scan_buffers. Blobs over max_size are
+    recorded in self.errors instead. With a walker, files it would prune or
+    ignore in a scan of the repository's working tree are left out.
+    """
+
+    def __init__(
+        self,
+        repo: str,
+        rev_range: str,
+        extensions: Optional[Iterable[str]] = None,
+        max_size: Optional[int] = None,
+        changed_only: bool = False,
+        walker: Optional[TreeWalker] = None,
+    ) -> None:
+        self.root = toplevel(repo)
+        self.rev_range = rev_range
+        self.files = changed_files(self.root, rev_range, extensions)
+        if walker is not None:
+            selects = walker.selector(self.root)
+            self.files = [f for f in self.files if selects(f.path)]
+        self.max_size = max_size
+        self.errors: List[Dict[str, str]] = []
+        # Added/modified line ranges per absolute path, when findings are limited to them.
+        self.lines: Optional[Dict[str, List[Tuple[int, int]]]] = None
+        if changed_only:
+            by_rel = changed_lines(self.root, rev_range, [f.path for f in self.files])
+            self.lines = {self.abspath(rel): ranges for rel, ranges in by_rel.items()}
+
+    def abspath(self, rel: str) -> str:
+        return os.path.join(self.root, *rel.split("/"))
+
+    def __iter__(self) -> Iterator[Tuple[str, bytes]]:
+        with BlobReader(self.root) as blobs:
+            for f in self.files:
+                data, size = blobs.read(f.blob, self.max_size)
+                name = self.abspath(f.path)
+                if data is None:
+                    self.errors.append({"file": name, "kind": "too-large", "error": f"{size} bytes"})
+                    continue
+                if self.lines and self.lines.get(name):
+                    self.lines[name] = scanner_ranges(data.decode("utf-8", errors="replace"), self.lines[name])
+                yield name, data
+
+    def keep(self, finding: Dict[str, object]) -> bool:
+        """Whether a finding lies on an added or modified line (always, without changed_only)."""
+        if self.lines is None:
+            return True
+        line = int(finding["line"])  # type: ignore[arg-type]
+        return in_ranges(line, int(finding.get("end_line", line)), self.lines.get(str(finding["file"]), []))  # type: ignore[arg-type]
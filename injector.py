@@ -3,76 +3,97 @@ Security pattern injector: applies intercepting filters and injects filter calls
 Cross-platform: uses pathlib for Linux, Windows, macOS.
 """
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+from sqlbase.bootstrap import config_digest, existing_digest, render_bootstrap
 from sqlbase.filters import (
     BaseFilter,
     SQLInjectionFilter,
     XSSFilter,
     CommandInjectionFilter,
+    fuse,
 )
 
 
 class FilterManager:
-    def __init__(self, filters: Dict[str, BaseFilter]) -> None:
+    def __init__(self, filters: Dict[str, BaseFilter], memo_size: int = 0) -> None:
+        """memo_size: bound of the LRU memo of translated strings per fused stage (0: off)."""
         self.filters = filters
+        self.memo_size = memo_size
+        self._stages: List[BaseFilter] = []
+        self._stages_for: Optional[List[BaseFilter]] = None
+
+    @property
+    def stages(self) -> List[BaseFilter]:
+        """The filter chain compiled by fuse(); recompiled if self.filters changes."""
+        current = list(self.filters.values())
+        if current != self._stages_for:
+            self._stages = fuse(current, self.memo_size)
+            self._stages_for = current
+        return self._stages
 
     def apply_all(self, data):
-        for _name, f in self.filters.items():
-            data = f.apply(data)
+        for stage in self.stages:
+            data = stage.apply(data)
         return data
 
+    def apply_many(self, values: Iterable[Any]) -> List[Any]:
+        """apply_all() over a batch of values, one stage at a time."""
+        values = list(values)
+        for stage in self.stages:
+            values = stage.apply_many(values)
+        return values
+
+    def memo_stats(self) -> Dict[str, Any]:
+        """Memo hits, misses and hit rate summed over the fused stages."""
+        totals = {"hits": 0, "misses": 0, "size": 0}
+        for stage in self.stages:
+            stats = getattr(stage, "memo_stats", lambda: None)()
+            if stats:
+                for key in totals:
+                    totals[key] += stats[key]
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_rate"] = round(totals["hits"] / lookups, 4) if lookups else 0.0
+        return totals
+
+
+def default_filters() -> Dict[str, BaseFilter]:
+    return {
+        "SQLi": SQLInjectionFilter(),
+        "XSS": XSSFilter(),
+        "CommandInjection": CommandInjectionFilter(),
+    }
+
 
 class SecurityPatternInjector:
     def __init__(self) -> None:
         self.filter_manager: Optional[FilterManager] = None
 
-    def apply_intercepting_filter(self, project_path: str | Path) -> None:
-        filters: Dict[str, BaseFilter] = {
-            "SQLi": SQLInjectionFilter(),
-            "XSS": XSSFilter(),
-            "CommandInjection": CommandInjectionFilter(),
-        }
-        self.filter_manager = self.generate_filter_manager(filters)
-        self.inject_filter_calls(Path(project_path))
+    def apply_intercepting_filter(self, project_path: str | Path) -> bool:
+        self.filter_manager = self.generate_filter_manager(default_filters())
+        return self.inject_filter_calls(Path(project_path))
 
     def generate_filter_manager(self, filters: Dict[str, BaseFilter]) -> FilterManager:
         return FilterManager(filters)
 
-    def inject_filter_calls(self, project_path: Path) -> None:
+    def inject_filter_calls(self, project_path: Path) -> bool:
+        """
+        Write .security_filters/ with a standalone bootstrap generated for the
+        configured filters. Returns False if it was already up to date.
+        """
         project_path = Path(project_path).resolve()
         if not project_path.exists():
-            return
-        # Write a small bootstrap module that projects can import to get FilterManager
+            return False
+        manager = self.filter_manager or self.generate_filter_manager(default_filters())
         bootstrap_dir = project_path / ".security_filters"
         bootstrap_dir.mkdir(exist_ok=True)
         bootstrap_file = bootstrap_dir / "filter_manager.py"
-        content = '''"""
-Auto-generated security filter bootstrap. Cross-platform.
-Import: from .security_filters.filter_manager import get_filter_manager
-"""
-from pathlib import Path
-
-_filters = None
-
-def get_filter_manager():
-    global _filters
-    if _filters is None:
-        from sqlbase.filters import SQLInjectionFilter, XSSFilter, CommandInjectionFilter
-        from sqlbase.injector import FilterManager
-        _filters = FilterManager({
-            "SQLi": SQLInjectionFilter(),
-            "XSS": XSSFilter(),
-            "CommandInjection": CommandInjectionFilter(),
-        })
-    return _filters
-
-def apply_security_filters(data):
-    return get_filter_manager().apply_all(data)
-'''
-        bootstrap_file.write_text(content, encoding="utf-8")
         init_file = bootstrap_dir / "__init__.py"
+        if existing_digest(bootstrap_file) == config_digest(manager.stages) and init_file.is_file():
+            return False
+        bootstrap_file.write_text(render_bootstrap(manager.stages), encoding="utf-8")
         init_file.write_text(
-            "from .filter_manager import get_filter_manager, apply_security_filters\n",
+            "from .filter_manager import get_filter_manager, apply_security_filters, apply_many\n",
             encoding="utf-8",
         )
+        return True
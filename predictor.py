@@ -2,13 +2,48 @@
 Vulnerability predictor: heuristic-based (ML-ready). Cross-platform.
 """
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+import os
 import re
 
+from sqlbase.walker import TreeWalker, looks_binary
+
+FEATURE_EXTENSIONS = [".py", ".java", ".js", ".ts", ".php"]
+_COUNT_FIELDS = ("chars", "newlines", "input_sources", "db_interactions", "auth_points")
+_INPUT_SOURCES_RE = re.compile(r"(input|request\.(get|post)|argv|getParameter)", re.I)
+_DB_INTERACTIONS_RE = re.compile(r"(execute|query|raw|prepareStatement|SELECT|INSERT|UPDATE|DELETE)", re.I)
+_AUTH_POINTS_RE = re.compile(r"(password|login|auth|session|token|credential)", re.I)
+MODEL_ENV = "SQLBASE_MODEL"
+_UNLOADED = object()
+
+
+def universal_newlines(text: str) -> str:
+    """Line endings translated as open() does in text mode, so CRLF and CR files count like LF ones."""
+    return text.replace("\r\n", "\n").replace("\r", "\n") if "\r" in text else text
+
+
+def decode_text(data: bytes) -> str:
+    """Text of a file's bytes as the predictor counts it: UTF-8 with replacement characters, universal newlines."""
+    return universal_newlines(bytes(data).decode("utf-8", errors="replace"))
+
+
+def count_features(text: str) -> List[int]:
+    """Raw counts for one buffer: chars, newlines, input sources, DB interactions, auth points."""
+    return [
+        len(text),
+        text.count("\n"),
+        sum(1 for _ in _INPUT_SOURCES_RE.finditer(text)),
+        sum(1 for _ in _DB_INTERACTIONS_RE.finditer(text)),
+        sum(1 for _ in _AUTH_POINTS_RE.finditer(text)),
+    ]
+
 
 class VulnerabilityPredictor:
-    def __init__(self) -> None:
-        self.model = self.load_trained_model()
+    def __init__(self, model_path: Optional[str | Path] = None) -> None:
+        # The model is loaded on first prediction: an exported artifact
+        # (model_path or $SQLBASE_MODEL) when given, else the sklearn fallback.
+        self.model_path = model_path or os.environ.get(MODEL_ENV) or None
+        self._model: Any = _UNLOADED
         self.features = [
             "code_complexity",
             "input_sources_count",
@@ -16,7 +51,20 @@ class VulnerabilityPredictor:
             "authentication_points",
         ]
 
+    @property
+    def model(self) -> Optional[Any]:
+        if self._model is _UNLOADED:
+            self._model = self.load_trained_model()
+        return self._model
+
+    @model.setter
+    def model(self, value: Optional[Any]) -> None:
+        self._model = value
+
     def load_trained_model(self) -> Optional[Any]:
+        if self.model_path:
+            from sqlbase.forest import ForestModel
+            return ForestModel.load(self.model_path)
         try:
             from sklearn.ensemble import RandomForestClassifier
             import numpy as np
@@ -30,47 +78,52 @@ class VulnerabilityPredictor:
         except ImportError:
             return None
 
-    def extract_features(self, codebase: str | Path) -> List[float]:
+    def count_features(self, text: str) -> List[int]:
+        return count_features(text)
+
+    def features_from_counts(self, counts: List[int]) -> List[float]:
+        chars, newlines, input_sources, db_interactions, auth_points = counts
+        return [
+            min(1.0, (chars / 10000) + (newlines / 500) * 0.1),
+            min(1.0, input_sources / 20),
+            min(1.0, db_interactions / 30),
+            min(1.0, auth_points / 15),
+        ]
+
+    def iter_file_counts(self, codebase: str | Path) -> Iterator[Tuple[str, List[int]]]:
+        """
+        Yield (file, raw counts) one file at a time. Counts of a directory are
+        taken as if each file were followed by a newline, so their sum equals
+        the counts of all files concatenated.
+        """
         path = Path(codebase)
-        text = ""
         if path.is_file():
             try:
-                text = path.read_text(encoding="utf-8", errors="replace")
-            except (OSError, PermissionError):
-                pass
+                text = decode_text(path.read_bytes())
+            except OSError:
+                text = ""
+            yield str(path), self.count_features(text)
         elif path.is_dir():
-            for ext in [".py", ".java", ".js", ".ts", ".php"]:
-                for f in path.rglob(f"*{ext}"):
-                    try:
-                        text += f.read_text(encoding="utf-8", errors="replace") + "\n"
-                    except (OSError, PermissionError):
-                        continue
-        else:
-            text = str(codebase)
-
-        # Heuristic features
-        code_complexity = min(1.0, (len(text) / 10000) + (text.count("\n") / 500) * 0.1)
-        input_sources = len(re.findall(r"(input|request\.(get|post)|argv|getParameter)", text, re.I))
-        input_sources_count = min(1.0, input_sources / 20)
-        db_interactions = len(
-            re.findall(
-                r"(execute|query|raw|prepareStatement|SELECT|INSERT|UPDATE|DELETE)",
-                text,
-                re.I,
-            )
-        )
-        database_interactions = min(1.0, db_interactions / 30)
-        auth_points = len(
-            re.findall(r"(password|login|auth|session|token|credential)", text, re.I)
-        )
-        authentication_points = min(1.0, auth_points / 15)
+            for entry in TreeWalker(extensions=FEATURE_EXTENSIONS).walk(path):
+                try:
+                    data = Path(entry.path).read_bytes()
+                except OSError:
+                    continue
+                if looks_binary(data):
+                    continue
+                counts = self.count_features(decode_text(data))
+                counts[0] += 1
+                counts[1] += 1
+                yield entry.path, counts
 
-        return [
-            code_complexity,
-            input_sources_count,
-            database_interactions,
-            authentication_points,
-        ]
+    def extract_features(self, codebase: str | Path) -> List[float]:
+        path = Path(codebase)
+        if not path.is_file() and not path.is_dir():
+            return self.features_from_counts(self.count_features(str(codebase)))
+        total = [0] * len(_COUNT_FIELDS)
+        for _file, counts in self.iter_file_counts(path):
+            total = [a + b for a, b in zip(total, counts)]
+        return self.features_from_counts(total)
 
     def generate_recommendations(self, predictions: Dict[str, float]) -> List[str]:
         recs: List[str] = []
@@ -82,32 +135,92 @@ class VulnerabilityPredictor:
             recs.append("Review input validation and output encoding.")
         return recs
 
-    def predict_vulnerability_likelihood(
-        self, codebase: str | Path
-    ) -> Dict[str, Any]:
-        features = self.extract_features(codebase)
-        predictions = {"sqli": 0.0, "xss": 0.0}
+    def _heuristic(self, features: List[float]) -> Dict[str, float]:
+        return {
+            "sqli": 0.3 * (features[1] + features[2]),
+            "xss": 0.3 * (features[1] + features[3]),
+        }
+
+    def predict_batch(self, rows: List[List[float]]) -> List[Dict[str, float]]:
+        """Risk for each feature row, with one predict_proba call for the whole batch."""
+        if not rows:
+            return []
         if self.model is not None:
             try:
                 import numpy as np
-                X = np.array([features])
+                X = np.asarray(rows, dtype=float)
                 pred = self.model.predict_proba(X)
                 if pred.shape[1] >= 2:
-                    predictions["sqli"] = float(pred[0][1])
-                    predictions["xss"] = float(pred[0][1]) * 0.8
-                else:
-                    predictions["sqli"] = 0.3 * (features[1] + features[2])
-                    predictions["xss"] = 0.3 * (features[1] + features[3])
+                    return [{"sqli": float(p), "xss": float(p) * 0.8} for p in pred[:, 1]]
             except Exception:
-                predictions["sqli"] = 0.3 * (features[1] + features[2])
-                predictions["xss"] = 0.3 * (features[1] + features[3])
-        else:
-            predictions["sqli"] = 0.3 * (features[1] + features[2])
-            predictions["xss"] = 0.3 * (features[1] + features[3])
+                pass
+        return [self._heuristic(row) for row in rows]
 
-        return {
+    def _ranked(
+        self, file_rows: List[Tuple[str, List[float]]], preds: List[Dict[str, float]], top: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        # Ties (e.g. a coarse model) are broken by the heuristic score, then path.
+        ranked = sorted(
+            zip(file_rows, preds),
+            key=lambda r: (-r[1]["sqli"], -self._heuristic(r[0][1])["sqli"], r[0][0]),
+        )
+        if top is not None:
+            ranked = ranked[:top]
+        return [
+            {
+                "file": name,
+                "sql_injection_risk": round(pred["sqli"], 4),
+                "xss_risk": round(pred["xss"], 4),
+                "features": dict(zip(self.features, row)),
+            }
+            for (name, row), pred in ranked
+        ]
+
+    def rank_files(self, codebase: str | Path, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Per-file risks, riskiest first, scored with one batched prediction."""
+        file_rows = [(name, self.features_from_counts(counts)) for name, counts in self.iter_file_counts(codebase)]
+        return self._ranked(file_rows, self.predict_batch([row for _name, row in file_rows]), top)
+
+    def predict_vulnerability_likelihood(
+        self, codebase: str | Path, per_file: bool = False, top: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Repository-level risk. With per_file, files are scored in a single
+        batched prediction and the repository result is derived by summing
+        their counts, so every file is read once.
+        """
+        path = Path(codebase)
+        if per_file and (path.is_file() or path.is_dir()):
+            return self.predict_from_counts(self.iter_file_counts(path), per_file=True, top=top)
+        return self._result(self.extract_features(codebase), [], False, top)
+
+    def predict_from_counts(
+        self, file_counts: Iterable[Tuple[str, List[int]]], per_file: bool = False, top: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Same result as predict_vulnerability_likelihood, from (file, raw counts) already collected."""
+        total = [0] * len(_COUNT_FIELDS)
+        file_rows: List[Tuple[str, List[float]]] = []
+        for name, counts in file_counts:
+            total = [a + b for a, b in zip(total, counts)]
+            if per_file:
+                file_rows.append((name, self.features_from_counts(counts)))
+        return self._result(self.features_from_counts(total), file_rows, per_file, top)
+
+    def _result(
+        self,
+        features: List[float],
+        file_rows: List[Tuple[str, List[float]]],
+        per_file: bool,
+        top: Optional[int],
+    ) -> Dict[str, Any]:
+        preds = self.predict_batch([features] + [row for _name, row in file_rows])
+        predictions = preds[0]
+        result: Dict[str, Any] = {
             "sql_injection_risk": round(predictions["sqli"], 4),
             "xss_risk": round(predictions["xss"], 4),
             "recommended_fixes": self.generate_recommendations(predictions),
             "features": dict(zip(self.features, features)),
         }
+        if per_file:
+            result["files"] = self._ranked(file_rows, preds[1:], top)
+        return result
@@ -0,0 +1,86 @@
+"""
+Per-rule scan profile: time and hits per rule, slowest files and lines.
+Profiles from worker processes are merged into one. Cross-platform.
+"""
+import heapq
+from typing import Any, Dict, List, Sequence, Tuple
+
+DEFAULT_TOP = 10
+
+
+class ScanProfile:
+    def __init__(self, descriptions: Sequence[str], top: int = DEFAULT_TOP) -> None:
+        self.descriptions = list(descriptions)
+        self.top = top
+        self.rule_seconds = [0.0] * len(self.descriptions)
+        self.rule_hits = [0] * len(self.descriptions)
+        self.lines_matched = 0
+        self.files = 0
+        self.seconds = 0.0
+        # Bounded min-heaps of the slowest entries.
+        self.slow_files: List[Tuple[float, str]] = []
+        self.slow_lines: List[Tuple[float, str, int]] = []
+
+    def _keep(self, heap: List[Any], item: Any) -> None:
+        if len(heap) < self.top:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def add_rule(self, rule: int, seconds: float, hit: bool) -> None:
+        self.rule_seconds[rule] += seconds
+        self.rule_hits[rule] += hit
+
+    def add_line(self, file: str, line: int, seconds: float) -> None:
+        self.lines_matched += 1
+        self._keep(self.slow_lines, (seconds, file, line))
+
+    def add_file(self, file: str, seconds: float) -> None:
+        self.files += 1
+        self.seconds += seconds
+        self._keep(self.slow_files, (seconds, file))
+
+    def merge(self, other: "ScanProfile") -> None:
+        for i, seconds in enumerate(other.rule_seconds):
+            self.rule_seconds[i] += seconds
+            self.rule_hits[i] += other.rule_hits[i]
+        self.lines_matched += other.lines_matched
+        self.files += other.files
+        self.seconds += other.seconds
+        for item in other.slow_files:
+            self._keep(self.slow_files, item)
+        for item in other.slow_lines:
+            self._keep(self.slow_lines, item)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "seconds": round(self.seconds, 6),
+            "lines_matched": self.lines_matched,
+            "rules": [
+                {"rule": i, "description": desc, "seconds": round(self.rule_seconds[i], 6), "hits": self.rule_hits[i]}
+                for i, desc in enumerate(self.descriptions)
+            ],
+            "slowest_files": [{"file": f, "seconds": round(s, 6)} for s, f in sorted(self.slow_files, reverse=True)],
+            "slowest_lines": [
+                {"file": f, "line": n, "seconds": round(s, 6)} for s, f, n in sorted(self.slow_lines, reverse=True)
+            ],
+        }
+
+    def format_table(self) -> str:
+        total = sum(self.rule_seconds) or 1.0
+        rows = [
+            f"profile: {self.files} files in {self.seconds:.3f} s, {self.lines_matched} candidate lines matched",
+            f"{'rule':>4} {'seconds':>10} {'share':>6} {'hits':>8}  description",
+        ]
+        order = sorted(range(len(self.descriptions)), key=lambda i: -self.rule_seconds[i])
+        for i in order:
+            rows.append(
+                f"{i:>4} {self.rule_seconds[i]:>10.4f} {self.rule_seconds[i] / total:>6.1%} "
+                f"{self.rule_hits[i]:>8}  {self.descriptions[i]}"
+            )
+        rows.append("slowest files:")
+        rows.extend(f"  {s:>10.4f}  {f}" for s, f in sorted(self.slow_files, reverse=True))
+        rows.append("slowest lines:")
+        rows.extend(f"  {s:>10.4f}  {f}:{n}" for s, f, n in sorted(self.slow_lines, reverse=True))
+        return "\n".join(rows)
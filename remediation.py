@@ -1,7 +1,24 @@
 """
 Remediation knowledge base for SQL injection and related fixes. Cross-platform.
 """
-from typing import Dict, Any, List
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+LANGUAGE_BY_EXTENSION = {
+    ".py": "python",
+    ".java": "java",
+    ".php": "php",
+    ".cs": "csharp",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".rb": "ruby",
+    ".go": "go",
+}
+
+
+def language_for_path(path: str | Path) -> Optional[str]:
+    """Knowledge-base language key for a source file, from its extension."""
+    return LANGUAGE_BY_EXTENSION.get(Path(path).suffix.lower())
 
 
 class RemediationKnowledgeBase:
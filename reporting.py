@@ -0,0 +1,174 @@
+"""
+Streaming report writers for scanner findings: JSON, NDJSON and SARIF. Cross-platform.
+Each finding is written as soon as it is produced, so memory stays constant.
+A summary passed to close() is written after the findings. read_report loads
+a JSON or NDJSON report back.
+"""
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, TextIO, Tuple
+
+FORMATS = ("json", "ndjson", "sarif")
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+class ReportWriter(ABC):
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.count = 0
+
+    @abstractmethod
+    def write(self, finding: Dict[str, Any]) -> None:
+        pass
+
+    def close(self, summary: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+
+class NDJSONWriter(ReportWriter):
+    """One finding per line; a summary becomes a last {"summary": ...} line."""
+
+    def write(self, finding: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps(finding) + "\n")
+        self.count += 1
+
+    def close(self, summary: Optional[Dict[str, Any]] = None) -> None:
+        if summary is not None:
+            self.stream.write(json.dumps({"summary": summary}) + "\n")
+
+
+class JSONWriter(ReportWriter):
+    """
+    Same layout as json.dumps(findings, indent=2), written one item at a time.
+    With wrap, the document is {"findings": [...], "summary": ...} instead.
+    """
+
+    def __init__(self, stream: TextIO, wrap: bool = False) -> None:
+        super().__init__(stream)
+        self.wrap = wrap
+        self.indent = "\n    " if wrap else "\n  "
+
+    def write(self, finding: Dict[str, Any]) -> None:
+        item = json.dumps(finding, indent=2).replace("\n", self.indent)
+        if self.count == 0:
+            self.stream.write(('{\n  "findings": [' if self.wrap else "[") + self.indent + item)
+        else:
+            self.stream.write("," + self.indent + item)
+        self.count += 1
+
+    def close(self, summary: Optional[Dict[str, Any]] = None) -> None:
+        if not self.wrap:
+            self.stream.write("\n]\n" if self.count else "[]\n")
+            return
+        self.stream.write("\n  ],\n" if self.count else '{\n  "findings": [],\n')
+        body = json.dumps(summary, indent=2).replace("\n", "\n  ")
+        self.stream.write(f'  "summary": {body}\n}}\n')
+
+
+def sarif_rules(patterns: Sequence[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """One SARIF rule per distinct description, in rule-set order."""
+    rules: List[Dict[str, Any]] = []
+    seen: Dict[str, str] = {}
+    for _pattern, desc in patterns:
+        if desc not in seen:
+            seen[desc] = f"SQLI{len(seen) + 1:03d}"
+            rules.append({"id": seen[desc], "name": desc, "shortDescription": {"text": desc}})
+    return rules
+
+
+class SARIFWriter(ReportWriter):
+    def __init__(self, stream: TextIO, patterns: Sequence[Tuple[str, str]] = (), tool_version: str = "0.1.0") -> None:
+        super().__init__(stream)
+        self.rules = sarif_rules(patterns)
+        self.rule_ids = {r["name"]: r["id"] for r in self.rules}
+        self.tool_version = tool_version
+        self.started = False
+
+    def _start(self) -> None:
+        driver = {"name": "sqlbase", "version": self.tool_version, "rules": self.rules}
+        head = json.dumps({"$schema": SARIF_SCHEMA, "version": "2.1.0", "runs": [{"tool": {"driver": driver}}]})
+        # Leave the run object open and stream its "results" array.
+        self.stream.write(head[: -len("}]}")] + ', "results": [')
+        self.started = True
+
+    def write(self, finding: Dict[str, Any]) -> None:
+        if not self.started:
+            self._start()
+        region: Dict[str, Any] = {"startLine": finding["line"], "snippet": {"text": finding.get("code", "")}}
+        if "end_line" in finding:
+            region["endLine"] = finding["end_line"]
+        result: Dict[str, Any] = {
+            "ruleId": self.rule_ids.get(finding.get("description", ""), "SQLI000"),
+            "level": "error",
+            "message": {"text": f"{finding.get('type', 'SQL_INJECTION')}: {finding.get('description', '')}"},
+            "locations": [{
+                "physicalLocation": {
+                    "artifactLocation": {"uri": _artifact_uri(finding.get("file", ""))},
+                    "region": region,
+                }
+            }],
+        }
+        self.stream.write(("\n" if self.count == 0 else ",\n") + json.dumps(result))
+        self.count += 1
+
+    def close(self, summary: Optional[Dict[str, Any]] = None) -> None:
+        if not self.started:
+            self._start()
+        if summary is None:
+            self.stream.write("\n]}]}\n")
+        else:
+            self.stream.write(f"\n], \"properties\": {json.dumps(summary)}}}]}}\n")
+
+
+def _artifact_uri(file: str) -> str:
+    path = Path(file)
+    return path.as_uri() if path.is_absolute() else path.as_posix()
+
+
+def get_writer(
+    fmt: str, stream: TextIO, patterns: Optional[Sequence[Tuple[str, str]]] = None, wrap: bool = False
+) -> ReportWriter:
+    """wrap: the report will be closed with a summary (a json object rather than an array)."""
+    if fmt == "ndjson":
+        return NDJSONWriter(stream)
+    if fmt == "sarif":
+        return SARIFWriter(stream, patterns or ())
+    if fmt == "json":
+        return JSONWriter(stream, wrap=wrap)
+    raise ValueError(f"Unknown report format: {fmt}")
+
+
+def read_report(path: str | Path) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Findings and summary of a json or ndjson report from 'scan' (summary None
+    if it has none). Raises ValueError for anything else, SARIF included.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    try:
+        doc = json.loads(text)
+    except ValueError:
+        doc = None  # several lines: ndjson
+    if isinstance(doc, dict) and ("runs" in doc or "$schema" in doc):
+        raise ValueError("unsupported report format: SARIF (scan with --format json or ndjson)")
+    if isinstance(doc, list):
+        findings: List[Dict[str, Any]] = doc
+        summary = None
+    elif isinstance(doc, dict) and "findings" in doc:
+        findings, summary = doc["findings"], doc.get("summary")
+    else:
+        findings, summary = [], None
+        for n, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                raise ValueError(f"unsupported report format: line {n} is not JSON") from None
+            if isinstance(item, dict) and "summary" in item and len(item) == 1:
+                summary = item["summary"]
+            else:
+                findings.append(item)
+    if not isinstance(findings, list) or not all(isinstance(f, dict) and "file" in f and "line" in f for f in findings):
+        raise ValueError("unsupported report format: expected findings with file and line")
+    return findings, summary
@@ -0,0 +1,609 @@
+"""
+Compiled rule engine for the SQL injection scanner. Cross-platform.
+All rules are merged into one alternation that runs once over a whole buffer;
+match offsets are mapped back to line numbers through a newline-offset index.
+"""
+import re
+import time
+from bisect import bisect_right
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+# Same boundaries as str.splitlines(), so line numbers match a per-line scan.
+LINE_BREAKS = r"\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+# Everything \s matches in str patterns, minus the line breaks above.
+INLINE_SPACE = r"\t \x1f\xa0\u1680\u2000-\u200a\u202f\u205f\u3000"
+_LINE_BREAK_RE = re.compile(r"\r\n|[" + LINE_BREAKS + "]")
+_EXOTIC_TEXT_BREAK_RE = re.compile(r"\r(?!\n)|[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+DEFAULT_FLAGS = re.IGNORECASE | re.DOTALL
+# Bump when a change to the engine alters findings for the same rules.
+ENGINE_VERSION = 1
+
+# (line, code, description, end_line)
+Hit = Tuple[int, str, str, int]
+
+# Byte-level equivalents for UTF-8 buffers. Multi-byte line breaks (NEL, LS, PS)
+# cannot be excluded from a byte class; they only make candidates looser.
+BYTES_LINE_BREAKS = r"\n\r\x0b\x0c\x1c\x1d\x1e"
+BYTES_INLINE_SPACE = r"\t \x1f"
+_NON_ASCII_SPACE = r"\xc2\xa0|\xe1\x9a\x80|\xe2\x80[\x80-\x8a\xaf]|\xe2\x81\x9f|\xe3\x80\x80"
+# Non-ASCII characters that match an ASCII letter under re.IGNORECASE.
+_CASE_FOLDS = {"i": r"\xc4[\xb0\xb1]", "k": r"\xe2\x84\xaa", "s": r"\xc5\xbf"}
+_BYTES_LINE_BREAK_RE = re.compile(rb"\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]")
+_BYTES_BREAK_SEQS = (b"\n", b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e", b"\xc2\x85", b"\xe2\x80\xa8", b"\xe2\x80\xa9")
+# Anything but plain \n / \r\n line endings.
+_EXOTIC_BREAK_RE = re.compile(rb"\r(?!\n)|[\x0b\x0c\x1c\x1d\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]")
+_NON_ASCII_RE = re.compile(rb"[\x80-\xff]")
+_COUNT_CHUNK = 1 << 20
+
+# Prefilter folding: after lower(), these are the only characters that
+# re.IGNORECASE equates with an ASCII letter but lower() does not map onto it.
+# Translating them first also keeps lower() length-preserving (U+0130).
+_FOLD_TABLE = {0x17F: "s", 0x131: "i", 0x130: "i"}
+_FOLD_BYTES = (b"\xc5\xbf", b"\xc4\xb0", b"\xc4\xb1")
+_REPEATS = tuple(
+    getattr(_sre_parse, name) for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") if hasattr(_sre_parse, name)
+)
+
+Stats = Dict[str, int]
+
+
+def _bump(stats: Optional[Stats], key: str, amount: int = 1) -> None:
+    if stats is not None:
+        stats[key] = stats.get(key, 0) + amount
+
+
+def fold_text(text: str) -> str:
+    """Lower-case text so that a plain search for an ASCII literal finds every re.IGNORECASE match."""
+    if text.isascii():
+        return text.lower()
+    return text.translate(_FOLD_TABLE).lower()
+
+
+def _required(items) -> Optional[FrozenSet[str]]:
+    """
+    A set of literals, one of which occurs in every match of the parsed
+    sequence, or None when no such set can be derived.
+    """
+    best: Optional[FrozenSet[str]] = None
+
+    def consider(req: Optional[FrozenSet[str]]) -> None:
+        nonlocal best
+        if not req:
+            return
+        if best is None or (min(map(len, req)), -len(req)) > (min(map(len, best)), -len(best)):
+            best = req
+
+    run: List[str] = []
+    for op, av in items:
+        if op is _sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if run:
+            consider(frozenset(["".join(run)]))
+            run = []
+        if op is _sre_parse.SUBPATTERN:
+            consider(_required(av[-1]))
+        elif op is _sre_parse.BRANCH:
+            alternatives = [_required(branch) for branch in av[1]]
+            if all(alternatives):
+                consider(frozenset().union(*alternatives))
+        elif op in _REPEATS:
+            if av[0] >= 1:
+                consider(_required(av[2]))
+        elif op is getattr(_sre_parse, "ATOMIC_GROUP", None):
+            consider(_required(av))
+    if run:
+        consider(frozenset(["".join(run)]))
+    return best
+
+
+def required_literals(patterns: Sequence[str]) -> Optional[List[str]]:
+    """
+    Literals such that any line matching any pattern contains at least one of
+    them (compared case-insensitively), longest first. None if some pattern
+    has no derivable literal, or a literal is not plain ASCII.
+    """
+    literals = set()
+    for pattern in patterns:
+        try:
+            req = _required(_sre_parse.parse(pattern))
+        except (re.error, RecursionError):
+            return None
+        if not req:
+            return None
+        literals.update(lit.lower() for lit in req)
+    if any(not lit.isascii() or _LINE_BREAK_RE.search(lit) for lit in literals):
+        return None
+    # A literal containing another one is implied by it.
+    reduced = [lit for lit in literals if not any(o != lit and o in lit for o in literals)]
+    return sorted(reduced, key=lambda lit: (-len(lit), lit))
+
+
+def confine_to_line(pattern: str) -> str:
+    """Rewrite a pattern so that \\s, \\W, \\D, '.' and negated classes never cross a line break."""
+    out: List[str] = []
+    i, n = 0, len(pattern)
+    in_class = negated = False
+    while i < n:
+        c = pattern[i]
+        if c == "\\" and i + 1 < n:
+            esc = pattern[i:i + 2]
+            if esc == r"\s":
+                out.append(INLINE_SPACE if in_class else f"[{INLINE_SPACE}]")
+            elif esc in (r"\W", r"\D") and not in_class:
+                out.append(f"[^\\{esc[1].lower()}{LINE_BREAKS}]")
+            else:
+                out.append(esc)
+            i += 2
+            continue
+        if in_class:
+            if c == "]":
+                if negated:
+                    out.append(LINE_BREAKS)
+                in_class = False
+            out.append(c)
+            i += 1
+            continue
+        if c == "[":
+            j = i + 1
+            negated = j < n and pattern[j] == "^"
+            if negated:
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            out.append(pattern[i:j])
+            in_class = True
+            i = j
+            continue
+        out.append(f"[^{LINE_BREAKS}]" if c == "." else c)
+        i += 1
+    return "".join(out)
+
+
+def to_bytes_pattern(pattern: str, ascii_only: bool, ignorecase: bool = True) -> bytes:
+    """
+    Translate a rule into a line-confined bytes pattern for UTF-8 input that
+    matches at least wherever the str pattern matches on a decoded line. With
+    ascii_only the buffer is known to be pure ASCII and the translation is
+    exact; otherwise non-ASCII characters are let through generously.
+    Raises ValueError for constructs that cannot be translated safely.
+    """
+    out: List[str] = []
+    i, n = 0, len(pattern)
+
+    def char_class(body: str, negated: bool, end: int) -> str:
+        if negated:
+            body = "^" + body + BYTES_LINE_BREAKS
+        if ascii_only:
+            return f"[{body}]"
+        if end < n and pattern[end] in "*+":
+            return f"[{body}]" if negated else f"[{body}\\x80-\\xff]"
+        # A single non-ASCII character spans several bytes.
+        ascii_part = f"[{body}\\x80-\\xff]" if negated else f"[{body}]"
+        return f"(?:{ascii_part}|[\\x80-\\xff]+)"
+
+    while i < n:
+        c = pattern[i]
+        if not c.isascii():
+            raise ValueError("non-ASCII literal")
+        if c == "\\":
+            if i + 1 >= n:
+                raise ValueError("trailing backslash")
+            e = pattern[i + 1]
+            if e == "s":
+                out.append(f"[{BYTES_INLINE_SPACE}]" if ascii_only else f"(?:[{BYTES_INLINE_SPACE}]|{_NON_ASCII_SPACE})")
+            elif e in "SWD":
+                out.append(char_class(f"\\{e.lower()}", True, i + 2))
+            elif e in "wd":
+                out.append(char_class(f"\\{e}", False, i + 2))
+            elif e in "uUN" or (e in "bB" and not ascii_only):
+                raise ValueError(f"unsupported escape \\{e}")
+            elif e == "x" and pattern[i + 2:i + 3] in "89abcdefABCDEF":
+                raise ValueError("non-ASCII escape")
+            else:
+                out.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if c == "[":
+            j = i + 1
+            negated = j < n and pattern[j] == "^"
+            if negated:
+                j += 1
+            body_start = j
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                if not pattern[j].isascii():
+                    raise ValueError("non-ASCII class member")
+                j += 2 if pattern[j] == "\\" else 1
+            if j >= n:
+                raise ValueError("unterminated class")
+            body = pattern[body_start:j]
+            if r"\s" in body:
+                if not (negated or ascii_only):
+                    raise ValueError("\\s in a positive class")
+                body = body.replace(r"\s", BYTES_INLINE_SPACE + (BYTES_LINE_BREAKS if negated else ""))
+            out.append(char_class(body, negated, j + 1))
+            i = j + 1
+            continue
+        if c == ".":
+            out.append(char_class("", True, i + 1))
+            i += 1
+            continue
+        if c == "(" and pattern.startswith("(?", i):
+            # Copy group prefixes verbatim so names and flags are not treated as literals.
+            j = i + 2
+            if pattern.startswith("P<", j) or pattern.startswith("P=", j):
+                j = pattern.index(">" if pattern[j + 1] == "<" else ")", j) + 1
+            elif pattern.startswith("#", j):
+                j = pattern.index(")", j) + 1
+            elif j < n and pattern[j] in ":=!":
+                j += 1
+            elif pattern.startswith("<=", j) or pattern.startswith("<!", j):
+                j += 2
+            else:
+                k = j
+                while k < n and pattern[k] not in ":)":
+                    k += 1
+                if set(pattern[j:k]) & set("uL"):
+                    raise ValueError("unsupported inline flag")
+                j = k + 1
+            out.append(pattern[i:j])
+            i = j
+            continue
+        fold = _CASE_FOLDS.get(c.lower()) if ignorecase and not ascii_only else None
+        out.append(f"(?:{c}|{fold})" if fold else c)
+        i += 1
+    return "".join(out).encode("ascii")
+
+
+def _bytes_line_bounds(buf, offset: int, simple: bool) -> Tuple[int, int, int]:
+    """(start, end, start of next line) of the line containing offset."""
+    size = len(buf)
+    if simple:
+        start = buf.rfind(b"\n", 0, offset) + 1
+        nl = buf.find(b"\n", offset)
+        end, nxt = (size, size + 1) if nl == -1 else (nl, nl + 1)
+        if end > start and buf[end - 1:end] == b"\r":
+            end -= 1
+        return start, end, nxt
+    start = 0
+    for seq in _BYTES_BREAK_SEQS:
+        p = buf.rfind(seq, 0, offset)
+        if p >= 0:
+            start = max(start, p + len(seq))
+    m = _BYTES_LINE_BREAK_RE.search(buf, offset)
+    if m is None:
+        return start, size, size + 1
+    return start, m.start(), m.end()
+
+
+def _count_bytes_breaks(buf, start: int, end: int, simple: bool) -> int:
+    if not simple:
+        return sum(1 for _ in _BYTES_LINE_BREAK_RE.finditer(buf, start, end))
+    count = 0
+    for i in range(start, end, _COUNT_CHUNK):
+        count += buf[i:min(end, i + _COUNT_CHUNK)].count(b"\n")
+    return count
+
+
+class _LiteralFinder:
+    """
+    find(pos) gives the offset of the next required literal at or after pos
+    (a line start), lower-casing the buffer one line-aligned chunk at a time.
+    Chunks containing characters that lower() does not fold the way
+    re.IGNORECASE does make every one of their lines a candidate.
+    """
+
+    def __init__(self, regex: "re.Pattern[bytes]", buf, simple: bool) -> None:
+        self.search = regex.search
+        self.buf = buf
+        self.simple = simple
+        self.size = len(buf)
+        self.start = self.end = 0
+        self.low = b""
+        self.all_lines = False
+        self.lines = 0
+
+    def _load(self, pos: int) -> None:
+        buf, size = self.buf, self.size
+        end = min(size, pos + _COUNT_CHUNK)
+        if end < size:
+            if self.simple:
+                nl = buf.find(b"\n", end)
+                end = size if nl == -1 else nl + 1
+            else:
+                m = _BYTES_LINE_BREAK_RE.search(buf, end)
+                end = size if m is None else m.end()
+        raw = buf[pos:end]
+        self.start, self.end = pos, end
+        self.low = raw.lower()
+        self.all_lines = any(seq in raw for seq in _FOLD_BYTES)
+        self.lines += raw.count(b"\n") if self.simple else len(_BYTES_LINE_BREAK_RE.findall(raw))
+        if end == size and raw and not raw.endswith((b"\n", b"\r")):
+            self.lines += 1
+
+    def find(self, pos: int) -> Optional[int]:
+        while pos < self.size:
+            if not self.start <= pos < self.end:
+                self._load(pos)
+            if self.all_lines:
+                return pos
+            m = self.search(self.low, pos - self.start)
+            if m is not None:
+                return self.start + m.start()
+            pos = self.end
+        return None
+
+
+def count_lines(text: str) -> int:
+    """Number of lines as str.splitlines() counts them, without building the list."""
+    if _EXOTIC_TEXT_BREAK_RE.search(text) is None:
+        breaks = text.count("\n")
+    else:
+        breaks = sum(1 for _ in _LINE_BREAK_RE.finditer(text))
+    return breaks + (1 if text and _LINE_BREAK_RE.match(text, len(text) - 1) is None else 0)
+
+
+class LineIndex:
+    def __init__(self, text: str) -> None:
+        self.starts = [0]
+        self.ends: List[int] = []
+        for m in _LINE_BREAK_RE.finditer(text):
+            self.ends.append(m.start())
+            self.starts.append(m.end())
+        self.ends.append(len(text))
+
+    @property
+    def count(self) -> int:
+        """Number of lines as str.splitlines() counts them (no empty line after a final break)."""
+        return len(self.starts) - (self.starts[-1] == self.ends[-1])
+
+    def line_of(self, offset: int) -> int:
+        """0-based line containing offset."""
+        return bisect_right(self.starts, offset) - 1
+
+    def bounds(self, line: int) -> Tuple[int, int]:
+        return self.starts[line], self.ends[line]
+
+    def next_start(self, line: int) -> int:
+        if line + 1 < len(self.starts):
+            return self.starts[line + 1]
+        return self.ends[line] + 1
+
+
+class CompiledRules:
+    def __init__(self, patterns: Sequence[Tuple[str, str]], flags: int = DEFAULT_FLAGS) -> None:
+        self.patterns = list(patterns)
+        self.flags = flags
+        self.descriptions = [desc for _pattern, desc in self.patterns]
+        self.singles = [re.compile(p, flags) for p, _desc in self.patterns]
+        self.line_combined = self._combine(confine_to_line(p) for p, _desc in self.patterns)
+        self.span_combined = self._combine(p for p, _desc in self.patterns)
+        self.bytes_ascii = self._combine_bytes(ascii_only=True)
+        self.bytes_utf8 = self._combine_bytes(ascii_only=False)
+        self.literals = required_literals([p for p, _desc in self.patterns])
+        self.literal_re: "Optional[re.Pattern[str]]" = None
+        self.literal_bytes_re: "Optional[re.Pattern[bytes]]" = None
+        if self.literals:
+            self.literal_re = re.compile("|".join(map(re.escape, self.literals)))
+            self.literal_bytes_re = re.compile(b"|".join(re.escape(lit.encode("ascii")) for lit in self.literals))
+
+    def _combine(self, patterns) -> "re.Pattern[str]":
+        alternatives = [f"(?P<rule{i}>{p})" for i, p in enumerate(patterns)]
+        return re.compile("|".join(alternatives), self.flags | re.MULTILINE)
+
+    def _combine_bytes(self, ascii_only: bool) -> "Optional[re.Pattern[bytes]]":
+        try:
+            alternatives = [
+                b"(?P<rule%d>" % i + to_bytes_pattern(p, ascii_only, bool(self.flags & re.IGNORECASE)) + b")"
+                for i, (p, _desc) in enumerate(self.patterns)
+            ]
+            return re.compile(b"|".join(alternatives), self.flags | re.MULTILINE)
+        except (ValueError, re.error):
+            return None
+
+    def first_match(self, line: str) -> Optional[str]:
+        """Description of the first rule matching line, as the per-line scan reports it."""
+        for regex, desc in zip(self.singles, self.descriptions):
+            if regex.search(line):
+                return desc
+        return None
+
+    def scan(
+        self, text: str, multiline: bool = False, prefilter: bool = True, stats: Optional[Stats] = None
+    ) -> List[Hit]:
+        """
+        Return one hit per matching line, in line order.
+        Candidates come from the combined regex; each candidate line is then
+        confirmed against the rules in order, so the description is the first
+        matching rule exactly as a line-by-line scan would report it. With
+        multiline, matches that only exist across line breaks are reported at
+        their starting line with end_line set to the line they finish on.
+        With prefilter (single-line mode only), lines that contain none of
+        the required literals are never handed to the regexes.
+        """
+        if prefilter and not multiline and self.literal_re is not None:
+            return self._scan_prefiltered(text, stats)
+        hits: List[Hit] = []
+        combined = self.span_combined if multiline else self.line_combined
+        search = combined.search
+        index: Optional[LineIndex] = None
+        pos, size = 0, len(text)
+        while pos <= size:
+            m = search(text, pos)
+            if m is None:
+                break
+            if index is None:
+                index = LineIndex(text)
+            line = index.line_of(m.start())
+            start, end = index.bounds(line)
+            code = text[start:end]
+            desc = self.first_match(code)
+            if desc is not None:
+                hits.append((line + 1, code.strip(), desc, line + 1))
+            elif multiline:
+                last = index.line_of(max(m.end() - 1, m.start()))
+                span_end = index.bounds(last)[1]
+                snippet = " ".join(part.strip() for part in text[start:span_end].splitlines())
+                desc = self.descriptions[int(m.lastgroup[len("rule"):])] if m.lastgroup else ""
+                hits.append((line + 1, snippet.strip(), desc, last + 1))
+            pos = index.next_start(line)
+        return hits
+
+    def _scan_prefiltered(self, text: str, stats: Optional[Stats]) -> List[Hit]:
+        assert self.literal_re is not None
+        hits: List[Hit] = []
+        lines = count_lines(text)
+        _bump(stats, "files")
+        _bump(stats, "lines", lines)
+        find = self.literal_re.search
+        folded = fold_text(text)
+        m = find(folded)
+        if m is None:
+            _bump(stats, "files_rejected")
+            _bump(stats, "lines_rejected", lines)
+            return hits
+        index = LineIndex(text)
+        search = self.line_combined.search
+        candidates = 0
+        while m is not None:
+            line = index.line_of(m.start())
+            start, end = index.bounds(line)
+            candidates += 1
+            if search(text, start, end):
+                code = text[start:end]
+                desc = self.first_match(code)
+                if desc is not None:
+                    hits.append((line + 1, code.strip(), desc, line + 1))
+            m = find(folded, index.next_start(line))
+        _bump(stats, "lines_rejected", max(0, lines - candidates))
+        return hits
+
+    def scan_guarded(
+        self,
+        text: str,
+        prefilter: bool = True,
+        max_line_length: Optional[int] = None,
+        deadline: Optional[float] = None,
+        stats: Optional[Stats] = None,
+        profile: Any = None,
+        name: str = "",
+    ) -> Tuple[List[Hit], List[Dict[str, int]]]:
+        """
+        Single-line scan that never hands the regexes a line longer than
+        max_line_length and stops matching once time.perf_counter() passes
+        deadline (checked between lines). Returns the hits and what was
+        skipped: {"kind": "long-line", "line", "length"} per line and one
+        {"kind": "time-budget", "line", "lines"} for the rest of the text.
+        With a ScanProfile, every rule is timed on every candidate line.
+        """
+        hits: List[Hit] = []
+        skipped: List[Dict[str, int]] = []
+        index = LineIndex(text)
+        lines = index.count
+        _bump(stats, "files")
+        _bump(stats, "lines", lines)
+        candidates: Iterator[int]
+        if prefilter and self.literal_re is not None:
+            candidates = self._candidate_lines(fold_text(text), index)
+        else:
+            candidates = iter(range(lines))
+        search = self.line_combined.search
+        examined = 0
+        for line in candidates:
+            examined += 1
+            start, end = index.bounds(line)
+            if max_line_length is not None and end - start > max_line_length:
+                skipped.append({"kind": "long-line", "line": line + 1, "length": end - start})
+                continue
+            if deadline is not None and time.perf_counter() > deadline:
+                rest = 1 + sum(1 for _ in candidates)
+                examined += rest - 1
+                skipped.append({"kind": "time-budget", "line": line + 1, "lines": rest})
+                break
+            code = text[start:end]
+            desc: Optional[str] = None
+            if profile is None:
+                if search(text, start, end):
+                    desc = self.first_match(code)
+            else:
+                spent = 0.0
+                for i, regex in enumerate(self.singles):
+                    t = time.perf_counter()
+                    hit = regex.search(code) is not None
+                    t = time.perf_counter() - t
+                    profile.add_rule(i, t, hit)
+                    spent += t
+                    if hit and desc is None:
+                        desc = self.descriptions[i]
+                profile.add_line(name, line + 1, spent)
+            if desc is not None:
+                hits.append((line + 1, code.strip(), desc, line + 1))
+        _bump(stats, "lines_rejected", max(0, lines - examined))
+        if examined == 0:
+            _bump(stats, "files_rejected")
+        return hits, skipped
+
+    def _candidate_lines(self, folded: str, index: LineIndex) -> Iterator[int]:
+        assert self.literal_re is not None
+        find = self.literal_re.search
+        m = find(folded)
+        while m is not None:
+            line = index.line_of(m.start())
+            yield line
+            m = find(folded, index.next_start(line))
+
+    def scan_bytes(self, buf, prefilter: bool = True, stats: Optional[Stats] = None) -> Optional[List[Hit]]:
+        """
+        Single-line scan over a UTF-8 bytes-like buffer such as an mmap. Only
+        candidate lines are decoded (with errors="replace") and confirmed, so
+        hits equal scan() on the decoded text. Returns None when the rule set
+        cannot be translated to bytes patterns.
+        """
+        combined = self.bytes_ascii if _NON_ASCII_RE.search(buf) is None else self.bytes_utf8
+        if combined is None:
+            return None
+        simple = _EXOTIC_BREAK_RE.search(buf) is None
+        hits: List[Hit] = []
+        search = combined.search
+        size = len(buf)
+        finder: Optional[_LiteralFinder] = None
+        if prefilter and self.literal_bytes_re is not None:
+            finder = _LiteralFinder(self.literal_bytes_re, buf, simple)
+        pos, line, counted, candidates = 0, 0, 0, 0
+        while pos <= size:
+            if finder is not None:
+                offset = finder.find(pos)
+                if offset is None:
+                    break
+                start, end, nxt = _bytes_line_bounds(buf, offset, simple)
+                candidates += 1
+                if search(buf, start, end) is None:
+                    pos = nxt
+                    continue
+            else:
+                m = search(buf, pos)
+                if m is None:
+                    break
+                start, end, nxt = _bytes_line_bounds(buf, m.start(), simple)
+            pos = nxt
+            line += _count_bytes_breaks(buf, counted, start, simple)
+            counted = start
+            code = bytes(buf[start:end]).decode("utf-8", errors="replace")
+            desc = self.first_match(code)
+            if desc is not None:
+                hits.append((line + 1, code.strip(), desc, line + 1))
+        if finder is not None:
+            _bump(stats, "files")
+            _bump(stats, "lines", finder.lines)
+            _bump(stats, "lines_rejected", max(0, finder.lines - candidates))
+            if candidates == 0:
+                _bump(stats, "files_rejected")
+        return hits
@@ -2,13 +2,102 @@
 SQL injection static scanner. Cross-platform: Linux, Windows, macOS.
 Uses pathlib for portable paths.
 """
-import re
+import hashlib
+import json
+import mmap
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Deque, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from sqlbase.cache import ScanCache
+from sqlbase.profiling import ScanProfile
+from sqlbase.rules import ENGINE_VERSION, CompiledRules
+from sqlbase.walker import TreeWalker, WalkEntry, looks_binary
+
+DEFAULT_EXTENSIONS = [".py", ".java", ".js", ".ts", ".php", ".rb", ".go", ".cs"]
+# Files at least this large are memory-mapped and matched as bytes.
+MMAP_THRESHOLD = 1024 * 1024
+MINIFIED_SNIFF_BYTES = 64 * 1024
+
+
+def looks_minified(head: bytes) -> bool:
+    """A large file with no line break near the start is a minified or generated blob."""
+    if len(head) <= MINIFIED_SNIFF_BYTES:
+        return False
+    sniff = head[:MINIFIED_SNIFF_BYTES]
+    return b"\n" not in sniff and b"\r" not in sniff
+
+
+def decode_source(name: str, data, errors: List[Dict[str, str]]) -> str:
+    """UTF-8 text of a file's bytes. Invalid bytes become U+FFFD and are reported in errors."""
+    try:
+        return bytes(data).decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Still scanned with replacement characters, but reported.
+        errors.append({"file": name, "kind": "encoding", "error": f"{e.reason} at byte {e.start}"})
+        return bytes(data).decode("utf-8", errors="replace")
+
+
+# Error kinds of scans that stopped short of matching the whole file.
+TRUNCATION_KINDS = ("long-line", "time-budget")
+
+
+def skipped_errors(name: str, skipped: List[Dict[str, int]]) -> List[Dict[str, str]]:
+    """Error records for the content CompiledRules.scan_guarded did not match."""
+    errors: List[Dict[str, str]] = []
+    long_lines = [s for s in skipped if s["kind"] == "long-line"]
+    if long_lines:
+        shown = ", ".join(f"{s['line']} ({s['length']} chars)" for s in long_lines[:10])
+        more = f" and {len(long_lines) - 10} more" if len(long_lines) > 10 else ""
+        errors.append({"file": name, "kind": "long-line", "error": f"{len(long_lines)} line(s) not matched: {shown}{more}"})
+    for s in skipped:
+        if s["kind"] == "time-budget":
+            errors.append({
+                "file": name,
+                "kind": "time-budget",
+                "error": f"time budget exceeded at line {s['line']}; {s['lines']} candidate line(s) not matched",
+            })
+    return errors
+
+
+class FileResult(NamedTuple):
+    file: str
+    findings: Optional[List[Dict[str, Any]]]
+    errors: List[Dict[str, str]]
+    digest: Optional[str]
+    stats: Dict[str, int]
+    profile: Optional[ScanProfile] = None
 
 
 class SQLInjectionScanner:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        multiline: bool = False,
+        mmap_threshold: Optional[int] = MMAP_THRESHOLD,
+        prefilter: bool = True,
+        max_line_length: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        profile: bool = False,
+    ) -> None:
+        """
+        max_line_length: lines longer than this are not matched (pathological
+        backtracking grows with line length); time_budget: seconds of matching
+        per file, checked between lines; profile: record per-rule time and
+        hits in self.rule_profile. All three are single-line mode only, and
+        skipped content is reported in self.errors.
+        """
+        if multiline and (max_line_length is not None or time_budget is not None or profile):
+            raise ValueError("max_line_length, time_budget and profile need single-line mode")
+        self.multiline = multiline
+        self.mmap_threshold = mmap_threshold
+        self.prefilter = prefilter
+        self.max_line_length = max_line_length
+        self.time_budget = time_budget
+        self.profile = profile
+        self.rule_profile: Optional[ScanProfile] = None
         self.patterns = [
             (r"execute\s*\([^)]*\+[^)]*\)", "String concatenation in execute"),
             (r"\.(execute|executemany)\s*\([^)]*%\s*s", "%-format in query"),
@@ -21,6 +110,68 @@ class SQLInjectionScanner:
             (r"raw\s*\(\s*[^)]*\+", "Raw query concatenation"),
             (r"\.format\s*\([^)]*\)\s*\)\s*\.(execute|query)", "Format then execute"),
         ]
+        self._rules: Optional[CompiledRules] = None
+        self.errors: List[Dict[str, str]] = []
+        # Files and lines the literal prefilter examined and eliminated.
+        self.prefilter_stats: Dict[str, int] = {}
+
+    @property
+    def rules(self) -> CompiledRules:
+        # Recompiled whenever self.patterns is edited after construction.
+        if self._rules is None or self._rules.patterns != self.patterns:
+            self._rules = CompiledRules(self.patterns)
+        return self._rules
+
+    def _findings(self, hits) -> List[Dict[str, Any]]:
+        vulnerabilities: List[Dict[str, Any]] = []
+        for line, code, desc, end_line in hits:
+            v: Dict[str, Any] = {
+                "line": line,
+                "code": code,
+                "type": "SQL_INJECTION",
+                "description": desc,
+            }
+            if end_line != line:
+                v["end_line"] = end_line
+            vulnerabilities.append(v)
+        return vulnerabilities
+
+    @property
+    def guarded(self) -> bool:
+        return self.max_line_length is not None or self.time_budget is not None or self.profile
+
+    def scan_text(
+        self,
+        text: str,
+        stats: Optional[Dict[str, int]] = None,
+        name: str = "",
+        errors: Optional[List[Dict[str, str]]] = None,
+        profile: Optional[ScanProfile] = None,
+    ) -> List[Dict[str, Any]]:
+        """Findings for text. Content skipped by the line cap or time budget is appended to errors."""
+        if not self.guarded:
+            return self._findings(self.rules.scan(text, multiline=self.multiline, prefilter=self.prefilter, stats=stats))
+        deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        hits, skipped = self.rules.scan_guarded(
+            text, self.prefilter, self.max_line_length, deadline, stats=stats, profile=profile, name=name
+        )
+        if errors is not None:
+            errors.extend(skipped_errors(name, skipped))
+        return self._findings(hits)
+
+    def scan_buffer(self, buf, stats: Optional[Dict[str, int]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Scan a UTF-8 bytes-like buffer (bytes, mmap) without decoding it as a
+        whole. Returns None when this configuration needs decoded text
+        (multiline mode, guarded scans, or rules that have no bytes translation).
+        """
+        if self.multiline or self.guarded:
+            return None
+        hits = self.rules.scan_bytes(buf, prefilter=self.prefilter, stats=stats)
+        return None if hits is None else self._findings(hits)
+
+    def _use_mmap(self, size: int) -> bool:
+        return self.mmap_threshold is not None and size >= max(1, self.mmap_threshold) and not self.multiline
 
     def scan_file(self, file_path: str | Path) -> List[Dict[str, Any]]:
         vulnerabilities: List[Dict[str, Any]] = []
@@ -28,37 +179,273 @@ class SQLInjectionScanner:
         if not path.exists():
             return vulnerabilities
         try:
+            if self._use_mmap(path.stat().st_size):
+                with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    found = self.scan_buffer(mm)
+                if found is not None:
+                    return found
             text = path.read_text(encoding="utf-8", errors="replace")
-        except (OSError, PermissionError):
+        except (OSError, PermissionError, ValueError):
             return vulnerabilities
-        lines = text.splitlines()
-        for i, line in enumerate(lines):
-            for pattern, desc in self.patterns:
-                if re.search(pattern, line, re.IGNORECASE | re.DOTALL):
-                    vulnerabilities.append({
-                        "line": i + 1,
-                        "code": line.strip(),
-                        "type": "SQL_INJECTION",
-                        "description": desc,
-                    })
-                    break
-        return vulnerabilities
+        return self.scan_text(text)
+
+    def fingerprint(self) -> str:
+        """Identifies the rule set and options; cached findings are only reused under the same value."""
+        state = {
+            "engine": ENGINE_VERSION,
+            "patterns": self.patterns,
+            "multiline": self.multiline,
+            "mmap_threshold": self.mmap_threshold,
+            "max_line_length": self.max_line_length,
+            "time_budget": self.time_budget,
+        }
+        return hashlib.sha256(json.dumps(state, sort_keys=True).encode("utf-8")).hexdigest()
 
-    def scan_path(self, path: str | Path, extensions: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    def _scan_data(self, name: str, data, known: Optional[str], with_digest: bool, large: bool) -> FileResult:
+        errors: List[Dict[str, str]] = []
+        stats: Dict[str, int] = {}
+        digest = hashlib.sha256(data).hexdigest() if with_digest else None
+        if known is not None and digest == known:
+            return FileResult(name, None, errors, digest, stats)
+        if looks_binary(data):
+            errors.append({"file": name, "kind": "binary", "error": "NUL byte in header"})
+            return FileResult(name, [], errors, digest, stats)
+        findings = None
+        if large:
+            if looks_minified(data):
+                errors.append({"file": name, "kind": "minified", "error": f"no line break in first {MINIFIED_SNIFF_BYTES} bytes"})
+                return FileResult(name, [], errors, digest, stats)
+            findings = self.scan_buffer(data, stats)
+        profile = ScanProfile(self.rules.descriptions) if self.profile else None
+        if findings is None:
+            start = time.perf_counter()
+            findings = self.scan_text(decode_source(name, data, errors), stats, name, errors, profile)
+            if profile is not None:
+                profile.add_file(name, time.perf_counter() - start)
+        for v in findings:
+            v["file"] = name
+        return FileResult(name, findings, errors, digest, stats, profile)
+
+    def _scan_files(self, files: List[Tuple[str, Optional[str]]], with_digest: bool = False) -> List[FileResult]:
+        """
+        Scan (path, known digest) pairs. When the content digest equals the
+        known one, matching is skipped and findings is None. Files of at least
+        mmap_threshold bytes are memory-mapped and matched as bytes; only
+        matched lines are decoded, and their encoding is not validated.
+        """
+        scanned: List[FileResult] = []
+        for name, known in files:
+            try:
+                with open(name, "rb") as fh:
+                    if self._use_mmap(os.fstat(fh.fileno()).st_size):
+                        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            scanned.append(self._scan_data(name, mm, known, with_digest, large=True))
+                    else:
+                        scanned.append(self._scan_data(name, fh.read(), known, with_digest, large=False))
+            except (OSError, ValueError) as e:
+                error = f"{type(e).__name__}: {getattr(e, 'strerror', None) or e}"
+                scanned.append(FileResult(name, [], [{"file": name, "kind": "read", "error": error}], None, {}))
+        return scanned
+
+    def scan_path(
+        self,
+        path: str | Path,
+        extensions: Optional[List[str]] = None,
+        jobs: Optional[int] = 1,
+        walker: Optional[TreeWalker] = None,
+        cache: Optional[ScanCache] = None,
+    ) -> List[Dict[str, Any]]:
+        return list(self.iter_scan(path, extensions=extensions, jobs=jobs, walker=walker, cache=cache))
+
+    def iter_scan(
+        self,
+        path: str | Path,
+        extensions: Optional[List[str]] = None,
+        jobs: Optional[int] = 1,
+        walker: Optional[TreeWalker] = None,
+        cache: Optional[ScanCache] = None,
+        select: Optional[Callable[[List[WalkEntry]], List[WalkEntry]]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Scan a file or directory tree, yielding findings as they are produced.
+        jobs > 1 spreads files over a process pool (None or 0 means one worker
+        per CPU). Findings come out ordered by file path, then line, whatever
+        the number of workers; only a bounded window of batches is in flight,
+        so memory does not grow with the number of findings. Directories are
+        walked once by walker (a default TreeWalker for extensions if not
+        given). With a cache, files whose size and mtime (or content digest)
+        are unchanged reuse their stored findings. Files that were skipped or
+        could not be read or decoded are recorded in self.errors. select, if
+        given, picks the files to scan from the walked ones (e.g. a Sharder).
+        """
         path = Path(path).resolve()
-        extensions = extensions or [".py", ".java", ".js", ".ts", ".php", ".rb", ".go", ".cs"]
-        results: List[Dict[str, Any]] = []
+        extensions = extensions or list(DEFAULT_EXTENSIONS)
+        self.errors = []
+        self.prefilter_stats = {}
+        self.rule_profile = ScanProfile(self.rules.descriptions) if self.profile else None
+        entries: List[WalkEntry] = []
         if path.is_file():
-            for v in self.scan_file(path):
-                v["file"] = str(path)
-                results.append(v)
-            return results
-        for ext in extensions:
-            for f in path.rglob(f"*{ext}"):
-                try:
-                    for v in self.scan_file(f):
-                        v["file"] = str(f)
-                        results.append(v)
-                except (OSError, PermissionError):
-                    continue
-        return results
+            st = path.stat()
+            entries.append(WalkEntry(str(path), st.st_size, st.st_mtime_ns))
+        else:
+            walker = walker or TreeWalker(extensions=extensions)
+            entries.extend(walker.walk(path))
+            self.errors.extend(walker.skipped)
+        entries.sort(key=lambda e: e.path)
+        if select is not None:
+            entries = select(entries)
+        jobs = jobs or os.cpu_count() or 1
+        with_digest = cache is not None
+        batches = ordered_batches(entries, jobs)
+
+        def work() -> Iterator[Tuple[Tuple[List[WalkEntry], Dict[str, Any]], Optional[Tuple[Any, ...]]]]:
+            # Cache lookups happen here, as batches are submitted.
+            for batch in batches:
+                hits: Dict[str, Any] = {}
+                pending: List[Tuple[str, Optional[str]]] = []
+                for entry in batch:
+                    digest = None
+                    if cache is not None:
+                        hit, digest = cache.lookup(entry.path, entry.size, entry.mtime_ns)
+                        if hit is not None:
+                            hits[entry.path] = hit
+                            continue
+                    pending.append((entry.path, digest))
+                yield (batch, hits), ((pending, with_digest) if pending else None)
+
+        for (batch, hits), scanned in run_batches(self, _scan_batch, work(), jobs, len(batches)):
+            yield from self._drain(batch, hits, scanned, cache)
+        self.errors.sort(key=lambda e: e["file"])
+
+    def iter_scan_buffers(self, buffers: Iterable[Tuple[str, bytes]]) -> Iterator[Dict[str, Any]]:
+        """
+        Scan (name, content) pairs that are not read from disk, such as git
+        blobs, with the same checks and error records as iter_scan. Findings
+        come out in the order of buffers.
+        """
+        self.errors = []
+        self.prefilter_stats = {}
+        self.rule_profile = ScanProfile(self.rules.descriptions) if self.profile else None
+        for name, data in buffers:
+            result = self._scan_data(name, data, None, False, large=False)
+            for key, value in result.stats.items():
+                self.prefilter_stats[key] = self.prefilter_stats.get(key, 0) + value
+            if result.profile is not None and self.rule_profile is not None:
+                self.rule_profile.merge(result.profile)
+            self.errors.extend(result.errors)
+            yield from result.findings or []
+
+    def _drain(
+        self, batch: List[WalkEntry], per_file: Dict[str, Any], scanned: List[FileResult], cache: Optional[ScanCache]
+    ) -> Iterator[Dict[str, Any]]:
+        """Merge one batch's cache hits and scan results, then yield them in path order."""
+        by_path = {entry.path: entry for entry in batch}
+        to_store = []
+        for result in scanned:
+            for key, value in result.stats.items():
+                self.prefilter_stats[key] = self.prefilter_stats.get(key, 0) + value
+            if result.profile is not None and self.rule_profile is not None:
+                self.rule_profile.merge(result.profile)
+            findings, errors = result.findings, result.errors
+            if findings is None and cache is not None:
+                cache.stats["hash_hits"] += 1
+                findings, errors = cache.cached(result.file)
+            elif cache is not None:
+                cache.stats["misses"] += 1
+            per_file[result.file] = (findings or [], errors)
+            # A truncated scan depends on timing and limits, not just content: scan it again next time.
+            truncated = any(e.get("kind") in TRUNCATION_KINDS for e in errors)
+            if cache is not None and result.digest is not None and not truncated:
+                entry = by_path[result.file]
+                to_store.append((result.file, entry.size, entry.mtime_ns, result.digest, findings, errors))
+        if cache is not None and to_store:
+            cache.store_many(to_store)
+        for entry in batch:
+            findings, errors = per_file.get(entry.path, ([], []))
+            self.errors.extend(errors)
+            yield from findings
+
+
+# Upper bounds for one unit of work, so results start streaming early.
+BATCH_MAX_BYTES = 4 * 1024 * 1024
+BATCH_MAX_FILES = 256
+
+
+def ordered_batches(entries: List[WalkEntry], jobs: int) -> List[List[WalkEntry]]:
+    """
+    Split entries (already in output order) into contiguous batches of roughly
+    equal total size, so workers get similar loads and results can be merged
+    back in order without sorting.
+    """
+    total = sum(e.size for e in entries)
+    target = max(1, min(total // max(1, jobs * 4), BATCH_MAX_BYTES))
+    batches: List[List[WalkEntry]] = []
+    current: List[WalkEntry] = []
+    load = 0
+    for entry in entries:
+        current.append(entry)
+        load += entry.size
+        if load >= target or len(current) >= BATCH_MAX_FILES:
+            batches.append(current)
+            current, load = [], 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+def run_batches(
+    scanner: SQLInjectionScanner,
+    func: Callable[..., List[Any]],
+    work: Iterable[Tuple[Any, Optional[Tuple[Any, ...]]]],
+    jobs: int,
+    size: int,
+) -> Iterator[Tuple[Any, List[Any]]]:
+    """
+    Call func(scanner, *args) for each (tag, args) of work and yield (tag,
+    result) in the order of work; args None stands for a call with nothing to
+    do, whose result is []. With jobs > 1 and more than one of the `size`
+    work items, calls go to a process pool whose workers hold a copy of
+    scanner, with at most 2 * jobs of them in flight; func must then be a
+    module-level function.
+    """
+    pool: Optional[ProcessPoolExecutor] = None
+    if jobs > 1 and size > 1:
+        pool = ProcessPoolExecutor(max_workers=min(jobs, size), initializer=_init_worker, initargs=(scanner,))
+    in_flight: Deque[Tuple[Any, Any]] = deque()
+    try:
+        for tag, args in work:
+            if args is None:
+                result: Any = []
+            elif pool is None:
+                result = func(scanner, *args)
+            else:
+                result = pool.submit(_run_in_worker, func, *args)
+            in_flight.append((tag, result))
+            while len(in_flight) > (2 * jobs if pool is not None else 0):
+                tag, result = in_flight.popleft()
+                yield tag, result if isinstance(result, list) else result.result()
+        while in_flight:
+            tag, result = in_flight.popleft()
+            yield tag, result if isinstance(result, list) else result.result()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+_worker_scanner: Optional[SQLInjectionScanner] = None
+
+
+def _init_worker(scanner: SQLInjectionScanner) -> None:
+    global _worker_scanner
+    _worker_scanner = scanner
+
+
+def _run_in_worker(func: Callable[..., List[Any]], *args: Any) -> List[Any]:
+    assert _worker_scanner is not None
+    return func(_worker_scanner, *args)
+
+
+def _scan_batch(
+    scanner: SQLInjectionScanner, files: List[Tuple[str, Optional[str]]], with_digest: bool = False
+) -> List[FileResult]:
+    return scanner._scan_files(files, with_digest=with_digest)
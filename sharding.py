@@ -0,0 +1,140 @@
+"""
+Sharded scanning: a deterministic split of a tree into N disjoint shards for
+separate machines, and the merge of their reports. Files go to one of
+SHARD_BUCKETS buckets by a hash of their root-relative path; buckets are then
+dealt to shards largest first, so shards are balanced by bytes and every
+machine computes the same split without coordination. Cross-platform.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlbase.walker import WalkEntry
+
+SHARD_BUCKETS = 4096
+SHARD_VERSION = 1
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """'2/8' -> (2, 8); shards are numbered from 1."""
+    index, sep, count = text.partition("/")
+    try:
+        i, n = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"--shard needs I/N, got {text!r}") from None
+    if not sep or n < 1 or not 1 <= i <= n:
+        raise ValueError(f"--shard needs I/N with 1 <= I <= N, got {text!r}")
+    return i, n
+
+
+def relative_key(path: str, root: str | Path) -> str:
+    """Path relative to the scan root with "/" separators: the same on every machine and OS."""
+    return Path(path).relative_to(root).as_posix()
+
+
+def bucket_of(key: str) -> int:
+    return int.from_bytes(hashlib.sha1(key.encode("utf-8", errors="surrogateescape")).digest()[:4], "big") % SHARD_BUCKETS
+
+
+class Sharder:
+    """
+    Selects shard `index` of `count` from a walked tree, as the select hook of
+    SQLInjectionScanner.iter_scan. Afterwards, summary() describes the split
+    so merge can check that reports belong together.
+    """
+
+    def __init__(self, root: str | Path, index: int, count: int) -> None:
+        self.root = Path(root).resolve()
+        self.index = index
+        self.count = count
+        self.info: Dict[str, Any] = {}
+
+    def assign(self, entries: Sequence[WalkEntry]) -> List[int]:
+        """Shard (1-based) of each entry."""
+        keys = [relative_key(e.path, self.root) for e in entries]
+        buckets = [bucket_of(k) for k in keys]
+        sizes: Dict[int, int] = {}
+        for b, e in zip(buckets, entries):
+            # Count empty files as one byte so they still spread.
+            sizes[b] = sizes.get(b, 0) + max(1, e.size)
+        loads = [0] * self.count
+        owner: Dict[int, int] = {}
+        for b in sorted(sizes, key=lambda b: (-sizes[b], b)):
+            shard = min(range(self.count), key=lambda s: (loads[s], s))
+            owner[b] = shard + 1
+            loads[shard] += sizes[b]
+        return [owner[b] for b in buckets]
+
+    def __call__(self, entries: List[WalkEntry]) -> List[WalkEntry]:
+        keys = sorted((relative_key(e.path, self.root), e.size) for e in entries)
+        digest = hashlib.sha256(json.dumps([SHARD_VERSION, self.count, keys]).encode("utf-8")).hexdigest()[:16]
+        selected = [e for e, shard in zip(entries, self.assign(entries)) if shard == self.index]
+        self.info = {
+            "index": self.index,
+            "count": self.count,
+            "partition": digest,
+            "root": str(self.root),
+            "files": len(selected),
+            "bytes": sum(e.size for e in selected),
+            "total_files": len(entries),
+        }
+        return selected
+
+    def summary(self, fingerprint: str, errors: List[Dict[str, str]]) -> Dict[str, Any]:
+        return {"shard": dict(self.info, fingerprint=fingerprint), "errors": errors}
+
+
+def _finding_key(f: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (f["file"], f["line"], f.get("end_line", f["line"]), f.get("description", ""), f.get("type", ""), f.get("code", ""))
+
+
+def merge_reports(reports: Sequence[Tuple[str, List[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Merge (name, findings, summary) shard reports into one list ordered by
+    file and line, without duplicates. Raises ValueError unless the reports
+    are shards of the same split and rules, with none missing. Paths are made
+    root-relative when the shards were scanned under different roots.
+    """
+    shards: Dict[int, Dict[str, Any]] = {}
+    for name, _findings, summary in reports:
+        shard = (summary or {}).get("shard")
+        if not shard:
+            raise ValueError(f"{name}: not a shard report (scan it with --shard I/N)")
+        first = next(iter(shards.values()), shard)
+        for field in ("count", "partition", "fingerprint"):
+            if shard.get(field) != first.get(field):
+                raise ValueError(f"{name}: shard {field} {shard.get(field)!r} differs from {first.get(field)!r}")
+        seen = shards.get(shard["index"])
+        if seen is not None and seen["files"] != shard["files"]:
+            raise ValueError(f"{name}: conflicting reports for shard {shard['index']}/{shard['count']}")
+        shards[shard["index"]] = shard
+    count = next(iter(shards.values()))["count"] if shards else 0
+    missing = [i for i in range(1, count + 1) if i not in shards]
+    if not shards or missing:
+        raise ValueError(f"missing shard(s): {', '.join(f'{i}/{count}' for i in missing) or 'all'}")
+    relative = len({s["root"] for s in shards.values()}) > 1
+    merged: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    errors: Dict[Tuple[str, str, str], Dict[str, str]] = {}
+    for _name, findings, summary in reports:
+        root = summary["shard"]["root"]  # type: ignore[index]
+        for f in findings:
+            if relative:
+                f = dict(f, file=relative_key(f["file"], root))
+            merged.setdefault(_finding_key(f), f)
+        for e in summary.get("errors", []):  # type: ignore[union-attr]
+            if relative:
+                try:
+                    e = dict(e, file=relative_key(e["file"], root))
+                except ValueError:
+                    pass  # outside the shard root (a missing path argument, say): keep it absolute
+            errors.setdefault((e["file"], e["kind"], e["error"]), e)
+    ordered = [merged[k] for k in sorted(merged)]
+    some = next(iter(shards.values()))
+    return ordered, {
+        "shards": count,
+        "partition": some["partition"],
+        "files": sum(s["files"] for s in shards.values()),
+        "total_files": some["total_files"],
+        "errors": [errors[k] for k in sorted(errors)],
+    }
@@ -0,0 +1,104 @@
+"""
+Local stand-in target for the dynamic tester: simulated vulnerable and safe
+endpoints with configurable latency, for offline throughput benchmarks. Cross-platform.
+Routes: /vuln/<n> (error-based on "id"), /blind/<n> (time-based on "sort"), /safe/<n>.
+"""
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+KINDS = ("vuln", "safe", "blind")
+_SLEEP_RE = re.compile(r"sleep\s*\(\s*(\d+(?:\.\d+)?)\s*\)", re.I)
+_ERROR_PAGE = b"<html><body>You have an error in your SQL syntax near ''' at line 1</body></html>"
+_OK_PAGE = b"<html><body>" + b"<p>Lorem ipsum dolor sit amet.</p>" * 64 + b"</body></html>"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StandInServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _params(self) -> Dict[str, str]:
+        query = urlsplit(self.path).query
+        if self.command == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            query = self.rfile.read(length).decode("utf-8", errors="replace")
+        return {k: v[0] for k, v in parse_qs(query, keep_blank_values=True).items()}
+
+    def _respond(self) -> None:
+        params = self._params()
+        kind = urlsplit(self.path).path.strip("/").split("/")[0]
+        self.server.count()
+        self.server.delay()
+        status, body = 200, _OK_PAGE
+        if kind == "vuln" and "'" in params.get("id", ""):
+            status, body = 500, _ERROR_PAGE
+        elif kind == "blind":
+            m = _SLEEP_RE.search(params.get("sort", ""))
+            if m:
+                time.sleep(float(m.group(1)))
+        elif kind not in KINDS:
+            status, body = 404, b"not found"
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The tester hangs up early on timeouts and matches.
+            self.close_connection = True
+
+    do_GET = _respond
+    do_POST = _respond
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0) -> None:
+        super().__init__((host, port), StandInHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def delay(self) -> None:
+        seconds = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def start(self) -> "StandInServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def standin_spec(base_url: str, endpoints: int, params: int = 4) -> List[Dict[str, Any]]:
+    """Endpoint specs cycling vuln/safe/blind, each with `params` parameters plus the injectable one."""
+    specs: List[Dict[str, Any]] = []
+    for n in range(endpoints):
+        kind = KINDS[n % len(KINDS)]
+        fields = {f"f{i}": "x" for i in range(params)}
+        fields["sort" if kind == "blind" else "id"] = "1"
+        specs.append({
+            "url": f"{base_url}/{kind}/{n}",
+            "method": "GET" if n % 2 else "POST",
+            "params": fields,
+        })
+    return specs
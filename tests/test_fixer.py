@@ -0,0 +1,53 @@
+import sys
+
+from sqlbase.__main__ import main
+from sqlbase.fixer import check_syntax
+
+JAVA = """import java.sql.*;
+class App {
+    void a(Statement stmt, String id) throws SQLException {
+        stmt.execute("SELECT * FROM users WHERE id = '" + id + "'");
+    }
+    boolean b(Connection conn, String id) throws SQLException {
+        boolean ok = conn.createStatement().execute("DELETE FROM t WHERE id = " + id);
+        return ok;
+    }
+}
+"""
+PYTHON = 'def get(cursor, uid):\n    cursor.execute("SELECT * FROM t WHERE id = " + uid)\n'
+
+
+def _run(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["sqlbase", *argv])
+    return main()
+
+
+def test_fix_rewrites_files_from_a_scan_report(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "App.java").write_text(JAVA)
+    (src / "db.py").write_text(PYTHON)
+    report = tmp_path / "report.json"
+    assert _run(monkeypatch, "scan", str(src), "--format", "json", "-o", str(report)) == 0
+
+    assert _run(monkeypatch, "fix", "--findings", str(report), "--in-place") == 0
+    java = (src / "App.java").read_text()
+    assert "+ id" not in java
+    assert 'PreparedStatement ps1 = stmt.getConnection().prepareStatement("SELECT * FROM users WHERE id = ?");' in java
+    assert "boolean ok = ps2.execute();" in java
+    assert check_syntax(java, "java") is None
+    python = (src / "db.py").read_text()
+    assert 'cursor.execute("SELECT * FROM t WHERE id = %s", (uid,))' in python
+    assert check_syntax(python, "python") is None
+
+
+def test_diff_paths_are_relative_to_the_common_root(tmp_path, monkeypatch, capsys):
+    pkg = tmp_path / "app" / "pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "App.java").write_text(JAVA)
+    (tmp_path / "app" / "db.py").write_text(PYTHON)
+    monkeypatch.chdir(tmp_path.parent)
+    assert _run(monkeypatch, "fix", str(tmp_path / "app")) == 0
+    diff = capsys.readouterr().out
+    assert "--- a/pkg/App.java\n+++ b/pkg/App.java\n" in diff
+    assert "--- a/db.py\n+++ b/db.py\n" in diff
@@ -0,0 +1,88 @@
+import subprocess
+
+import pytest
+
+from sqlbase.gitdiff import RevisionSource, changed_lines
+from sqlbase.scanner import SQLInjectionScanner
+from sqlbase.walker import DEFAULT_PRUNE_DIRS, TreeWalker
+
+FLAGGED = 'cursor.execute("SELECT * FROM t WHERE id = " + x)\n'
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@example.com", *args],
+        check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+
+
+def _write(repo, files):
+    for rel, text in files.items():
+        path = repo / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(text.encode("utf-8"))
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "diff.noprefix", "true")
+    _write(tmp_path, {
+        "app.py": "a = 1\nb = 2\n",
+        "old_name.py": "".join(f"line{i} = {i}\n" for i in range(20)),
+        ".gitignore": "generated/\n",
+    })
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-q", "-m", "base")
+    _git(tmp_path, "tag", "base")
+    return tmp_path
+
+
+def _commit(repo, files):
+    _write(repo, files)
+    _git(repo, "add", "-A", "-f")
+    _git(repo, "commit", "-q", "-m", "change")
+
+
+def _scan(repo, walker=None):
+    source = RevisionSource(str(repo), "base..HEAD", extensions=[".py", ".js"], changed_only=True, walker=walker)
+    findings = [f for f in SQLInjectionScanner().iter_scan_buffers(source) if source.keep(f)]
+    return source, sorted((f["file"][len(source.root) + 1:], f["line"]) for f in findings)
+
+
+def test_hunks_ignore_the_diff_prefix_config(repo):
+    _commit(repo, {"app.py": "a = 1\n" + FLAGGED + "b = 2\n" + FLAGGED})
+    assert changed_lines(str(repo), "base..HEAD", ["app.py"]) == {"app.py": [(2, 2), (4, 4)]}
+    assert _scan(repo)[1] == [("app.py", 2), ("app.py", 4)]
+
+
+@pytest.mark.parametrize("brk", ["\f", "\r", "\x0b", "\x1c", "\u2028", "\r\n"])
+def test_lines_are_mapped_across_breaks_git_does_not_count(repo, brk):
+    text = f"a = 1{brk}b = 2\n\n" + FLAGGED
+    _commit(repo, {"app.py": text})
+    expected = SQLInjectionScanner().scan_text(text)
+    assert [f["line"] for f in expected] == [4]
+    assert _scan(repo)[1] == [("app.py", 4)]
+
+
+def test_renamed_file_reports_only_edited_lines(repo):
+    (repo / "old_name.py").rename(repo / "new_name.py")
+    lines = (repo / "new_name.py").read_text().splitlines(keepends=True)
+    lines[10] = FLAGGED
+    _commit(repo, {"new_name.py": "".join(lines), "other.py": FLAGGED})
+    assert [(f.path, f.status) for f in RevisionSource(str(repo), "base..HEAD").files] == [
+        ("new_name.py", "R"), ("other.py", "A"),
+    ]
+    assert _scan(repo)[1] == [("new_name.py", 11), ("other.py", 1)]
+
+
+def test_walker_rules_apply_to_changed_paths(repo):
+    _commit(repo, {
+        "node_modules/lib/x.py": FLAGGED,
+        "vendor/v.py": FLAGGED,
+        "generated/g.py": FLAGGED,
+        "src/keep.py": FLAGGED,
+    })
+    walker = TreeWalker(prune_dirs=DEFAULT_PRUNE_DIRS, ignore_patterns=["vendor/"])
+    assert [rel for rel, _ in _scan(repo, walker)[1]] == ["src/keep.py"]
+    assert len(_scan(repo)[1]) == 4
@@ -0,0 +1,21 @@
+from sqlbase.analyzer import Analyzer
+from sqlbase.predictor import VulnerabilityPredictor
+
+SOURCE = 'q = request.get("id")\ncursor.execute("SELECT * FROM t WHERE id = " + q)\n'
+
+
+def test_crlf_counts_match_lf(tmp_path):
+    lf, crlf = tmp_path / "lf", tmp_path / "crlf"
+    lf.mkdir()
+    crlf.mkdir()
+    (lf / "app.py").write_bytes(SOURCE.encode("utf-8"))
+    (crlf / "app.py").write_bytes(SOURCE.replace("\n", "\r\n").encode("utf-8"))
+    predictor = VulnerabilityPredictor()
+    expected = [counts for _file, counts in predictor.iter_file_counts(lf)]
+    assert [counts for _file, counts in predictor.iter_file_counts(crlf)] == expected
+    assert [counts for _file, counts in predictor.iter_file_counts(crlf / "app.py")] == [
+        counts for _file, counts in predictor.iter_file_counts(lf / "app.py")
+    ]
+    analyzer = Analyzer(predictor=predictor)
+    list(analyzer.iter_analyze(crlf))
+    assert [counts for _file, counts in analyzer.file_counts] == expected
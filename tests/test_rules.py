@@ -0,0 +1,65 @@
+import pytest
+
+from sqlbase.scanner import SQLInjectionScanner
+
+# One line per rule, in rule order, and lines holding rule literals that no rule matches.
+RULE_LINES = [
+    'cursor.execute("SELECT * FROM t WHERE id = " + uid)',
+    "cursor.execute(\"SELECT * FROM t WHERE name = '%s'\" % name)",
+    'cursor.execute("DELETE FROM t WHERE id = {}".format(item))',
+    'sql = "SELECT * FROM orders WHERE owner = {owner}"',
+    "sql = 'UPDATE t SET a = {value}'",
+    'query = "SELECT 1"; query += where',
+    'Statement.execute("DELETE FROM t WHERE id = " + id);',
+    'conn.createStatement().execute("SELECT a FROM t WHERE " + cond);',
+    'db.raw("SELECT * FROM items WHERE id = " + req.params.id);',
+    'x = ("a {}".format(b)).execute',
+]
+NEAR_MISSES = [
+    'cursor.execute("SELECT id FROM t WHERE id = ?", (row,))',
+    "query = build(items)",
+    "EXECUTE IMMEDIATE",
+    "",
+]
+BREAKS = ["\n", "\r\n", "\r", "\x0b", "\x0c", "\x1c", "\x85", "\u2028", "\u2029"]
+
+
+def _scan(text, prefilter, guarded=False):
+    scanner = SQLInjectionScanner(prefilter=prefilter, max_line_length=10000 if guarded else None)
+    return scanner.scan_text(text)
+
+
+def test_every_rule_is_covered():
+    rules = SQLInjectionScanner().rules
+    for i, line in enumerate(RULE_LINES):
+        assert rules.singles[i].search(line), line
+
+
+@pytest.mark.parametrize("guarded", [False, True])
+@pytest.mark.parametrize("brk", BREAKS)
+def test_prefilter_keeps_findings(brk, guarded):
+    lines = [line for rule in RULE_LINES for line in (rule, *NEAR_MISSES)]
+    text = brk.join(lines) + brk
+    expected = _scan(text, prefilter=False, guarded=guarded)
+    assert len(expected) == len(RULE_LINES)
+    assert _scan(text, prefilter=True, guarded=guarded) == expected
+    assert _scan(text.upper(), prefilter=True, guarded=guarded) == _scan(text.upper(), prefilter=False, guarded=guarded)
+
+
+@pytest.mark.parametrize("brk", BREAKS)
+def test_prefilter_keeps_findings_on_bytes(brk):
+    rules = SQLInjectionScanner().rules
+    text = brk.join(line for rule in RULE_LINES for line in (rule, *NEAR_MISSES))
+    data = text.encode("utf-8")
+    assert rules.scan_bytes(data, prefilter=True) == rules.scan_bytes(data, prefilter=False) == rules.scan(text, prefilter=False)
+
+
+@pytest.mark.parametrize("brk", BREAKS)
+def test_line_stats_follow_splitlines(brk):
+    text = brk.join(["a = 1", RULE_LINES[0], "b = 2"]) + brk
+    for guarded in (False, True):
+        stats = {}
+        scanner = SQLInjectionScanner(max_line_length=10000 if guarded else None)
+        scanner.scan_text(text, stats)
+        assert stats["lines"] == len(text.splitlines()) == 3
+        assert stats["lines_rejected"] == 2
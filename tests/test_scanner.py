@@ -0,0 +1,25 @@
+from sqlbase.cache import ScanCache
+from sqlbase.scanner import SQLInjectionScanner
+
+LINE = 'cursor.execute("SELECT * FROM t WHERE id = " + uid)\n'
+
+
+def _cached_paths(cache):
+    return [row[0] for row in cache.conn.execute("SELECT path FROM files")]
+
+
+def test_truncated_results_are_not_cached(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "clean.py").write_text(LINE)
+    (src / "long.py").write_text(LINE + 'cursor.execute("SELECT ' + "a, " * 100 + 'b FROM t" + uid)\n')
+    scanner = SQLInjectionScanner(max_line_length=100)
+    cache = ScanCache(tmp_path / "cache", scanner.fingerprint())
+    first = scanner.scan_path(src, cache=cache)
+    assert [e["kind"] for e in scanner.errors] == ["long-line"]
+    assert [p.rsplit("/", 1)[-1] for p in _cached_paths(cache)] == ["clean.py"]
+
+    second = scanner.scan_path(src, cache=cache)
+    assert second == first
+    assert [e["kind"] for e in scanner.errors] == ["long-line"]
+    assert cache.stats["hits"] == 1
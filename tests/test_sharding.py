@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from sqlbase.reporting import read_report
+from sqlbase.sharding import merge_reports
+
+
+def _shard(index, root, findings, errors):
+    summary = {
+        "shard": {"index": index, "count": 2, "partition": "p", "fingerprint": "f", "root": root, "files": 1, "total_files": 2},
+        "errors": errors,
+    }
+    return f"shard{index}.json", findings, summary
+
+
+def test_merge_keeps_errors_outside_the_shard_root_absolute():
+    reports = [
+        _shard(1, "/m1/src", [{"file": "/m1/src/a.py", "line": 1}], [{"file": "/elsewhere/x.py", "kind": "read", "error": "gone"}]),
+        _shard(2, "/m2/src", [{"file": "/m2/src/b.py", "line": 2}], [{"file": "/m2/src/c.py", "kind": "encoding", "error": "bad"}]),
+    ]
+    findings, summary = merge_reports(reports)
+    assert [(f["file"], f["line"]) for f in findings] == [("a.py", 1), ("b.py", 2)]
+    assert [e["file"] for e in summary["errors"]] == ["/elsewhere/x.py", "c.py"]
+
+
+def test_read_report_json_and_ndjson(tmp_path):
+    findings = [{"file": "a.py", "line": 1}, {"file": "b.py", "line": 2}]
+    (tmp_path / "r.json").write_text(json.dumps({"findings": findings, "summary": {"errors": []}}))
+    (tmp_path / "r.ndjson").write_text("\n".join(json.dumps(f) for f in findings) + '\n{"summary": {"errors": []}}\n')
+    assert read_report(tmp_path / "r.json") == (findings, {"errors": []})
+    assert read_report(tmp_path / "r.ndjson") == (findings, {"errors": []})
+    (tmp_path / "r.sarif").write_text(json.dumps({"$schema": "x", "runs": []}))
+    with pytest.raises(ValueError, match="SARIF"):
+        read_report(tmp_path / "r.sarif")
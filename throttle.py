@@ -0,0 +1,80 @@
+"""
+Per-host concurrency limits and token-bucket rate limiting for outgoing requests.
+Thread-safe. Cross-platform.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst is not None and burst < 1:
+            raise ValueError("burst must be at least 1, or no request could ever get a token")
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return waited
+                delay = (1.0 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class HostThrottle:
+    """
+    Caps in-flight requests per host and, when `rate` is set, the request rate
+    per host. Hosts get their own semaphore and bucket on first use.
+    """
+
+    def __init__(self, per_host: Optional[int] = None, rate: Optional[float] = None, burst: Optional[float] = None) -> None:
+        self.per_host = per_host
+        self.rate = rate
+        self.burst = burst
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def _for(self, host: str):
+        with self._lock:
+            slots = self._slots.get(host)
+            if slots is None and self.per_host:
+                slots = self._slots[host] = threading.BoundedSemaphore(self.per_host)
+            bucket = self._buckets.get(host)
+            if bucket is None and self.rate:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return slots, bucket
+
+    @contextmanager
+    def slot(self, host: str) -> Iterator[None]:
+        slots, bucket = self._for(host)
+        if slots is not None:
+            slots.acquire()
+        try:
+            if bucket is not None:
+                waited = bucket.acquire()
+                if waited:
+                    with self._lock:
+                        self.waited += waited
+            yield
+        finally:
+            if slots is not None:
+                slots.release()
@@ -0,0 +1,265 @@
+"""
+Single-pass directory walker shared by the scanner and the predictor. Cross-platform.
+Uses os.scandir, prunes vendored/build directories and .gitignore-style rules,
+skips oversized files and guards against symlink loops.
+"""
+import os
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+DEFAULT_PRUNE_DIRS = frozenset({
+    ".git",
+    ".hg",
+    ".svn",
+    "node_modules",
+    "bower_components",
+    "venv",
+    ".venv",
+    "__pycache__",
+    ".tox",
+    ".nox",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".gradle",
+    "build",
+    "dist",
+    "target",
+})
+DEFAULT_MAX_FILE_SIZE = 32 * 1024 * 1024
+BINARY_SNIFF_BYTES = 8192
+
+
+class WalkEntry(NamedTuple):
+    path: str
+    size: int
+    mtime_ns: int
+
+
+def looks_binary(head: bytes) -> bool:
+    return b"\0" in head[:BINARY_SNIFF_BYTES]
+
+
+def _glob_to_regex(glob: str) -> str:
+    out: List[str] = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("/**", i) and i + 3 == n:
+            out.append("(?:/.*)?")
+            i += 3
+        elif glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = glob.find("]", i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = glob[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """
+    .gitignore-style rules relative to a base directory: comments, '!' negation,
+    trailing '/' for directories only, anchoring on '/', and *, ?, ** globs.
+    """
+
+    def __init__(self, base: str, lines: Iterable[str]) -> None:
+        self.base = base
+        self.rules: List[Tuple["re.Pattern[str]", bool, bool]] = []
+        for raw in lines:
+            line = raw.rstrip("\r\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            body = _glob_to_regex(line.lstrip("/"))
+            regex = f"^{body}$" if anchored else f"^(?:.*/)?{body}$"
+            self.rules.append((re.compile(regex), negate, dir_only))
+
+    @classmethod
+    def from_file(cls, base: str, path: str) -> Optional["IgnoreRules"]:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as fh:
+                rules = cls(base, fh)
+        except OSError:
+            return None
+        return rules if rules.rules else None
+
+    def match(self, relpath: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included by a '!' rule, None if no rule applies."""
+        if self.base:
+            if not relpath.startswith(self.base + "/"):
+                return None
+            relpath = relpath[len(self.base) + 1:]
+        result: Optional[bool] = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relpath):
+                result = not negate
+        return result
+
+
+class TreeWalker:
+    def __init__(
+        self,
+        extensions: Optional[Iterable[str]] = None,
+        prune_dirs: Iterable[str] = DEFAULT_PRUNE_DIRS,
+        ignore_patterns: Iterable[str] = (),
+        use_gitignore: bool = True,
+        max_file_size: Optional[int] = DEFAULT_MAX_FILE_SIZE,
+        follow_symlinks: bool = True,
+    ) -> None:
+        self.extensions = frozenset(extensions) if extensions is not None else None
+        self.prune_dirs = frozenset(prune_dirs)
+        self.extra_rules = IgnoreRules("", ignore_patterns)
+        self.use_gitignore = use_gitignore
+        self.max_file_size = max_file_size
+        self.follow_symlinks = follow_symlinks
+        self.skipped: List[Dict[str, str]] = []
+        self.stats: Dict[str, int] = {}
+
+    def _ignored(self, chain: Tuple[IgnoreRules, ...], relpath: str, is_dir: bool) -> bool:
+        ignored = False
+        for rules in chain:
+            verdict = rules.match(relpath, is_dir)
+            if verdict is not None:
+                ignored = verdict
+        return ignored
+
+    def selector(self, root: str | os.PathLike) -> Callable[[str], bool]:
+        """
+        Predicate on "/"-separated paths relative to root: whether walk(root)
+        would reach that file by its directory pruning and ignore rules (no
+        extension, size or existence checks), for file lists from elsewhere.
+        """
+        root = os.path.abspath(root)
+        # Ignore rules in force inside each directory seen so far; None if it is pruned.
+        chains: Dict[str, Optional[Tuple[IgnoreRules, ...]]] = {}
+
+        def chain_of(rel: str) -> Optional[Tuple[IgnoreRules, ...]]:
+            if rel in chains:
+                return chains[rel]
+            chain: Optional[Tuple[IgnoreRules, ...]] = (self.extra_rules,) if self.extra_rules.rules else ()
+            if rel:
+                name = rel.rpartition("/")[2]
+                chain = chain_of(rel.rpartition("/")[0])
+                if chain is not None and (
+                    name in self.prune_dirs or name.endswith(".egg-info") or (chain and self._ignored(chain, rel, True))
+                ):
+                    chain = None
+            if chain is not None and self.use_gitignore:
+                rules = IgnoreRules.from_file(rel, os.path.join(root, *rel.split("/"), ".gitignore"))
+                if rules is not None:
+                    chain = chain + (rules,)
+            chains[rel] = chain
+            return chain
+
+        def selects(relpath: str) -> bool:
+            chain = chain_of(relpath.rpartition("/")[0])
+            return chain is not None and not (chain and self._ignored(chain, relpath, False))
+
+        return selects
+
+    def walk(self, root: str | os.PathLike) -> Iterator[WalkEntry]:
+        """Yield a WalkEntry for every matching file under root, in sorted order."""
+        self.skipped = []
+        self.stats = {"dirs": 0, "files": 0, "pruned_dirs": 0, "revisited_dirs": 0}
+        root = os.path.abspath(root)
+        base_chain: Tuple[IgnoreRules, ...] = (self.extra_rules,) if self.extra_rules.rules else ()
+        try:
+            st = os.stat(root)
+        except OSError as e:
+            self.skipped.append({"file": root, "kind": "read", "error": f"{type(e).__name__}: {e.strerror or e}"})
+            return
+        visited = {(st.st_dev, st.st_ino)}
+        stack: List[Tuple[str, str, Tuple[IgnoreRules, ...]]] = [(root, "", base_chain)]
+        while stack:
+            dirpath, rel, chain = stack.pop()
+            self.stats["dirs"] += 1
+            if self.use_gitignore:
+                rules = IgnoreRules.from_file(rel, os.path.join(dirpath, ".gitignore"))
+                if rules is not None:
+                    chain = chain + (rules,)
+            try:
+                with os.scandir(dirpath) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                self.skipped.append({"file": dirpath, "kind": "read", "error": f"{type(e).__name__}: {e.strerror or e}"})
+                continue
+            subdirs: List[Tuple[str, str]] = []
+            for entry in entries:
+                name = entry.name
+                relpath = f"{rel}/{name}" if rel else name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=self.follow_symlinks)
+                except OSError:
+                    continue
+                if is_dir:
+                    if name in self.prune_dirs or name.endswith(".egg-info") or (chain and self._ignored(chain, relpath, True)):
+                        self.stats["pruned_dirs"] += 1
+                        continue
+                    try:
+                        dst = entry.stat()
+                    except OSError:
+                        continue
+                    key = (dst.st_dev, dst.st_ino)
+                    if key in visited:
+                        self.stats["revisited_dirs"] += 1
+                        continue
+                    visited.add(key)
+                    subdirs.append((entry.path, relpath))
+                    continue
+                if self.extensions is not None and os.path.splitext(name)[1] not in self.extensions:
+                    continue
+                if chain and self._ignored(chain, relpath, False):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError as e:
+                    self.skipped.append({"file": entry.path, "kind": "read", "error": f"{type(e).__name__}: {e.strerror or e}"})
+                    continue
+                if self.max_file_size is not None and st.st_size > self.max_file_size:
+                    self.skipped.append({"file": entry.path, "kind": "too-large", "error": f"{st.st_size} bytes"})
+                    continue
+                self.stats["files"] += 1
+                yield WalkEntry(entry.path, st.st_size, st.st_mtime_ns)
+            for sub in reversed(subdirs):
+                stack.append((sub[0], sub[1], chain))
+
+
+def walk_files(root: str | os.PathLike, extensions: Optional[Iterable[str]] = None) -> Iterator[WalkEntry]:
+    return TreeWalker(extensions=extensions).walk(root)